@@ -22,6 +22,9 @@ def create_app(config_class=Config):
                 template_folder=os.path.abspath("templates"))
     print(os.path.abspath("templates"))
     app.config.from_object(config_class)
+
+    from app.json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
     # If running under pytest, some tests call create_app() without passing
     # TestConfig and set TESTING afterwards. Detect pytest via common
     # environment variables and enable TESTING early so init_db can pick
@@ -219,6 +222,11 @@ def create_app(config_class=Config):
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(learning_bp, url_prefix='/api/learning')
     app.register_blueprint(courses_bp, url_prefix='/api/courses')
+
+    # Publish, close and expire activities and announcements as their dates pass
+    if not app.config.get('TESTING'):
+        from app.utils.scheduler import transition_scheduler
+        transition_scheduler.start()
     
     # Health check endpoint
     @app.route('/api/health')
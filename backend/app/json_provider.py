@@ -0,0 +1,72 @@
+"""
+COMP5241 Group 10 - JSON Provider
+Serializes every API response with orjson
+
+orjson writes dataclasses, UUIDs and NumPy arrays and scalars natively and
+produces bytes, so responses skip the str round trip of the standard
+provider. ObjectIds become strings and Pydantic models their fields, so
+routes can hand over documents and response models as they are.
+
+Dicts are written the way Flask's default provider writes them: keys
+sorted and dates as RFC 1123 strings ("Wed, 01 May 2024 12:00:00 GMT"),
+which is what the front end reads from the routes that return documents
+as they are. Response models are the exception: a route that returns one
+gets its fields in declaration order and its datetimes as ISO 8601, the
+format those routes wrote by hand with isoformat() before they had models.
+"""
+import decimal
+from datetime import date
+
+import numpy as np
+import orjson
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+from pydantic import BaseModel
+from werkzeug.http import http_date
+
+OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+           | orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+def _default(obj):
+    """Types orjson doesn't know, and dates, which it would write as ISO 8601"""
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):  # arrays orjson can't take as-is, e.g. non-contiguous
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj) -> bytes:
+    if isinstance(obj, BaseModel):
+        # Pydantic's own serializer writes bytes without building a dict first
+        return obj.__pydantic_serializer__.to_json(obj)
+    return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson; set as app.json"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
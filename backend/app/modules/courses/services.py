@@ -3,7 +3,7 @@ COMP5241 Group 10 - Courses Module Services
 Responsible: Keith
 Enhanced with comprehensive teacher tools and course management features
 """
-from datetime import datetime
+from datetime import datetime, timezone
 import csv
 import io
 import os
@@ -12,6 +12,7 @@ from werkzeug.utils import secure_filename
 from flask import current_app
 from bson import ObjectId
 from config.database import get_db_connection
+from app.utils import scheduler
 
 
 class CourseService:
@@ -644,6 +645,15 @@ class MaterialService:
 
 class AnnouncementService:
     """Service class for course announcements"""
+
+    @staticmethod
+    def _as_datetime(value):
+        """Dates arrive from JSON as ISO strings; stored as naive UTC like every other date"""
+        if isinstance(value, str) and value:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value or None
     
     @staticmethod
     def create_announcement(course_id, title, content, created_by, created_by_name=None, **kwargs):
@@ -668,13 +678,16 @@ class AnnouncementService:
                 'is_pinned': kwargs.get('is_pinned', False),
                 'is_urgent': kwargs.get('is_urgent', False),
                 'priority': kwargs.get('priority', 2),
-                'publish_at': kwargs.get('publish_at'),
-                'expire_at': kwargs.get('expire_at'),
+                'publish_at': AnnouncementService._as_datetime(kwargs.get('publish_at')),
+                'expire_at': AnnouncementService._as_datetime(kwargs.get('expire_at')),
                 'attachment_ids': kwargs.get('attachment_ids', [])
             }
+            # is_published and is_expired are flipped by the scheduler when the dates pass
+            announcement_data.update(scheduler.initial_state('course_announcements', announcement_data))
             
             result = db.course_announcements.insert_one(announcement_data)
             announcement_data['_id'] = result.inserted_id
+            scheduler.schedule(db, 'course_announcements', announcement_data)
             
             return {'success': True, 'announcement': announcement_data}
         except Exception as e:
@@ -691,14 +704,8 @@ class AnnouncementService:
             
             # Apply visibility filters for students
             if user_role != 'teacher':
-                now = datetime.utcnow()
-                query['$or'] = [
-                    {'publish_at': {'$lte': now}},
-                    {'publish_at': None}
-                ]
-                query['$and'] = [
-                    {'$or': [{'expire_at': {'$gte': now}}, {'expire_at': None}]}
-                ]
+                query['is_published'] = True
+                query['is_expired'] = False
             
             # Calculate offset
             offset = (page - 1) * per_page
@@ -3,8 +3,26 @@ COMP5241 Group 10 - Learning Activity Models
 Defines the models for all learning activities
 """
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field, validator
+from typing import Annotated, List, Optional, Dict, Any, Union
+from bson import ObjectId
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, validator
+
+
+def _id_string(value):
+    return str(value) if isinstance(value, ObjectId) else value
+
+ObjectIdStr = Annotated[str, BeforeValidator(_id_string)]
+
+# Response Models
+class ResponseModel(BaseModel):
+    """Base for API responses validated straight from a MongoDB document; _id is returned as id"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: ObjectIdStr = Field(alias='_id')
+
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes (datetimes as ISO 8601)"""
+        return self.__pydantic_serializer__.to_json(self)
 
 # Quiz Models
 class QuizOption(BaseModel):
@@ -43,6 +61,24 @@ class Quiz(BaseModel):
         """Calculate total points for the quiz"""
         return sum(q.points for q in self.questions)
 
+class QuizSummary(ResponseModel):
+    """A quiz in the quiz list, with the current user's attempts"""
+    title: str
+    description: str = ''
+    question_count: int
+    total_points: int
+    created_by: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+    course_id: str
+    time_limit: Optional[Union[int, float]] = None
+    is_expired: bool = False
+    attempt_count: int = 0
+    submission_count: int = 0
+    last_activity_at: Optional[datetime] = None
+    user_stats: Dict[str, Any] = {}
+
 class QuizAttempt(BaseModel):
     """Student attempt at a quiz"""
     id: str
@@ -118,6 +154,23 @@ class WordCloud(BaseModel):
                     word_count[word] = word_count.get(word, 0) + 1
         return word_count
 
+class WordCloudSummary(ResponseModel):
+    """A word cloud in the word cloud list, with the current user's submissions"""
+    title: str
+    prompt: str
+    submission_count: int = 0
+    unique_words: Optional[int] = 0  # None while counts are approximate
+    counting_mode: str = 'exact'
+    last_activity_at: Optional[datetime] = None
+    created_by: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+    course_id: str
+    max_submissions_per_user: int
+    is_expired: bool = False
+    user_stats: Dict[str, int] = {}
+
 # Short Answer Models
 class ShortAnswerSubmission(BaseModel):
     """Student submission for a short answer question"""
@@ -7,6 +7,11 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db_connection
+from app.utils import scheduler
+from .feed_routes import decode_cursor, encode_cursor
+from .grading_queue import DEFAULT_LIMIT, MAX_LIMIT, format_row
+from .progress_heartbeats import heartbeat_coalescer
+from .services import LearningActivityService
 import logging
 
 # Set up logging
@@ -77,6 +82,14 @@ def create_activity():
                 activity_data['end_date'] = datetime.fromisoformat(data['end_date'])
             except ValueError:
                 return jsonify({'error': 'Invalid end_date format'}), 400
+
+        # A published activity is live between its start and end dates; the
+        # scheduler flips is_active as each of them passes
+        published = activity_data.pop('is_active')
+        if published:
+            activity_data.update(scheduler.initial_state('learning_activities', activity_data))
+        else:
+            activity_data['is_active'] = False
         
         # Route to the specific activity type creation function
         # This provides a unified API but still delegates to specialized handlers
@@ -109,6 +122,9 @@ def create_activity():
             if response and 'error' in response:
                 activities_collection.delete_one({'_id': activity_id})
                 return jsonify(response), 400
+
+            if published:
+                scheduler.schedule(db, 'learning_activities', activity_data)
             
             return jsonify({
                 'success': True,
@@ -124,6 +140,75 @@ def create_activity():
         logger.exception(f"Error creating activity: {e}")
         return jsonify({'error': str(e)}), 500
 
+@activities_bp.route('/activities/<activity_id>/progress', methods=['POST'])
+@jwt_required(locations=["cookies", "headers"])
+def record_progress(activity_id):
+    """Record the current student's progress; heartbeats are batched and written within a few seconds"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json() or {}
+
+        try:
+            progress_percentage = int(data.get('progress_percentage', 0))
+            time_spent = int(data.get('time_spent', 0))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'progress_percentage and time_spent must be integers'}), 400
+        if not 0 <= progress_percentage <= 100:
+            return jsonify({'error': 'progress_percentage must be between 0 and 100'}), 400
+        if time_spent < 0:
+            return jsonify({'error': 'time_spent cannot be negative'}), 400
+
+        if data.get('heartbeat'):
+            pending = heartbeat_coalescer.add(activity_id, user_id, progress_percentage, time_spent)
+            return jsonify({
+                'success': True,
+                'queued': True,
+                'pending_time_spent': pending['time_spent']
+            }), 202
+
+        progress = LearningActivityService.record_activity_progress(activity_id, user_id, progress_percentage, time_spent)
+        return jsonify({
+            'success': True,
+            'progress': {
+                'activity_id': progress['activity_id'],
+                'progress_percentage': progress['progress_percentage'],
+                'time_spent': progress['time_spent'],
+                'is_completed': progress['is_completed'],
+                'last_accessed': progress['last_accessed'].isoformat()
+            }
+        }), 200
+
+    except Exception as e:
+        logger.exception(f"Error recording progress: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@activities_bp.route('/grading-queue', methods=['GET'])
+@jwt_required(locations=["cookies", "headers"])
+def grading_queue():
+    """The current teacher's ungraded submissions, oldest first, one page per request"""
+    try:
+        user_id = get_jwt_identity()
+        limit = min(max(request.args.get('limit', DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+        after = None
+        if request.args.get('cursor'):
+            try:
+                after = decode_cursor(request.args['cursor'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+        rows, next_after = LearningActivityService.get_submissions_for_grading(
+            user_id, request.args.get('course_id'), after, limit
+        )
+        now = datetime.utcnow()
+        return jsonify({
+            'items': [format_row(row, now) for row in rows],
+            'next_cursor': encode_cursor(*next_after) if next_after else None
+        }), 200
+
+    except Exception as e:
+        logger.exception(f"Error getting grading queue: {e}")
+        return jsonify({'error': str(e)}), 500
+
 # Helper functions for each activity type
 def _create_quiz(db, activity_data, activity_id, data):
     """Create a quiz record"""
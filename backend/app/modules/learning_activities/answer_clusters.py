@@ -0,0 +1,116 @@
+"""
+COMP5241 Group 10 - Short Answer Clustering
+Groups similar short answers so teachers can grade them together
+
+Answers are turned into L2-normalized TF-IDF vectors over word unigrams and
+bigrams (character bigrams for CJK text), capped at MAX_FEATURES terms by
+document frequency. Cosine similarities come from one matrix product, and
+clusters are formed greedily: the answer with the most neighbours above the
+threshold becomes a cluster centre and takes all of its unassigned
+neighbours, then the next densest answer, and so on.
+
+Results are cached per (question, submission_version, threshold);
+submission_version changes whenever an answer is added or edited.
+"""
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .word_normalizer import normalize_text
+
+MAX_FEATURES = 4096
+DEFAULT_THRESHOLD = 0.6
+CACHE_ENTRIES = 64
+
+
+def tokenize(text: str) -> List[str]:
+    """Word unigrams and bigrams; CJK runs contribute character bigrams"""
+    tokens = []
+    words = []
+    for word in normalize_text(text).split():
+        if any('⺀' <= char <= '힯' for char in word):
+            tokens.extend(word[i:i + 2] for i in range(max(len(word) - 1, 1)))
+        else:
+            words.append(word)
+    tokens.extend(words)
+    tokens.extend(f'{a} {b}' for a, b in zip(words, words[1:]))
+    return tokens
+
+
+def tfidf_matrix(texts: List[str]) -> np.ndarray:
+    """(n_texts, n_features) float32 matrix of L2-normalized TF-IDF rows"""
+    documents = [Counter(tokenize(text)) for text in texts]
+    document_frequency = Counter(term for document in documents for term in document)
+    vocabulary = {term: index for index, (term, _) in enumerate(document_frequency.most_common(MAX_FEATURES))}
+
+    rows, cols, values = [], [], []
+    for row, document in enumerate(documents):
+        for term, count in document.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                rows.append(row)
+                cols.append(column)
+                values.append(count)
+
+    matrix = np.zeros((len(texts), len(vocabulary)), dtype=np.float32)
+    if values:
+        # Sublinear term frequency times smoothed inverse document frequency
+        frequencies = np.array([document_frequency[term] for term in vocabulary], dtype=np.float32)
+        idf = np.log((1 + len(texts)) / (1 + frequencies)) + 1
+        cols = np.array(cols)
+        matrix[np.array(rows), cols] = (1 + np.log(np.array(values, dtype=np.float32))) * idf[cols]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def cluster_texts(texts: List[str], threshold: float = DEFAULT_THRESHOLD) -> List[List[int]]:
+    """Group text indices whose cosine similarity to a cluster centre is >= threshold.
+
+    Clusters are returned largest first, each with its centre first;
+    answers with no close neighbour come back as single-member clusters.
+    """
+    if not texts:
+        return []
+
+    vectors = tfidf_matrix(texts)
+    neighbours = (vectors @ vectors.T) >= threshold
+    unassigned = np.ones(len(texts), dtype=bool)
+    # Number of unassigned neighbours per answer, updated as clusters are taken
+    degree = neighbours.sum(axis=1, dtype=np.int64)
+    clusters = []
+    while unassigned.any():
+        centre = int(np.argmax(np.where(unassigned, degree, -1)))
+        members = np.flatnonzero(neighbours[centre] & unassigned)
+        members = np.concatenate(([centre], members[members != centre]))
+        unassigned[members] = False
+        degree -= neighbours[:, members].sum(axis=1, dtype=np.int64)
+        clusters.append(members.tolist())
+    clusters.sort(key=len, reverse=True)
+    return clusters
+
+
+class ClusterCache:
+    """Bounded LRU of clusterings keyed by (question_id, submission_version, threshold)"""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, List[Dict]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        with self._lock:
+            clusters = self._entries.get(key)
+            if clusters is not None:
+                self._entries.move_to_end(key)
+            return clusters
+
+    def put(self, key: Tuple, clusters: List[Dict]):
+        with self._lock:
+            self._entries[key] = clusters
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+cluster_cache = ClusterCache()
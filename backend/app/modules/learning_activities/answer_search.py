@@ -0,0 +1,114 @@
+"""
+COMP5241 Group 10 - Short Answer Search
+Text index terms, query parsing and highlighting for short answer search
+
+Each submission stores a search_text field holding its answer as index
+terms: folded words, split on punctuation, reduced by the same light lemmatizer
+the word clouds use, with CJK runs split into overlapping character bigrams
+since CJK text has no spaces for the index to split on. The collection's
+text index uses language 'none' so MongoDB indexes these terms as given, and
+queries are converted with the same function, so both sides always agree.
+
+Queries accept plain words (any may match, ranked by relevance), "quoted
+phrases" (required) and -words (excluded). Highlights are character ranges
+in the original answer text.
+"""
+import re
+from typing import List, NamedTuple, Set, Tuple
+
+from .moderation import fold
+from .word_normalizer import lemmatize, normalize_text
+
+MAX_QUERY_LENGTH = 200
+
+_CJK = re.compile(r'[⺀-힯]+')
+_CJK_OR_OTHER = re.compile(r'[⺀-힯]+|[^⺀-힯]+')
+_QUERY_PART = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+_WORD = re.compile(r'[^\W_]+')
+_WORD_SEPARATORS = re.compile(r"[-']+")
+
+
+def _bigrams(run: str) -> List[str]:
+    return [run[i:i + 2] for i in range(max(len(run) - 1, 1))]
+
+
+def search_terms(text: str) -> List[str]:
+    """Index terms for text, in order"""
+    terms = []
+    for chunk in normalize_text(text).split():
+        for part in _CJK_OR_OTHER.findall(chunk):
+            if _CJK.fullmatch(part):
+                terms.extend(_bigrams(part))
+            else:
+                # The text index splits on hyphens and apostrophes too
+                terms.extend(lemmatize(word) for word in _WORD_SEPARATORS.split(part) if word)
+    return terms
+
+
+def search_field(text: str) -> str:
+    """Value stored in a submission's search_text field"""
+    return ' '.join(search_terms(text))
+
+
+class SearchQuery(NamedTuple):
+    search: str  # $text $search string
+    words: Set[str]  # Latin-script terms to highlight
+    cjk: List[str]  # CJK substrings to highlight
+
+
+def parse_query(query: str) -> SearchQuery:
+    """Convert a user query into a $text search string; raises ValueError if nothing is searchable"""
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f'Search query cannot exceed {MAX_QUERY_LENGTH} characters')
+
+    optional, required, excluded = [], [], []
+    words, cjk = set(), []
+    for match in _QUERY_PART.finditer(query):
+        negated = bool(match.group(1) or match.group(3))
+        quoted = match.group(2) is not None
+        text = match.group(2) if quoted else match.group(4)
+        terms = search_terms(text)
+        if not terms:
+            continue
+        if negated:
+            excluded.extend(terms)
+            continue
+        # A CJK word only matches as its whole run of bigrams
+        if quoted or any(_CJK.fullmatch(term) for term in terms):
+            required.append(' '.join(terms))
+        else:
+            optional.extend(terms)
+        for chunk in normalize_text(text).split():
+            cjk.extend(_CJK.findall(chunk))
+        words.update(term for term in terms if not _CJK.fullmatch(term))
+
+    if not optional and not required:
+        raise ValueError('Search query has no searchable words')
+    parts = [f'"{phrase}"' for phrase in required] + optional + [f'-{term}' for term in excluded]
+    return SearchQuery(' '.join(parts), words, cjk)
+
+
+def highlight(text: str, query: SearchQuery) -> List[Tuple[int, int]]:
+    """Sorted, merged (start, end) character ranges of query matches in text"""
+    folded = fold(text)
+    spans = []
+    for match in _WORD.finditer(folded):
+        for part in _CJK_OR_OTHER.finditer(match.group()):
+            start = match.start() + part.start()
+            if _CJK.fullmatch(part.group()):
+                for run in query.cjk:
+                    position = part.group().find(run)
+                    while position != -1:
+                        spans.append((start + position, start + position + len(run)))
+                        position = part.group().find(run, position + 1)
+                continue
+            if lemmatize(part.group()) in query.words:
+                spans.append((start, start + len(part.group())))
+
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,145 @@
+"""
+COMP5241 Group 10 - Poll Ballot Encoding and Tallying
+Compact ballot storage for multi-select and ranked-choice polls
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+POLL_TYPES = ('single', 'multiple', 'ranked')
+
+# A multi-select ballot is stored as a single int64 bitmask
+MAX_MULTI_SELECT_OPTIONS = 63
+# A ranked ballot is stored as one byte per preference; 0xFF marks an empty slot
+MAX_RANKED_OPTIONS = 255
+RANK_PAD = 0xFF
+
+
+def encode_selection(option_indices: Iterable[int], option_count: int) -> int:
+    """Pack a list of selected option indices into a bitmask.
+
+    Raises ValueError for out-of-range or duplicate indices.
+    """
+    if option_count > MAX_MULTI_SELECT_OPTIONS:
+        raise ValueError(f'Multi-select polls support at most {MAX_MULTI_SELECT_OPTIONS} options')
+
+    mask = 0
+    for index in option_indices:
+        if not isinstance(index, int) or isinstance(index, bool):
+            raise ValueError('Option indices must be integers')
+        if index < 0 or index >= option_count:
+            raise ValueError('Invalid option index')
+        bit = 1 << index
+        if mask & bit:
+            raise ValueError('Duplicate option index')
+        mask |= bit
+
+    if mask == 0:
+        raise ValueError('At least one option must be selected')
+    return mask
+
+
+def decode_selection(mask: int) -> List[int]:
+    """Return the option indices set in a bitmask, in ascending order."""
+    indices = []
+    index = 0
+    while mask:
+        if mask & 1:
+            indices.append(index)
+        mask >>= 1
+        index += 1
+    return indices
+
+
+def pack_ranking(ranking: Iterable[int], option_count: int) -> bytes:
+    """Pack a preference order (most preferred first) into one byte per rank.
+
+    Partial rankings are allowed; raises ValueError for out-of-range or
+    repeated options.
+    """
+    if option_count > MAX_RANKED_OPTIONS:
+        raise ValueError(f'Ranked polls support at most {MAX_RANKED_OPTIONS} options')
+
+    ranking = list(ranking)
+    if not ranking:
+        raise ValueError('Ranking must include at least one option')
+
+    seen = set()
+    for index in ranking:
+        if not isinstance(index, int) or isinstance(index, bool):
+            raise ValueError('Option indices must be integers')
+        if index < 0 or index >= option_count:
+            raise ValueError('Invalid option index')
+        if index in seen:
+            raise ValueError('Each option can only be ranked once')
+        seen.add(index)
+
+    return bytes(ranking)
+
+
+def unpack_rankings(packed_ballots: Iterable[bytes], option_count: int) -> np.ndarray:
+    """Build an (n_ballots, option_count) uint8 matrix from packed rankings.
+
+    Short rankings are right-padded with RANK_PAD.
+    """
+    width = max(option_count, 1)
+    pad = bytes([RANK_PAD])
+    # Pad every ballot to a fixed width so the whole set is one contiguous buffer
+    buffer = b''.join(bytes(packed)[:width].ljust(width, pad) for packed in packed_ballots)
+    return np.frombuffer(buffer, dtype=np.uint8).reshape(-1, width).copy()
+
+
+def instant_runoff(ballots: np.ndarray, option_count: int) -> Dict:
+    """Run an instant-runoff count over a ballot matrix from unpack_rankings.
+
+    Each round counts every ballot for its highest-ranked option that is
+    still in the race. An option with a strict majority of the continuing
+    ballots wins; otherwise the option with the fewest votes is eliminated.
+    Ties for elimination are broken by fewer first-preference votes, then
+    by the higher option index.
+
+    Returns {'winner': index or None, 'rounds': [{'counts', 'eliminated',
+    'continuing_ballots', 'exhausted_ballots'}, ...]}.
+    """
+    rounds = []
+    if option_count == 0 or ballots.shape[0] == 0:
+        return {'winner': None, 'rounds': rounds}
+
+    # Lookup table over every byte value so RANK_PAD is never "in the race"
+    in_race = np.zeros(256, dtype=bool)
+    in_race[:option_count] = True
+    rows = np.arange(ballots.shape[0])
+    first_preferences: Optional[np.ndarray] = None
+
+    while True:
+        valid = in_race[ballots]
+        has_choice = valid.any(axis=1)
+        top_column = valid.argmax(axis=1)
+        choices = ballots[rows[has_choice], top_column[has_choice]]
+        counts = np.bincount(choices, minlength=option_count)[:option_count]
+        if first_preferences is None:
+            first_preferences = counts.copy()
+
+        continuing = int(has_choice.sum())
+        remaining = np.flatnonzero(in_race[:option_count])
+        round_info = {
+            'counts': counts.tolist(),
+            'eliminated': None,
+            'continuing_ballots': continuing,
+            'exhausted_ballots': int(ballots.shape[0] - continuing)
+        }
+        rounds.append(round_info)
+
+        if continuing == 0:
+            return {'winner': None, 'rounds': rounds}
+
+        leader = int(remaining[np.argmax(counts[remaining])])
+        if counts[leader] * 2 > continuing or len(remaining) == 1:
+            return {'winner': leader, 'rounds': rounds}
+
+        # lexsort uses the last key as primary: fewest votes, then fewest
+        # first preferences, then the highest index
+        order = np.lexsort((-remaining, first_preferences[remaining], counts[remaining]))
+        eliminated = int(remaining[order[0]])
+        round_info['eliminated'] = eliminated
+        in_race[eliminated] = False
@@ -0,0 +1,242 @@
+"""
+COMP5241 Group 10 - Cascade Delete Jobs
+Background hard deletes of an activity and everything that depends on it
+
+RELATIONSHIPS is the one map of which collections hold documents that
+belong to a document in another collection. A delete job walks it from the
+activity being removed, deleting descendants before their parents in
+batches of BATCH_SIZE, so a parent is only removed once nothing still points
+at it. Every step is idempotent: a job interrupted by a crash or an error
+is picked up again once its lease expires and simply continues with
+whatever is left. After MAX_ATTEMPTS attempts it is marked failed instead,
+keeping its last error, and sending the delete again queues a new job.
+
+Jobs live in the delete_jobs collection. Enqueuing marks the activity as
+being deleted (so it disappears from lists straight away), stores the job
+and wakes the worker; the request returns without waiting. Each batch adds
+to the job's per-collection deleted counts, which is the progress a client
+polls for.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from config.database import get_db_connection
+from .leaderboard_cache import leaderboard_cache
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+LEASE_SECONDS = 60
+POLL_INTERVAL_SECONDS = 30
+MAX_ATTEMPTS = 5
+
+# Activity type -> the collection its documents live in
+ROOTS = {
+    'activity': 'learning_activities',
+    'poll': 'polls',
+    'quiz': 'quizzes',
+    'wordcloud': 'word_clouds',
+    'shortanswer': 'short_answer_questions',
+    'minigame': 'mini_games',
+}
+
+# Collection -> (dependent collection, field holding the parent's ID); the
+# field may hold the ID as a string or an ObjectId, both are matched
+RELATIONSHIPS: Dict[str, List[Tuple[str, str]]] = {
+    'learning_activities': [
+        ('activity_progress', 'activity_id'),
+        ('activity_submissions', 'activity_id'),
+        # Type records written by the generic create endpoint (activity_routes.py)
+        ('quizzes', 'activity_id'),
+        ('polls', 'activity_id'),
+        ('wordclouds', 'activity_id'),
+        ('shortanswers', 'activity_id'),
+        ('minigames', 'activity_id'),
+        ('scheduled_transitions', 'document_id'),
+    ],
+    'polls': [
+        ('votes', 'poll_id'),
+        ('scheduled_transitions', 'document_id'),
+    ],
+    'quizzes': [
+        ('quiz_attempts', 'quiz_id'),
+        ('scheduled_transitions', 'document_id'),
+    ],
+    'word_clouds': [
+        ('wordcloud_submissions', 'wordcloud_id'),
+        ('wordcloud_word_counts', 'wordcloud_id'),
+        ('wordcloud_sketches', 'wordcloud_id'),
+        ('wordcloud_participants', 'wordcloud_id'),
+        ('scheduled_transitions', 'document_id'),
+    ],
+    'short_answer_questions': [
+        ('shortanswer_submissions', 'question_id'),
+        ('shortanswer_stats', '_id'),
+        ('scheduled_transitions', 'document_id'),
+    ],
+    'mini_games': [
+        ('minigame_plays', 'minigame_id'),
+        ('minigame_best_scores', 'minigame_id'),
+        ('scheduled_transitions', 'document_id'),
+    ],
+}
+
+
+def enqueue(db, activity_type: str, activity: Dict, user_id: str) -> ObjectId:
+    """Hide the activity and queue its hard delete; returns the job ID"""
+    collection = ROOTS[activity_type]
+    now = datetime.utcnow()
+    hidden = {'is_active': False, 'deleting': True}
+    if collection == 'learning_activities':
+        hidden['status'] = 'deleting'
+    db[collection].update_one({'_id': activity['_id']}, {'$set': hidden})
+
+    return db.delete_jobs.insert_one({
+        'collection': collection,
+        'document_id': activity['_id'],
+        'course_id': activity.get('course_id'),
+        'created_by': user_id,
+        'status': 'queued',
+        'deleted': {},
+        'attempts': 0,
+        'created_at': now,
+        'updated_at': now,
+        'lease_until': None
+    }).inserted_id
+
+
+def _fail(db, query: Dict, now: datetime):
+    db.delete_jobs.update_many(query, {
+        '$set': {'status': 'failed', 'finished_at': now, 'updated_at': now, 'lease_until': None}
+    })
+
+
+def claim_job(db, now: Optional[datetime] = None) -> Optional[Dict]:
+    """Take the oldest queued job, or a running one whose worker stopped renewing its lease"""
+    now = now or datetime.utcnow()
+    # A job whose worker died on its last attempt is not retried
+    _fail(db, {'status': 'running', 'lease_until': {'$lt': now}, 'attempts': {'$gte': MAX_ATTEMPTS}}, now)
+    return db.delete_jobs.find_one_and_update(
+        {'$or': [
+            {'status': 'queued'},
+            {'status': 'running', 'lease_until': {'$lt': now}, 'attempts': {'$lt': MAX_ATTEMPTS}}
+        ]},
+        {
+            '$set': {'status': 'running', 'lease_until': now + timedelta(seconds=LEASE_SECONDS), 'updated_at': now},
+            '$inc': {'attempts': 1}
+        },
+        sort=[('created_at', 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _report(db, job_id: ObjectId, collection: str, deleted: int):
+    now = datetime.utcnow()
+    db.delete_jobs.update_one({'_id': job_id}, {
+        '$inc': {f'deleted.{collection}': deleted},
+        '$set': {'current': collection, 'updated_at': now, 'lease_until': now + timedelta(seconds=LEASE_SECONDS)}
+    })
+
+
+def _purge(db, job_id: ObjectId, collection: str, query: Dict):
+    """Delete every document matching query, each one's dependents first"""
+    dependents = RELATIONSHIPS.get(collection, [])
+    while True:
+        ids = [doc['_id'] for doc in db[collection].find(query, {'_id': 1}).limit(BATCH_SIZE)]
+        if not ids:
+            return
+        if dependents:
+            keys = ids + [str(document_id) for document_id in ids]
+            for dependent, field in dependents:
+                _purge(db, job_id, dependent, {field: {'$in': keys}})
+        deleted = db[collection].delete_many({'_id': {'$in': ids}}).deleted_count
+        if collection == 'mini_games':
+            for document_id in ids:
+                leaderboard_cache.invalidate(str(document_id))
+        _report(db, job_id, collection, deleted)
+
+
+def run_job(db, job: Dict):
+    """Delete everything under the job's document, then mark the job done"""
+    _purge(db, job['_id'], job['collection'], {'_id': job['document_id']})
+    if job.get('course_id'):
+        # Course rollups counted the deleted work; they are rebuilt on next use
+        db.course_progress.delete_many({'course_id': job['course_id']})
+    now = datetime.utcnow()
+    db.delete_jobs.update_one({'_id': job['_id']}, {
+        '$set': {'status': 'done', 'finished_at': now, 'updated_at': now, 'lease_until': None},
+        '$unset': {'current': ''}
+    })
+
+
+def run_next(db) -> bool:
+    """Claim and run one job; returns False when there was nothing to do"""
+    job = claim_job(db)
+    if job is None:
+        return False
+    try:
+        run_job(db, job)
+    except Exception as e:
+        # Left running: the job is retried from where it stopped once the lease expires,
+        # unless this was its last attempt
+        logger.error(f"Delete job {job['_id']} stopped (attempt {job['attempts']} of {MAX_ATTEMPTS}): {str(e)}")
+        now = datetime.utcnow()
+        db.delete_jobs.update_one({'_id': job['_id']}, {'$set': {'error': str(e), 'updated_at': now}})
+        if job['attempts'] >= MAX_ATTEMPTS:
+            _fail(db, {'_id': job['_id']}, now)
+    return True
+
+
+def progress(job: Dict) -> Dict:
+    return {
+        'job_id': str(job['_id']),
+        'status': job['status'],
+        'collection': job['collection'],
+        'document_id': str(job['document_id']),
+        'deleted': job.get('deleted', {}),
+        'deleted_total': sum(job.get('deleted', {}).values()),
+        'current': job.get('current'),
+        'attempts': job.get('attempts', 0),
+        'max_attempts': MAX_ATTEMPTS,
+        'error': job.get('error'),
+        'created_at': job['created_at'].isoformat(),
+        'finished_at': job['finished_at'].isoformat() if job.get('finished_at') else None
+    }
+
+
+class CascadeDeleteWorker:
+    """Background thread running delete jobs, woken when one is queued"""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while True:
+            try:
+                with get_db_connection() as client:
+                    db = client['comp5241_g10']
+                    while run_next(db):
+                        pass
+            except Exception as e:
+                logger.error(f"Error running delete jobs: {str(e)}")
+            # Also polls, to resume jobs whose worker died
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def wake(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='cascade-delete', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+
+cascade_delete_worker = CascadeDeleteWorker()
@@ -0,0 +1,230 @@
+"""
+COMP5241 Group 10 - Course Progress Rollups
+Per-student summary of progress across all of a course's activities
+
+One course_progress document per (student, course) holds completion counts
+per activity kind, total time spent, the count and sum of scores (for the
+average) and the last access time. The write paths adjust it with a single
+$inc/$max update as progress is recorded, quizzes are submitted and short
+answers are submitted or graded, so dashboards read one document per course
+instead of scanning every activity.
+
+A rollup that does not exist yet is built from the source collections by
+the first write or read that needs it, which covers students whose activity
+predates rollups; deleting a rollup forces a rebuild. Whenever completions
+change, or a read finds the course's activity total has moved, the
+percentage is recomputed and copied to the enrollment's progress_percentage.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from .grading_stats import graded_score
+
+# Completion kind -> activity collection counted toward the course total
+COMPLETION_SOURCES = {
+    'activity': 'learning_activities',
+    'quiz': 'quizzes',
+    'shortanswer': 'short_answer_questions',
+}
+
+
+def _key(course_id: str, student_id: str) -> Dict:
+    return {'course_id': course_id, 'student_id': student_id}
+
+
+def activity_courses(db, activity_ids: Iterable[str]) -> Dict[str, str]:
+    """Course of each learning activity, keyed by activity ID string; unknown IDs are left out"""
+    object_ids = []
+    for activity_id in set(activity_ids):
+        try:
+            object_ids.append(ObjectId(activity_id))
+        except (InvalidId, TypeError):
+            continue
+    if not object_ids:
+        return {}
+    return {
+        str(activity['_id']): activity['course_id']
+        for activity in db.learning_activities.find({'_id': {'$in': object_ids}}, {'course_id': 1})
+        if activity.get('course_id')
+    }
+
+
+def claim_completion(db, activity_id: str, student_id: str) -> bool:
+    """True exactly once per progress record, the first time it is seen completed"""
+    return db.activity_progress.update_one(
+        {'activity_id': activity_id, 'student_id': student_id,
+         'is_completed': True, 'completion_counted': {'$ne': True}},
+        {'$set': {'completion_counted': True}}
+    ).modified_count == 1
+
+
+def course_activity_totals(db, course_ids: List[str]) -> Dict[str, int]:
+    """Number of active activities in each course, across every completion kind"""
+    totals = {course_id: 0 for course_id in course_ids}
+    for collection in COMPLETION_SOURCES.values():
+        for group in db[collection].aggregate([
+            {'$match': {'course_id': {'$in': course_ids}, 'is_active': True}},
+            {'$group': {'_id': '$course_id', 'count': {'$sum': 1}}}
+        ]):
+            totals[group['_id']] += group['count']
+    return totals
+
+
+def _percentage(rollup: Dict, total: int) -> int:
+    if not total:
+        return 0
+    return min(100, round(100 * sum(rollup.get('completed', {}).values()) / total))
+
+
+def refresh_percentage(db, rollup: Dict, total: Optional[int] = None) -> int:
+    """Recompute a rollup's percentage and copy it to the enrollment when it changed"""
+    if total is None:
+        total = course_activity_totals(db, [rollup['course_id']])[rollup['course_id']]
+    percentage = _percentage(rollup, total)
+    if rollup.get('progress_percentage') != percentage:
+        key = _key(rollup['course_id'], rollup['student_id'])
+        db.course_progress.update_one(key, {'$set': {'progress_percentage': percentage}})
+        db.course_enrollments.update_one(key, {'$set': {'progress_percentage': percentage}})
+        rollup['progress_percentage'] = percentage
+    return percentage
+
+
+def rebuild(db, course_id: str, student_id: str) -> Dict:
+    """Recompute one rollup from the source collections and store it"""
+    rollup = dict(_key(course_id, student_id), completed={kind: 0 for kind in COMPLETION_SOURCES},
+                  time_spent=0, score_count=0, score_sum=0.0, last_accessed=None)
+
+    def touch(at):
+        if at and (rollup['last_accessed'] is None or at > rollup['last_accessed']):
+            rollup['last_accessed'] = at
+
+    def add_score(score):
+        if score is not None:
+            rollup['score_count'] += 1
+            rollup['score_sum'] += float(score)
+
+    activity_ids = [str(a['_id']) for a in db.learning_activities.find({'course_id': course_id}, {'_id': 1})]
+    progress_query = {'student_id': student_id, 'activity_id': {'$in': activity_ids}}
+    # Records written before rollups existed get their course and are marked as counted
+    db.activity_progress.update_many(progress_query, {'$set': {'course_id': course_id}})
+    db.activity_progress.update_many(dict(progress_query, is_completed=True), {'$set': {'completion_counted': True}})
+    for progress in db.activity_progress.find(progress_query, {'is_completed': 1, 'time_spent': 1, 'last_accessed': 1}):
+        rollup['completed']['activity'] += bool(progress.get('is_completed'))
+        rollup['time_spent'] += progress.get('time_spent', 0)
+        touch(progress.get('last_accessed'))
+
+    quiz_ids = [str(q['_id']) for q in db.quizzes.find({'course_id': course_id}, {'_id': 1})]
+    completed_quizzes = set()
+    for attempt in db.quiz_attempts.find(
+        {'quiz_id': {'$in': quiz_ids}, 'student_id': student_id, 'is_submitted': True},
+        {'quiz_id': 1, 'score': 1, 'completed_at': 1}
+    ):
+        # A quiz is completed once however many attempts were submitted
+        completed_quizzes.add(attempt['quiz_id'])
+        add_score(attempt.get('score'))
+        touch(attempt.get('completed_at'))
+    rollup['completed']['quiz'] = len(completed_quizzes)
+
+    for submission in db.shortanswer_submissions.find(
+        {'course_id': course_id, 'submitted_by': student_id},
+        {'is_graded': 1, 'score': 1, 'submitted_at': 1}
+    ):
+        rollup['completed']['shortanswer'] += 1
+        add_score(graded_score(submission))
+        touch(submission.get('submitted_at'))
+
+    rollup['updated_at'] = datetime.utcnow()
+    db.course_progress.replace_one(_key(course_id, student_id), rollup, upsert=True)
+    refresh_percentage(db, rollup)
+    return rollup
+
+
+class ProgressDelta:
+    """Accumulated changes to the rollups of one course's students"""
+
+    def __init__(self, course_id: Optional[str]):
+        self.course_id = course_id
+        self.inc: Dict[str, Dict[str, float]] = {}
+        self.touched: Dict[str, datetime] = {}
+
+    def _add(self, student_id: str, field: str, value: float):
+        fields = self.inc.setdefault(student_id, {})
+        fields[field] = fields.get(field, 0) + value
+
+    def completed(self, student_id: str, kind: str, count: int = 1):
+        self._add(student_id, f'completed.{kind}', count)
+
+    def time_spent(self, student_id: str, seconds: int):
+        self._add(student_id, 'time_spent', seconds)
+
+    def score(self, student_id: str, old_score: Optional[float], new_score: Optional[float]):
+        """Replace one score (None = no score) in the student's average"""
+        if old_score == new_score:
+            return
+        if old_score is not None:
+            self._add(student_id, 'score_count', -1)
+            self._add(student_id, 'score_sum', -float(old_score))
+        if new_score is not None:
+            self._add(student_id, 'score_count', 1)
+            self._add(student_id, 'score_sum', float(new_score))
+
+    def touch(self, student_id: str, at: datetime):
+        if at and (student_id not in self.touched or at > self.touched[student_id]):
+            self.touched[student_id] = at
+
+    def progress(self, db, activity_id: str, student_id: str, progress_percentage: int, time_spent: int, at: datetime):
+        """Count one written progress update; the first one to reach 100% counts the completion"""
+        self.time_spent(student_id, time_spent)
+        self.touch(student_id, at)
+        if progress_percentage >= 100 and claim_completion(db, activity_id, student_id):
+            self.completed(student_id, 'activity')
+
+    def apply(self, db):
+        if not self.course_id:
+            return
+        for student_id in set(self.inc) | set(self.touched):
+            inc = {field: value for field, value in self.inc.get(student_id, {}).items() if value}
+            update = {'$inc': inc} if inc else {}
+            if student_id in self.touched:
+                update['$max'] = {'last_accessed': self.touched[student_id]}
+            if not update:
+                continue
+            result = db.course_progress.update_one(_key(self.course_id, student_id), update)
+            if not result.matched_count:
+                # No rollup yet: build it from the sources, which already include this change
+                rebuild(db, self.course_id, student_id)
+            elif any(field.startswith('completed.') for field in inc):
+                refresh_percentage(db, db.course_progress.find_one(_key(self.course_id, student_id)))
+
+
+def read(db, student_id: str, course_ids: List[str]) -> List[Dict]:
+    """Rollups for a student's courses, building any that are missing and refreshing percentages"""
+    rollups = {
+        rollup['course_id']: rollup
+        for rollup in db.course_progress.find({'student_id': student_id, 'course_id': {'$in': course_ids}})
+    }
+    totals = course_activity_totals(db, course_ids)
+    result = []
+    for course_id in course_ids:
+        rollup = rollups.get(course_id) or rebuild(db, course_id, student_id)
+        refresh_percentage(db, rollup, totals[course_id])
+        result.append(rollup)
+    return result
+
+
+def summarize(rollup: Dict) -> Dict:
+    completed = rollup.get('completed', {})
+    score_count = rollup.get('score_count', 0)
+    return {
+        'course_id': rollup['course_id'],
+        'progress_percentage': rollup.get('progress_percentage', 0),
+        'completed': {kind: completed.get(kind, 0) for kind in COMPLETION_SOURCES},
+        'completed_total': sum(completed.values()),
+        'time_spent': rollup.get('time_spent', 0),
+        'average_score': round(rollup.get('score_sum', 0) / score_count, 1) if score_count else None,
+        'scored_count': score_count,
+        'last_accessed': rollup['last_accessed'].isoformat() if rollup.get('last_accessed') else None
+    }
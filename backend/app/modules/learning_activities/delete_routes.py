@@ -0,0 +1,88 @@
+"""
+COMP5241 Group 10 - Activity Delete Routes
+Queue hard deletes of activities and report their progress
+
+Deletion runs in the background (see cascade_delete.py): the DELETE request
+hides the activity, queues a job and returns 202 with a URL to poll. A job
+that keeps failing ends as 'failed' with its last error; sending the DELETE
+again queues a fresh job for whatever is left.
+"""
+from flask import Blueprint, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from bson import ObjectId
+from bson.errors import InvalidId
+from config.database import get_db_connection
+from . import cascade_delete
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+delete_bp = Blueprint('delete', __name__)
+
+
+# Permanently delete an activity and everything that belongs to it (creator only)
+@delete_bp.route('/activities/<activity_type>/<activity_id>', methods=['DELETE'])
+@jwt_required(locations=["cookies", "headers"])
+def delete_activity(activity_type, activity_id):
+    try:
+        user_id = get_jwt_identity()
+        if activity_type not in cascade_delete.ROOTS:
+            return jsonify({'error': f'activity_type must be one of: {", ".join(cascade_delete.ROOTS)}'}), 400
+        try:
+            object_id = ObjectId(activity_id)
+        except InvalidId:
+            return jsonify({'error': 'Invalid activity ID'}), 400
+
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            activity = db[cascade_delete.ROOTS[activity_type]].find_one(
+                {'_id': object_id}, {'created_by': 1, 'course_id': 1}
+            )
+            if not activity:
+                return jsonify({'error': 'Activity not found'}), 404
+            if activity.get('created_by') != user_id:
+                return jsonify({'error': 'Only the creator can delete this activity'}), 403
+
+            existing = db.delete_jobs.find_one(
+                {'document_id': object_id, 'status': {'$in': ['queued', 'running']}}, {'_id': 1}
+            )
+            job_id = existing['_id'] if existing else cascade_delete.enqueue(db, activity_type, activity, user_id)
+
+        if not current_app.config.get('TESTING'):
+            cascade_delete.cascade_delete_worker.wake()
+
+        logger.info(f"Delete job {job_id} queued for {activity_type} {activity_id} by user {user_id}")
+        return jsonify({
+            'message': 'Delete queued',
+            'job_id': str(job_id),
+            'status_url': f'/api/learning/delete-jobs/{job_id}'
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Error queuing delete: {str(e)}")
+        return jsonify({'error': 'Failed to queue delete', 'details': str(e)}), 500
+
+
+# Progress of a delete job (the user who queued it): queued, running, done or failed
+@delete_bp.route('/delete-jobs/<job_id>', methods=['GET'])
+@jwt_required(locations=["cookies", "headers"])
+def delete_job_status(job_id):
+    try:
+        user_id = get_jwt_identity()
+        try:
+            object_id = ObjectId(job_id)
+        except InvalidId:
+            return jsonify({'error': 'Invalid job ID'}), 400
+
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            job = db.delete_jobs.find_one({'_id': object_id})
+        if not job or job.get('created_by') != user_id:
+            return jsonify({'error': 'Delete job not found'}), 404
+
+        return jsonify(cascade_delete.progress(job)), 200
+
+    except Exception as e:
+        logger.error(f"Error getting delete job: {str(e)}")
+        return jsonify({'error': 'Failed to get delete job', 'details': str(e)}), 500
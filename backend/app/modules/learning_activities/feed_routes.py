@@ -0,0 +1,180 @@
+"""
+COMP5241 Group 10 - Course Activity Feed Routes
+One paginated list of every activity type in a course
+
+The feed is a single aggregation: it starts on polls and pulls in the other
+activity collections with $unionWith. Every branch projects the same shape,
+applies the page cursor and limit before looking up the current user's own
+records, so the per-user status lookups only run for rows that can make the
+page. Pages use keyset cursors on (sort value, _id) rather than skip counts.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from bson import ObjectId
+from bson.errors import InvalidId
+from config.database import get_db_connection
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+feed_bp = Blueprint('feed', __name__, url_prefix='/courses')
+
+# activity_type -> collection, title field, and where the user's own records live
+FEED_SOURCES = {
+    'poll': {'collection': 'polls', 'title': '$question',
+             'records': 'votes', 'activity_field': 'poll_id', 'user_field': 'student_id'},
+    'quiz': {'collection': 'quizzes', 'title': '$title',
+             'records': 'quiz_attempts', 'activity_field': 'quiz_id', 'user_field': 'student_id'},
+    'wordcloud': {'collection': 'word_clouds', 'title': '$title',
+                  'records': 'wordcloud_submissions', 'activity_field': 'wordcloud_id', 'user_field': 'submitted_by'},
+    'shortanswer': {'collection': 'short_answer_questions', 'title': '$question',
+                    'records': 'shortanswer_submissions', 'activity_field': 'question_id', 'user_field': 'submitted_by'},
+    'minigame': {'collection': 'mini_games', 'title': '$title',
+                 'records': 'minigame_best_scores', 'activity_field': 'minigame_id', 'user_field': 'student_id'},
+}
+
+# sort name -> (field the sort value comes from, direction)
+FEED_SORTS = {'created': ('$created_at', -1), 'due': ('$expires_at', 1)}
+# Activities without a due date come last when sorting by due date
+NO_DUE_DATE = datetime(9999, 12, 31)
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def encode_cursor(sort_at: datetime, activity_id: ObjectId) -> str:
+    raw = json.dumps([sort_at.isoformat(), str(activity_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """(sort_at, _id) from a cursor; raises ValueError when it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_at, activity_id = json.loads(raw)
+        return datetime.fromisoformat(sort_at), ObjectId(activity_id)
+    except (ValueError, TypeError, InvalidId, json.JSONDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _branch(activity_type, course_id, user_id, sort, after, limit, now):
+    """Pipeline turning one activity collection into feed rows for one page"""
+    source = FEED_SOURCES[activity_type]
+    sort_field, direction = FEED_SORTS[sort]
+    beyond = '$lt' if direction < 0 else '$gt'
+
+    pipeline = [
+        {'$match': {'course_id': course_id, 'is_active': True}},
+        {'$project': {
+            'activity_type': {'$literal': activity_type},
+            'title': source['title'],
+            'description': {'$ifNull': ['$description', '']},
+            'created_by': 1,
+            'created_at': 1,
+            'due_at': '$expires_at',
+            'sort_at': {'$ifNull': [sort_field, NO_DUE_DATE]} if sort == 'due' else sort_field
+        }}
+    ]
+    if after:
+        sort_at, activity_id = after
+        pipeline.append({'$match': {'$or': [
+            {'sort_at': {beyond: sort_at}},
+            {'sort_at': sort_at, '_id': {beyond: activity_id}}
+        ]}})
+    pipeline += [
+        {'$sort': {'sort_at': direction, '_id': direction}},
+        {'$limit': limit + 1},
+        # The user's own records for this activity; quiz attempts say whether they were submitted
+        {'$lookup': {
+            'from': source['records'],
+            'let': {'activity_id': {'$toString': '$_id'}},
+            'pipeline': [
+                {'$match': {'$expr': {'$and': [
+                    {'$eq': [f"${source['activity_field']}", '$$activity_id']},
+                    {'$eq': [f"${source['user_field']}", user_id]}
+                ]}}},
+                {'$project': {'_id': 0, 'submitted': {'$ifNull': ['$is_submitted', True]}}}
+            ],
+            'as': 'own_records'
+        }},
+        {'$addFields': {
+            'attempted': {'$gt': [{'$size': '$own_records'}, 0]},
+            'submitted': {'$in': [True, '$own_records.submitted']},
+            'expired': {'$and': [{'$ne': [{'$ifNull': ['$due_at', None]}, None]}, {'$lt': ['$due_at', now]}]}
+        }},
+        {'$project': {'own_records': 0}}
+    ]
+    return pipeline
+
+
+def feed_pipeline(course_id, user_id, sort='created', after=None, limit=DEFAULT_LIMIT, now=None):
+    """The full feed aggregation, run on the polls collection"""
+    now = now or datetime.utcnow()
+    branches = {activity_type: _branch(activity_type, course_id, user_id, sort, after, limit, now)
+                for activity_type in FEED_SOURCES}
+    _, direction = FEED_SORTS[sort]
+
+    pipeline = list(branches.pop('poll'))
+    for activity_type, branch in branches.items():
+        pipeline.append({'$unionWith': {'coll': FEED_SOURCES[activity_type]['collection'], 'pipeline': branch}})
+    pipeline += [
+        {'$sort': {'sort_at': direction, '_id': direction}},
+        {'$limit': limit + 1}
+    ]
+    return pipeline
+
+
+def format_item(row):
+    return {
+        'id': str(row['_id']),
+        'activity_type': row['activity_type'],
+        'title': row.get('title'),
+        'description': row.get('description', ''),
+        'created_by': row.get('created_by'),
+        'created_at': row['created_at'].isoformat() if row.get('created_at') else None,
+        'due_at': row['due_at'].isoformat() if row.get('due_at') else None,
+        'status': {
+            'submitted': row['submitted'],
+            'attempted': row['attempted'],
+            'expired': row['expired']
+        }
+    }
+
+
+# Every activity in a course, newest first or by due date, one page at a time
+@feed_bp.route('/<course_id>/feed', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def course_feed(course_id):
+    try:
+        user_id = get_jwt_identity()
+        sort = request.args.get('sort', 'created')
+        if sort not in FEED_SORTS:
+            return jsonify({'error': f'sort must be one of: {", ".join(FEED_SORTS)}'}), 400
+        limit = min(max(request.args.get('limit', DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+        after = None
+        if request.args.get('cursor'):
+            try:
+                after = decode_cursor(request.args['cursor'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            rows = list(db.polls.aggregate(feed_pipeline(course_id, user_id, sort, after, limit)))
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return jsonify({
+            'course_id': course_id,
+            'sort': sort,
+            'items': [format_item(row) for row in rows],
+            'next_cursor': encode_cursor(rows[-1]['sort_at'], rows[-1]['_id']) if has_more else None
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error building course feed: {str(e)}")
+        return jsonify({'error': 'Failed to load course feed', 'details': str(e)}), 500
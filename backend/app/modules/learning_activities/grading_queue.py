@@ -0,0 +1,107 @@
+"""
+COMP5241 Group 10 - Grading Queue
+A teacher's ungraded submissions, oldest first, one page at a time
+
+The queue is one aggregation. It starts from the teacher's activities (which
+carry the title and type shown for each row) and looks up each activity's
+ungraded submissions, applying the page cursor, sort and limit inside the
+lookup so the compound (parent, state, submitted_at) index serves it and no
+activity contributes more than one page. Short answer questions are pulled
+in with $unionWith; the merged rows are sorted once more and cut to the page.
+Pages use keyset cursors on (submitted_at, _id), shared with the course feed.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+
+# Where each kind of gradable work lives: the activity collection (with its
+# title and type), its submissions, the field linking them, and what ungraded means
+QUEUE_SOURCES = {
+    'activity': {
+        'collection': 'learning_activities', 'title': '$title', 'type': '$activity_type',
+        'submissions': 'activity_submissions', 'parent_field': 'activity_id',
+        'student_field': 'student_id', 'ungraded': {'status': 'submitted'}
+    },
+    'shortanswer': {
+        'collection': 'short_answer_questions', 'title': '$question', 'type': {'$literal': 'shortanswer'},
+        'submissions': 'shortanswer_submissions', 'parent_field': 'question_id',
+        'student_field': 'submitted_by', 'ungraded': {'is_graded': False}
+    },
+}
+
+
+def _branch(source: Dict, teacher_id: str, course_id: Optional[str], after: Optional[Tuple[datetime, ObjectId]],
+            limit: int) -> List[Dict]:
+    """Pipeline turning one activity collection into queue rows for one page"""
+    match = {'created_by': teacher_id, 'deleting': {'$ne': True}}
+    if course_id:
+        match['course_id'] = course_id
+
+    pending = [
+        {'$match': dict(source['ungraded'], **{'$expr': {'$eq': [f"${source['parent_field']}", '$$activity_id']}})}
+    ]
+    if after:
+        submitted_at, submission_id = after
+        pending.append({'$match': {'$or': [
+            {'submitted_at': {'$gt': submitted_at}},
+            {'submitted_at': submitted_at, '_id': {'$gt': submission_id}}
+        ]}})
+    pending += [
+        {'$sort': {'submitted_at': 1, '_id': 1}},
+        {'$limit': limit + 1},
+        {'$project': {'student_id': f"${source['student_field']}", 'submitted_at': 1}}
+    ]
+
+    return [
+        {'$match': match},
+        {'$lookup': {
+            'from': source['submissions'],
+            'let': {'activity_id': {'$toString': '$_id'}},
+            'pipeline': pending,
+            'as': 'pending'
+        }},
+        {'$unwind': '$pending'},
+        {'$project': {
+            '_id': '$pending._id',
+            'submitted_at': '$pending.submitted_at',
+            'student_id': '$pending.student_id',
+            'activity_id': {'$toString': '$_id'},
+            'activity_title': source['title'],
+            'activity_type': source['type'],
+            'course_id': 1
+        }}
+    ]
+
+
+def queue_pipeline(teacher_id: str, course_id: Optional[str] = None, after=None, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+    """The full queue aggregation, run on learning_activities"""
+    pipeline = _branch(QUEUE_SOURCES['activity'], teacher_id, course_id, after, limit)
+    for kind, source in QUEUE_SOURCES.items():
+        if kind != 'activity':
+            pipeline.append({'$unionWith': {
+                'coll': source['collection'],
+                'pipeline': _branch(source, teacher_id, course_id, after, limit)
+            }})
+    pipeline += [
+        {'$sort': {'submitted_at': 1, '_id': 1}},
+        {'$limit': limit + 1}
+    ]
+    return pipeline
+
+
+def format_row(row: Dict, now: Optional[datetime] = None) -> Dict:
+    now = now or datetime.utcnow()
+    return {
+        'submission_id': str(row['_id']),
+        'student_id': row.get('student_id'),
+        'activity_id': row['activity_id'],
+        'activity_title': row.get('activity_title'),
+        'activity_type': row.get('activity_type'),
+        'course_id': row.get('course_id'),
+        'submitted_at': row['submitted_at'].isoformat() if row.get('submitted_at') else None,
+        'waiting_seconds': int((now - row['submitted_at']).total_seconds()) if row.get('submitted_at') else None
+    }
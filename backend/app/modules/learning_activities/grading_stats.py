@@ -0,0 +1,183 @@
+"""
+COMP5241 Group 10 - Short Answer Grading Statistics
+Per-question statistics maintained incrementally on every grading change
+
+One shortanswer_stats document per question (keyed by question_id) holds
+submission and graded counts, count/sum/sum of squares/min/max of scores
+and a 10-point histogram. Writers compute the change between a
+submission's state before and after their update and apply it with a
+single $inc/$min/$max update, so reads are one document lookup.
+
+The submission and graded counts are also mirrored onto the question
+document itself, where the question list reads them.
+
+Sums and counts can be decremented exactly but min and max cannot: when a
+score equal to the current min or max is removed the document is flagged
+minmax_stale, and the next read recomputes the two values from the
+graded submissions.
+"""
+import math
+from typing import Dict, Optional
+
+from bson import ObjectId
+
+HISTOGRAM_BUCKETS = 10
+
+
+def _bucket(score: float) -> str:
+    return str(min(int(score // (100 / HISTOGRAM_BUCKETS)), HISTOGRAM_BUCKETS - 1))
+
+
+def graded_score(state: Optional[Dict]) -> Optional[float]:
+    if state and state.get('is_graded') and state.get('score') is not None:
+        return float(state['score'])
+    return None
+
+
+class StatsDelta:
+    """Accumulated change to one question's statistics"""
+
+    def __init__(self):
+        self.inc: Dict[str, float] = {}
+        self.added_scores = []
+        self.removed_scores = []
+
+    def _add(self, field: str, value: float):
+        self.inc[field] = self.inc.get(field, 0) + value
+
+    def transition(self, before: Optional[Dict], after: Optional[Dict]):
+        """Record one submission moving from `before` to `after` (None = no submission)"""
+        self._add('submission_count', (after is not None) - (before is not None))
+        self._add('graded_count', bool(after and after.get('is_graded')) - bool(before and before.get('is_graded')))
+
+        old_score, new_score = graded_score(before), graded_score(after)
+        if old_score == new_score:
+            return
+        if old_score is not None:
+            self._add('score_count', -1)
+            self._add('score_sum', -old_score)
+            self._add('score_sumsq', -old_score * old_score)
+            self._add(f'histogram.{_bucket(old_score)}', -1)
+            self.removed_scores.append(old_score)
+        if new_score is not None:
+            self._add('score_count', 1)
+            self._add('score_sum', new_score)
+            self._add('score_sumsq', new_score * new_score)
+            self._add(f'histogram.{_bucket(new_score)}', 1)
+            self.added_scores.append(new_score)
+
+    def apply(self, db, question_id: str):
+        inc = {field: value for field, value in self.inc.items() if value}
+        if not inc and not self.added_scores:
+            return
+        update = {'$inc': inc} if inc else {}
+        if self.added_scores:
+            update['$min'] = {'score_min': min(self.added_scores)}
+            update['$max'] = {'score_max': max(self.added_scores)}
+        # No upsert: questions created before statistics existed get theirs built on first read
+        db.shortanswer_stats.update_one({'_id': question_id}, update)
+        counters = {field: inc[field] for field in ('submission_count', 'graded_count') if field in inc}
+        if counters:
+            db.short_answer_questions.update_one({'_id': ObjectId(question_id)}, {'$inc': counters})
+
+        if self.removed_scores:
+            # A removed extreme may no longer be the min/max; recompute lazily on read
+            db.shortanswer_stats.update_one(
+                {'_id': question_id, '$or': [
+                    {'score_min': {'$in': self.removed_scores}},
+                    {'score_max': {'$in': self.removed_scores}}
+                ]},
+                {'$set': {'minmax_stale': True}}
+            )
+
+
+def record_transition(db, question_id: str, before: Optional[Dict], after: Optional[Dict]):
+    delta = StatsDelta()
+    delta.transition(before, after)
+    delta.apply(db, question_id)
+
+
+def _graded_scores_match(question_id: str) -> Dict:
+    return {'question_id': question_id, 'is_graded': True, 'score': {'$ne': None}}
+
+
+def empty_stats(question_id: str) -> Dict:
+    return {
+        '_id': question_id,
+        'submission_count': 0,
+        'graded_count': 0,
+        'score_count': 0,
+        'score_sum': 0.0,
+        'score_sumsq': 0.0,
+        # score_min/score_max stay absent until there is a score: $min treats null as smallest
+        'histogram': {}
+    }
+
+
+def rebuild_stats(db, question_id: str) -> Dict:
+    """Recompute a question's statistics from its submissions"""
+    submission_count = db.shortanswer_submissions.count_documents({'question_id': question_id})
+    graded_count = db.shortanswer_submissions.count_documents({'question_id': question_id, 'is_graded': True})
+    stats = dict(empty_stats(question_id), submission_count=submission_count, graded_count=graded_count)
+    for submission in db.shortanswer_submissions.find(_graded_scores_match(question_id), {'_id': 0, 'score': 1}):
+        score = float(submission['score'])
+        stats['score_count'] += 1
+        stats['score_sum'] += score
+        stats['score_sumsq'] += score * score
+        stats['score_min'] = min(stats.get('score_min', score), score)
+        stats['score_max'] = max(stats.get('score_max', score), score)
+        bucket = _bucket(score)
+        stats['histogram'][bucket] = stats['histogram'].get(bucket, 0) + 1
+    db.shortanswer_stats.replace_one({'_id': question_id}, stats, upsert=True)
+    db.short_answer_questions.update_one(
+        {'_id': ObjectId(question_id)},
+        {'$set': {'submission_count': submission_count, 'graded_count': graded_count}}
+    )
+    return stats
+
+
+def read_stats(db, question_id: str) -> Dict:
+    """The question's statistics document, built on first use and with stale min/max refreshed"""
+    stats = db.shortanswer_stats.find_one({'_id': question_id})
+    if stats is None:
+        return rebuild_stats(db, question_id)
+    if stats.get('minmax_stale'):
+        extremes = list(db.shortanswer_submissions.aggregate([
+            {'$match': _graded_scores_match(question_id)},
+            {'$group': {'_id': None, 'low': {'$min': '$score'}, 'high': {'$max': '$score'}}}
+        ]))
+        if extremes:
+            extremes_update = {'$set': {'score_min': extremes[0]['low'], 'score_max': extremes[0]['high']},
+                               '$unset': {'minmax_stale': ''}}
+            stats.update(score_min=extremes[0]['low'], score_max=extremes[0]['high'])
+        else:
+            extremes_update = {'$unset': {'minmax_stale': '', 'score_min': '', 'score_max': ''}}
+            stats.pop('score_min', None)
+            stats.pop('score_max', None)
+        db.shortanswer_stats.update_one({'_id': question_id}, extremes_update)
+    return stats
+
+
+def summarize(stats: Dict) -> Dict:
+    """Progress and score summary from a statistics document"""
+    submissions = stats.get('submission_count', 0)
+    graded = stats.get('graded_count', 0)
+    count = stats.get('score_count', 0)
+    mean = stats.get('score_sum', 0) / count if count else 0
+    variance = max(stats.get('score_sumsq', 0) / count - mean * mean, 0) if count else 0
+    histogram = stats.get('histogram') or {}
+    width = 100 // HISTOGRAM_BUCKETS
+    return {
+        'total_submissions': submissions,
+        'graded_submissions': graded,
+        'ungraded_submissions': submissions - graded,
+        'grading_progress': round(graded / submissions * 100, 1) if submissions > 0 else 0,
+        'average_score': round(mean, 1),
+        'score_std_dev': round(math.sqrt(variance), 1),
+        'highest_score': stats.get('score_max') if count else 0,
+        'lowest_score': stats.get('score_min') if count else 0,
+        'score_histogram': [{
+            'range': f'{bucket * width}-{100 if bucket == HISTOGRAM_BUCKETS - 1 else bucket * width + width - 1}',
+            'count': histogram.get(str(bucket), 0)
+        } for bucket in range(HISTOGRAM_BUCKETS)]
+    }
@@ -0,0 +1,232 @@
+"""
+COMP5241 Group 10 - Mini-Game Leaderboard Cache
+Process-local ranked leaderboards for rank, top-N and "around me" queries
+
+Each mini-game's best scores are held in an indexable skiplist ordered by
+(-score, time_key, achieved_at, student_id): every forward link records how
+many entries it skips, so finding an entry's position, or the entry at a
+position, takes O(log n) steps. A board is loaded from minigame_best_scores
+on first use and updated in place when this process records a better score.
+
+Staleness: other workers' submissions reach a board when it is next
+refreshed, which happens at most REFRESH_INTERVAL_SECONDS after the previous
+check. A refresh only reads best scores achieved since the last one (minus
+REFRESH_OVERLAP_SECONDS, which covers clock differences between workers and
+writes committed just after their timestamp). A write that arrives later
+than that, or from a worker whose clock is further off, is missed by the
+incremental refreshes, so every FULL_RELOAD_SECONDS a refresh reads the
+game's whole table instead. A board therefore lags the database by at most
+REFRESH_INTERVAL_SECONDS while worker clocks agree to within the overlap,
+and by at most FULL_RELOAD_SECONDS otherwise.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+MAX_LEVEL = 24  # enough for 2^24 entries per board
+MAX_BOARDS = 256
+REFRESH_INTERVAL_SECONDS = 2
+REFRESH_OVERLAP_SECONDS = 5
+FULL_RELOAD_SECONDS = 60
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next: List['_Node'] = [None] * levels
+        self.width: List[int] = [1] * levels
+
+
+class IndexableSkiplist:
+    """Sorted set of unique keys with O(log n) insert, remove, rank and positional access"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self._random = random.Random(seed)
+        self._tail = _Node(None, 0)
+        self._head = _Node(None, MAX_LEVEL)
+        self._head.next = [self._tail] * MAX_LEVEL
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self._random.getrandbits(1):
+            level += 1
+        return level
+
+    def _predecessors(self, key) -> Tuple[List[_Node], List[int]]:
+        """Last node before key on every level, and how far each one is from the head"""
+        chain, positions = [None] * MAX_LEVEL, [0] * MAX_LEVEL
+        node, position = self._head, 0
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not self._tail and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level], positions[level] = node, position
+        return chain, positions
+
+    def insert(self, key):
+        chain, positions = self._predecessors(key)
+        node = _Node(key, self._random_level())
+        position = positions[0] + 1
+        for level in range(len(node.next)):
+            previous = chain[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - (position - positions[level]) + 1
+            previous.width[level] = position - positions[level]
+        for level in range(len(node.next), MAX_LEVEL):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain, _ = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is self._tail or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def count_less(self, key) -> int:
+        """Number of keys ordered before key"""
+        _, positions = self._predecessors(key)
+        return positions[0]
+
+    def slice(self, start: int, count: int) -> List:
+        """Up to count keys starting at position start"""
+        if start >= self.size or count <= 0:
+            return []
+        node, remaining = self._head, start + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not self._tail and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        keys = []
+        while node is not self._tail and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+def _key(entry: Dict) -> Tuple:
+    return (-entry['score'], entry['time_key'], entry['achieved_at'], entry['student_id'])
+
+
+class Board:
+    """One mini-game's leaderboard"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()  # one database refresh at a time
+        self.ranking = IndexableSkiplist()
+        self.entries: Dict[str, Dict] = {}  # student_id -> best score entry
+        self.synced_to: Optional[datetime] = None  # latest achieved_at read from the database
+        self.checked_at = float('-inf')
+        self.reloaded_at = float('-inf')  # last refresh that read every entry
+
+    def apply(self, entry: Dict):
+        """Insert or move a student's entry; older or equal entries are ignored"""
+        with self.lock:
+            current = self.entries.get(entry['student_id'])
+            if current is not None:
+                if _key(current) <= _key(entry):
+                    return
+                self.ranking.remove(_key(current))
+            self.ranking.insert(_key(entry))
+            self.entries[entry['student_id']] = entry
+
+    def rank(self, score, time_key) -> int:
+        """Competition rank: one more than the number of strictly better entries"""
+        with self.lock:
+            return self.ranking.count_less((-score, time_key)) + 1
+
+    def entry(self, student_id: str) -> Optional[Dict]:
+        with self.lock:
+            return self.entries.get(student_id)
+
+    def position(self, student_id: str) -> Optional[int]:
+        with self.lock:
+            entry = self.entries.get(student_id)
+            return self.ranking.count_less(_key(entry)) if entry else None
+
+    def page(self, start: int, count: int) -> List[Tuple[int, Dict]]:
+        """(rank, entry) pairs for count entries from position start"""
+        with self.lock:
+            result = []
+            for key in self.ranking.slice(start, count):
+                rank = self.ranking.count_less(key[:2]) + 1
+                result.append((rank, self.entries[key[3]]))
+            return result
+
+    def __len__(self):
+        return len(self.ranking)
+
+
+class LeaderboardCache:
+    """Bounded LRU of boards keyed by minigame_id"""
+
+    FIELDS = {'_id': 0, 'student_id': 1, 'score': 1, 'time_taken': 1, 'time_key': 1, 'achieved_at': 1}
+
+    def __init__(self, max_boards: int = MAX_BOARDS):
+        self.max_boards = max_boards
+        self._boards: 'OrderedDict[str, Board]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sync(self, db, minigame_id: str, board: Board):
+        with board.sync_lock:
+            # Another request may have refreshed the board while this one waited
+            if time.monotonic() - board.checked_at < REFRESH_INTERVAL_SECONDS:
+                return
+            checked_at = time.monotonic()
+            full_reload = board.synced_to is None or checked_at - board.reloaded_at >= FULL_RELOAD_SECONDS
+            query = {'minigame_id': minigame_id}
+            if not full_reload:
+                query['achieved_at'] = {'$gte': board.synced_to - timedelta(seconds=REFRESH_OVERLAP_SECONDS)}
+            for entry in db.minigame_best_scores.find(query, self.FIELDS):
+                board.apply(entry)
+                if board.synced_to is None or entry['achieved_at'] > board.synced_to:
+                    board.synced_to = entry['achieved_at']
+            board.checked_at = checked_at
+            if full_reload:
+                board.reloaded_at = checked_at
+
+    def board(self, db, minigame_id: str) -> Board:
+        """The game's board, loaded on first use and refreshed once REFRESH_INTERVAL_SECONDS have passed"""
+        with self._lock:
+            board = self._boards.get(minigame_id)
+            if board is None:
+                board = self._boards[minigame_id] = Board()
+                while len(self._boards) > self.max_boards:
+                    self._boards.popitem(last=False)
+            else:
+                self._boards.move_to_end(minigame_id)
+            stale = time.monotonic() - board.checked_at >= REFRESH_INTERVAL_SECONDS
+        if stale:
+            self._sync(db, minigame_id, board)
+        return board
+
+    def record(self, minigame_id: str, entry: Dict):
+        """Apply a best score written by this process to the game's board, if it is loaded"""
+        with self._lock:
+            board = self._boards.get(minigame_id)
+        if board is not None:
+            board.apply(entry)
+
+    def invalidate(self, minigame_id: str):
+        with self._lock:
+            self._boards.pop(minigame_id, None)
+
+
+leaderboard_cache = LeaderboardCache()
@@ -6,8 +6,11 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 import logging
 from config.database import get_db_connection
+from app.utils import scheduler
+from .leaderboard_cache import leaderboard_cache
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -15,6 +18,58 @@ logger = logging.getLogger(__name__)
 # Define a separate blueprint for mini-game endpoints
 minigames_bp = Blueprint('minigames', __name__, url_prefix='/minigames')
 
+# Plays without a time rank after every timed play with the same score
+NO_TIME = float('inf')
+
+def _time_key(time_taken):
+    return NO_TIME if time_taken is None else time_taken
+
+def _better_than(score, time_key):
+    """Filter matching best scores that rank above (score, time_key)"""
+    return {'$or': [{'score': {'$gt': score}}, {'score': score, 'time_key': {'$lt': time_key}}]}
+
+def _record_play(db, minigame, user_id, score, time_taken, achieved_at):
+    """Append the play and keep the student's best score; returns True when the best improved"""
+    minigame_id = str(minigame['_id'])
+    play = {
+        'minigame_id': minigame_id,
+        'course_id': minigame.get('course_id'),
+        'student_id': user_id,
+        'score': score,
+        'time_taken': time_taken,
+        'achieved_at': achieved_at
+    }
+    db.minigame_plays.insert_one(dict(play))
+    db.mini_games.update_one(
+        {'_id': minigame['_id']},
+        {'$inc': {'play_count': 1}, '$max': {'last_activity_at': achieved_at}}
+    )
+
+    time_key = _time_key(time_taken)
+    # Only an existing best that this play beats matches; a missing one is inserted
+    query = {
+        'minigame_id': minigame_id,
+        'student_id': user_id,
+        '$or': [{'score': {'$lt': score}}, {'score': score, 'time_key': {'$gt': time_key}}]
+    }
+    update = {'$set': dict(play, time_key=time_key)}
+    try:
+        result = db.minigame_best_scores.update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        # The student already has an equal or better score (or a concurrent first play inserted one)
+        result = db.minigame_best_scores.update_one(query, update)
+    return bool(result.upserted_id or result.modified_count)
+
+def _leaderboard_entry(entry, rank, user_id):
+    return {
+        'rank': rank,
+        'student_id': entry['student_id'],
+        'score': entry['score'],
+        'time_taken': entry.get('time_taken'),
+        'achieved_at': entry['achieved_at'].isoformat(),
+        'is_current_user': entry['student_id'] == user_id
+    }
+
 # Create a mini-game (teacher only) - enhanced
 @minigames_bp.route('/', methods=['POST'])
 @jwt_required(locations=["cookies"])
@@ -45,13 +100,16 @@ def create_minigame():
             'expires_at': datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None,
             'is_active': True,
             'created_at': datetime.utcnow(),
-            'scores': []
+            'play_count': 0
         }
 
+        minigame_data.update(scheduler.initial_state('mini_games', minigame_data))
+
         with get_db_connection() as client:
             db = client['comp5241_g10']
             result = db.mini_games.insert_one(minigame_data)
-        minigame_data['_id'] = result.inserted_id
+            minigame_data['_id'] = result.inserted_id
+            scheduler.schedule(db, 'mini_games', minigame_data)
         
         logger.info(f"Mini-game created successfully by user {user_id}: {minigame_data['_id']}")
         return jsonify({
@@ -79,7 +137,7 @@ def list_minigames():
     # Sort by creation date (newest first)
     with get_db_connection() as client:
         db = client['comp5241_g10']
-        minigames = list(db.mini_games.find(query).sort('created_at', -1))
+        minigames = list(db.mini_games.find(query, {'scores': 0}).sort('created_at', -1))
     result = []
     
     for game in minigames:
@@ -93,7 +151,8 @@ def list_minigames():
             'created_at': game['created_at'].isoformat(),
             'expires_at': game['expires_at'].isoformat() if game.get('expires_at') else None,
             'course_id': game['course_id'],
-            'play_count': len(game.get('scores', []))
+            'play_count': game.get('play_count', 0),
+            'last_activity_at': game['last_activity_at'].isoformat() if game.get('last_activity_at') else None
         })
     return jsonify(result), 200
 
@@ -104,17 +163,21 @@ def get_minigame(minigame_id):
     try:
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            minigame = db.mini_games.find_one({'_id': ObjectId(minigame_id)})
-        if not minigame:
-            return jsonify({'error': 'Mini-game not found'}), 404
+            minigame = db.mini_games.find_one({'_id': ObjectId(minigame_id)}, {'scores': 0})
+            if not minigame:
+                return jsonify({'error': 'Mini-game not found'}), 404
             
-        user_id = get_jwt_identity()
-        is_creator = minigame['created_by'] == user_id
-        
-        # Get user's high score if any
-        scores = minigame.get('scores', [])
-        user_scores = [s for s in scores if s.get('student_id') == user_id]
-        user_high_score = max([s['score'] for s in user_scores]) if user_scores else None
+            user_id = get_jwt_identity()
+            is_creator = minigame['created_by'] == user_id
+            
+            # Get user's high score if any
+            user_best = db.minigame_best_scores.find_one({'minigame_id': minigame_id, 'student_id': user_id}, {'score': 1})
+            user_high_score = user_best['score'] if user_best else None
+            
+            # Top ten students by best score
+            top_scores = list(db.minigame_best_scores.find({'minigame_id': minigame_id}).sort(
+                [('score', -1), ('time_key', 1), ('achieved_at', 1)]
+            ).limit(10))
         
         # Basic game data
         result = {
@@ -132,8 +195,6 @@ def get_minigame(minigame_id):
             'user_high_score': user_high_score
         }
         
-        # Add top scores
-        top_scores = sorted(scores, key=lambda s: s['score'], reverse=True)[:10]
         result['top_scores'] = [{
             'student_id': score['student_id'],
             'score': score['score'],
@@ -156,59 +217,45 @@ def submit_score(minigame_id):
     if not data or not isinstance(data.get('score'), int):
         return jsonify({'error': 'Missing or invalid score submission'}), 400
     
+    time_taken = data.get('time_taken')  # Optional time taken
+    if time_taken is not None and (not isinstance(time_taken, (int, float)) or isinstance(time_taken, bool) or time_taken < 0):
+        return jsonify({'error': 'time_taken must be a non-negative number'}), 400
+    
     try:
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            minigame = db.mini_games.find_one({'_id': ObjectId(minigame_id)})
-        if not minigame:
-            return jsonify({'error': 'Mini-game not found'}), 404
-        
-        # Check if the mini-game is still active
-        if not minigame.get('is_active', True):
-            return jsonify({'error': 'This mini-game is closed'}), 400
-            
-        # Check if the mini-game has expired
-        expires_at = minigame.get('expires_at')
-        if expires_at and expires_at < datetime.utcnow():
-            return jsonify({'error': 'This mini-game has expired'}), 400
-        
-        # Create score submission
-        score_data = {
-            'student_id': user_id,
-            'score': data['score'],
-            'time_taken': data.get('time_taken'),  # Optional time taken
-            'achieved_at': datetime.utcnow()
-        }
-        
-        scores = minigame.get('scores', [])
-        scores.append(score_data)
-        
-        # Update the mini-game in database
-        with get_db_connection() as client:
-            db = client['comp5241_g10']
-            db.mini_games.update_one(
-                {'_id': ObjectId(minigame_id)},
-                {'$set': {'scores': scores}}
+            minigame = db.mini_games.find_one(
+                {'_id': ObjectId(minigame_id)}, {'is_active': 1, 'expires_at': 1, 'course_id': 1}
             )
-        
-        # Get user's high score
-        user_scores = [s['score'] for s in scores if s['student_id'] == user_id]
-        user_high_score = max(user_scores)
-        
-        # Get global high score
-        all_scores = [s['score'] for s in scores]
-        global_high_score = max(all_scores)
-        
-        # Get user rank
-        ranked_students = {}
-        for s in scores:
-            student_id = s['student_id']
-            score_val = s['score']
-            if student_id not in ranked_students or score_val > ranked_students[student_id]:
-                ranked_students[student_id] = score_val
+            if not minigame:
+                return jsonify({'error': 'Mini-game not found'}), 404
+            
+            # Check if the mini-game is still active
+            if not minigame.get('is_active', True):
+                return jsonify({'error': 'This mini-game is closed'}), 400
                 
-        ranked_list = sorted(ranked_students.items(), key=lambda x: x[1], reverse=True)
-        user_rank = next((i + 1 for i, (sid, _) in enumerate(ranked_list) if sid == user_id), 0)
+            # Check if the mini-game has expired
+            expires_at = minigame.get('expires_at')
+            if expires_at and expires_at < datetime.utcnow():
+                return jsonify({'error': 'This mini-game has expired'}), 400
+            
+            improved = _record_play(db, minigame, user_id, data['score'], time_taken, datetime.utcnow())
+            
+            # Rank, high scores and player count all come from the (minigame_id, score, time_key) index
+            user_best = db.minigame_best_scores.find_one(
+                {'minigame_id': minigame_id, 'student_id': user_id}, leaderboard_cache.FIELDS
+            )
+            if improved:
+                leaderboard_cache.record(minigame_id, user_best)
+            user_high_score = user_best['score']
+            user_rank = db.minigame_best_scores.count_documents(
+                dict(_better_than(user_best['score'], user_best['time_key']), minigame_id=minigame_id)
+            ) + 1
+            global_best = db.minigame_best_scores.find_one(
+                {'minigame_id': minigame_id}, {'score': 1}, sort=[('score', -1)]
+            )
+            global_high_score = global_best['score']
+            total_players = db.minigame_best_scores.count_documents({'minigame_id': minigame_id})
         
         return jsonify({
             'message': 'Score submitted successfully',
@@ -216,7 +263,7 @@ def submit_score(minigame_id):
             'user_high_score': user_high_score,
             'global_high_score': global_high_score,
             'user_rank': user_rank,
-            'total_players': len(ranked_students)
+            'total_players': total_players
         }), 200
     except Exception as e:
         logger.error(f"Error submitting score: {str(e)}")
@@ -227,51 +274,52 @@ def submit_score(minigame_id):
 @jwt_required(locations=["cookies"])
 def minigame_leaderboard(minigame_id):
     try:
+        user_id = get_jwt_identity()
+        around = request.args.get('around')
+        if around not in (None, 'me'):
+            return jsonify({'error': 'around must be "me"'}), 400
+        
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            minigame = db.mini_games.find_one({'_id': ObjectId(minigame_id)})
-        if not minigame:
-            return jsonify({'error': 'Mini-game not found'}), 404
+            minigame = db.mini_games.find_one({'_id': ObjectId(minigame_id)}, {'title': 1, 'game_type': 1})
+            if not minigame:
+                return jsonify({'error': 'Mini-game not found'}), 404
             
-        user_id = get_jwt_identity()
+            # Process-local ranking; see leaderboard_cache for how stale it can be
+            board = leaderboard_cache.board(db, minigame_id)
         
-        # Get best score for each student
-        scores = minigame.get('scores', [])
-        best_scores = {}
-        for score in scores:
-            student_id = score['student_id']
-            score_val = score['score']
-            if student_id not in best_scores or score_val > best_scores[student_id]['score']:
-                best_scores[student_id] = {
-                    'student_id': student_id,
-                    'score': score_val,
-                    'time_taken': score.get('time_taken'),
-                    'achieved_at': score['achieved_at']
-                }
-                
-        # Sort by score (highest first), then by time taken (shortest first) if available
-        leaderboard = sorted(best_scores.values(), 
-                             key=lambda s: (-s['score'], s.get('time_taken', float('inf'))))
-                             
-        # Format results
-        result = []
-        for i, entry in enumerate(leaderboard):
-            result.append({
-                'rank': i + 1,
-                'student_id': entry['student_id'],
-                'score': entry['score'],
-                'time_taken': entry['time_taken'],
-                'achieved_at': entry['achieved_at'].isoformat(),
-                'is_current_user': entry['student_id'] == user_id
-            })
-            
-        return jsonify({
+        user_entry = board.entry(user_id)
+        result = {
             'minigame_id': minigame_id,
             'title': minigame['title'],
             'game_type': minigame['game_type'],
-            'total_players': len(best_scores),
-            'leaderboard': result
-        }), 200
+            'total_players': len(board),
+            'user_rank': board.rank(user_entry['score'], user_entry['time_key']) if user_entry else None
+        }
+        
+        if around == 'me':
+            # The current user's entry with up to `window` entries on each side
+            window = min(max(request.args.get('window', 5, type=int), 1), 50)
+            position = board.position(user_id)
+            if position is None:
+                entries = []
+            else:
+                start = max(position - window, 0)
+                entries = board.page(start, position - start + window + 1)
+            result['window'] = window
+        else:
+            page = max(request.args.get('page', 1, type=int), 1)
+            per_page = min(max(request.args.get('per_page', 100, type=int), 1), 500)
+            entries = board.page((page - 1) * per_page, per_page)
+            result['pagination'] = {
+                'page': page,
+                'per_page': per_page,
+                'total': len(board),
+                'pages': (len(board) + per_page - 1) // per_page
+            }
+        
+        result['leaderboard'] = [_leaderboard_entry(entry, rank, user_id) for rank, entry in entries]
+        return jsonify(result), 200
     except Exception as e:
         logger.error(f"Error getting leaderboard: {str(e)}")
         return jsonify({'error': 'Failed to get leaderboard', 'details': str(e)}), 500
@@ -0,0 +1,245 @@
+"""
+COMP5241 Group 10 - Submission Moderation
+Blocklist filtering for word cloud words and short answers
+
+Blocked terms are matched with an Aho-Corasick automaton, so a check costs
+one pass over the submission no matter how many terms are blocked. Each
+course sees the global blocklist plus its own list from the
+moderation_blocklists collection. Automata are compiled once per
+(global version, course version) pair and shared by every request in the
+process; list versions are re-read at most every RELOAD_INTERVAL_SECONDS, so
+edits made on another worker take effect within that interval.
+"""
+import threading
+import time
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+GLOBAL_SCOPE = 'global'
+ACTIONS = ('reject', 'mask')
+MAX_TERMS = 5000
+MAX_TERM_LENGTH = 100
+RELOAD_INTERVAL_SECONDS = 5
+LATENCY_SAMPLES = 1024
+MASK_CHAR = '*'
+
+DEFAULT_GLOBAL_TERMS = ['fuck', 'shit', 'bitch', 'bastard', 'asshole', 'dickhead', 'cunt', 'motherfucker']
+
+
+def normalize_term(term: str) -> str:
+    """Blocklist terms are folded as checked text is (fold), with whitespace collapsed"""
+    return ' '.join(fold(term).split())
+
+
+def _spellings(terms: List[str]) -> List[str]:
+    """Each term plus its full casefold ('straße' -> 'strasse'), the spelling of already normalized word cloud words"""
+    return list(terms) + [term.casefold() for term in terms if term.casefold() != term]
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(char: str) -> str:
+    folded = unicodedata.normalize('NFKC', char).casefold()
+    return folded if len(folded) == 1 else char.lower()[:1] or char
+
+
+def fold(text: str) -> str:
+    """Case/width folding that keeps one character per input character, so match offsets apply to the original"""
+    return ''.join(_fold_char(char) for char in text)
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over a fixed set of terms.
+
+    Latin-script terms only match on word boundaries, so 'ass' does not
+    match inside 'class'; CJK terms match anywhere since CJK text has no
+    spaces between words.
+    """
+
+    def __init__(self, terms):
+        self.terms = sorted({term for term in terms if term})
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]  # state -> lengths of terms ending here
+        for term in self.terms:
+            self._insert(term)
+        self._build_failure_links()
+
+    def _insert(self, term: str):
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(len(term))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    @staticmethod
+    def _is_word_char(char: str) -> bool:
+        return char.isalnum() and not ('⺀' <= char <= '힯')
+
+    def _on_boundary(self, text: str, start: int, end: int) -> bool:
+        if self._is_word_char(text[start]) and start > 0 and self._is_word_char(text[start - 1]):
+            return False
+        if self._is_word_char(text[end - 1]) and end < len(text) and self._is_word_char(text[end]):
+            return False
+        return True
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) spans of every blocked term in text"""
+        matches = []
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length in output[state]:
+                start = index + 1 - length
+                if self._on_boundary(text, start, index + 1):
+                    matches.append((start, index + 1))
+        return matches
+
+
+class ModerationResult:
+    """Outcome of one check; `masked_text` has every blocked span replaced with MASK_CHAR"""
+
+    def __init__(self, text: str, matches: List[Tuple[int, int]], action: str, elapsed_ms: float):
+        self.text = text
+        self.matches = matches
+        self.action = action
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def blocked(self) -> bool:
+        return bool(self.matches)
+
+    @property
+    def masked_text(self) -> str:
+        chars = list(self.text)
+        for start, end in self.matches:
+            chars[start:end] = MASK_CHAR * (end - start)
+        return ''.join(chars)
+
+
+class _LatencyStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.blocked = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, elapsed_ms: float, blocked: bool):
+        with self._lock:
+            self.checks += 1
+            self.blocked += int(blocked)
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self._samples.append(elapsed_ms)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            samples = sorted(self._samples)
+            checks, blocked, total_ms, max_ms = self.checks, self.blocked, self.total_ms, self.max_ms
+
+        def percentile(fraction):
+            return round(samples[min(int(len(samples) * fraction), len(samples) - 1)], 4) if samples else None
+
+        return {
+            'checks': checks,
+            'blocked': blocked,
+            'mean_ms': round(total_ms / checks, 4) if checks else None,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(max_ms, 4)
+        }
+
+
+class ModerationRegistry:
+    """Process-wide compiled automata per course, reloaded when a list's version changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lists: Dict[str, Tuple[int, List[str], str, float]] = {}  # scope -> (version, terms, action, checked_at)
+        self._automata: Dict[Tuple, AhoCorasick] = {}
+        self.stats: Dict[str, _LatencyStats] = {}
+
+    def _load(self, db, scope: str) -> Tuple[int, List[str], str]:
+        cached = self._lists.get(scope)
+        if cached and time.monotonic() - cached[3] < RELOAD_INTERVAL_SECONDS:
+            return cached[:3]
+
+        version_doc = db.moderation_blocklists.find_one({'scope': scope}, {'version': 1})
+        version = version_doc['version'] if version_doc else 0
+        if cached and cached[0] == version:
+            terms, action = cached[1], cached[2]
+        elif version_doc:
+            document = db.moderation_blocklists.find_one({'scope': scope}, {'terms': 1, 'action': 1, 'version': 1})
+            version, terms, action = document['version'], document.get('terms', []), document.get('action', 'reject')
+        else:
+            terms = [normalize_term(term) for term in DEFAULT_GLOBAL_TERMS] if scope == GLOBAL_SCOPE else []
+            action = 'reject'
+
+        with self._lock:
+            self._lists[scope] = (version, terms, action, time.monotonic())
+        return version, terms, action
+
+    def _automaton(self, db, course_id: Optional[str]) -> Tuple[AhoCorasick, str]:
+        global_version, global_terms, global_action = self._load(db, GLOBAL_SCOPE)
+        course_version, course_terms, course_action = self._load(db, course_id) if course_id else (0, [], None)
+
+        key = (global_version, course_id, course_version)
+        automaton = self._automata.get(key)
+        if automaton is None:
+            automaton = AhoCorasick(_spellings(global_terms + course_terms))
+            with self._lock:
+                # Drop automata compiled for older versions of the same lists
+                for stale in [k for k in self._automata if k[1] == course_id or k[0] != global_version]:
+                    del self._automata[stale]
+                self._automata[key] = automaton
+        return automaton, course_action or global_action
+
+    def invalidate(self, scope: str):
+        """Force the next check to re-read a list (used after editing it in this process)"""
+        with self._lock:
+            self._lists.pop(scope, None)
+
+    def check(self, db, course_id: Optional[str], text: str, kind: str) -> ModerationResult:
+        """Match text against the global and course blocklists.
+
+        kind labels the latency statistics (e.g. 'wordcloud', 'shortanswer').
+        """
+        start = time.perf_counter()
+        automaton, action = self._automaton(db, course_id)
+        matches = automaton.find_all(fold(text))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result = ModerationResult(text, matches, action, elapsed_ms)
+        self.stats.setdefault(kind, _LatencyStats()).record(elapsed_ms, result.blocked)
+        return result
+
+    def stats_snapshot(self) -> Dict:
+        return {kind: stats.snapshot() for kind, stats in list(self.stats.items())}
+
+
+moderation_registry = ModerationRegistry()
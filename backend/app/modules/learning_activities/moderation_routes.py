@@ -0,0 +1,145 @@
+"""
+COMP5241 Group 10 - Moderation Routes
+API endpoints for managing submission blocklists
+"""
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from config.database import get_db_connection
+from .moderation import (
+    moderation_registry, normalize_term, ACTIONS, GLOBAL_SCOPE, MAX_TERMS, MAX_TERM_LENGTH, DEFAULT_GLOBAL_TERMS
+)
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Define a separate blueprint for moderation endpoints
+moderation_bp = Blueprint('moderation', __name__, url_prefix='/moderation')
+
+def validate_blocklist_data(data):
+    """Validate a blocklist update"""
+    errors = []
+
+    if not data:
+        return ['No data provided']
+
+    terms = data.get('terms')
+    if not isinstance(terms, list) or len(terms) > MAX_TERMS:
+        errors.append(f'Terms must be a list of at most {MAX_TERMS} entries')
+    elif any(not isinstance(term, str) or not normalize_term(term) or len(term) > MAX_TERM_LENGTH for term in terms):
+        errors.append(f'Each term must be a non-empty string of at most {MAX_TERM_LENGTH} characters')
+
+    if data.get('action', 'reject') not in ACTIONS:
+        errors.append(f'Action must be one of: {", ".join(ACTIONS)}')
+
+    return errors
+
+def _course_query(course_id):
+    if ObjectId.is_valid(course_id):
+        return {'$or': [{'_id': ObjectId(course_id)}, {'course_code': course_id}]}
+    return {'course_code': course_id}
+
+def _blocklist_edit_denied(db, scope, user_id, user_role):
+    """Why the user may not replace this blocklist, as (message, status), or None if they may"""
+    # The global list applies to every course, so only admins edit it
+    if scope == GLOBAL_SCOPE:
+        if user_role != 'admin':
+            return 'Only admins can edit the global blocklist', 403
+        return None
+    course = db.courses.find_one(_course_query(scope), {'instructor_id': 1})
+    if not course:
+        return 'Course not found', 404
+    if course.get('instructor_id') != user_id:
+        return 'Only the course instructor can edit its blocklist', 403
+    return None
+
+# Get a blocklist ('global' or a course ID)
+@moderation_bp.route('/blocklists/<scope>', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def get_blocklist(scope):
+    try:
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            blocklist = db.moderation_blocklists.find_one({'scope': scope})
+
+        if not blocklist:
+            return jsonify({
+                'scope': scope,
+                'terms': DEFAULT_GLOBAL_TERMS if scope == GLOBAL_SCOPE else [],
+                'action': 'reject',
+                'version': 0
+            }), 200
+
+        return jsonify({
+            'scope': scope,
+            'terms': blocklist.get('terms', []),
+            'action': blocklist.get('action', 'reject'),
+            'version': blocklist.get('version', 0),
+            'updated_by': blocklist.get('updated_by'),
+            'updated_at': blocklist['updated_at'].isoformat() if blocklist.get('updated_at') else None
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching blocklist: {str(e)}")
+        return jsonify({'error': 'Failed to fetch blocklist', 'details': str(e)}), 500
+
+# Replace a blocklist (admins for the global list, the course instructor for a course list)
+@moderation_bp.route('/blocklists/<scope>', methods=['PUT'])
+@jwt_required(locations=["cookies"])
+def update_blocklist(scope):
+    try:
+        user_id = get_jwt_identity()
+        user_role = get_jwt().get('role', 'student')
+        data = request.get_json()
+
+        validation_errors = validate_blocklist_data(data)
+        if validation_errors:
+            return jsonify({'error': 'Validation failed', 'details': validation_errors}), 400
+
+        terms = sorted({normalize_term(term) for term in data['terms']})
+
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            denied = _blocklist_edit_denied(db, scope, user_id, user_role)
+            if denied:
+                message, status = denied
+                return jsonify({'error': message}), status
+
+            # Bumping the version makes every worker recompile on its next reload
+            blocklist = db.moderation_blocklists.find_one_and_update(
+                {'scope': scope},
+                {
+                    '$set': {
+                        'terms': terms,
+                        'action': data.get('action', 'reject'),
+                        'updated_by': user_id,
+                        'updated_at': datetime.utcnow()
+                    },
+                    '$inc': {'version': 1}
+                },
+                projection={'version': 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        moderation_registry.invalidate(scope)
+
+        logger.info(f"Blocklist {scope} updated by user {user_id} to version {blocklist['version']}")
+        return jsonify({
+            'message': 'Blocklist updated successfully',
+            'scope': scope,
+            'term_count': len(terms),
+            'version': blocklist['version']
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error updating blocklist: {str(e)}")
+        return jsonify({'error': 'Failed to update blocklist', 'details': str(e)}), 500
+
+# Per-check latency and block counts for this worker
+@moderation_bp.route('/stats', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def moderation_stats():
+    return jsonify({'stats': moderation_registry.stats_snapshot()}), 200
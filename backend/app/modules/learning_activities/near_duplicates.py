@@ -0,0 +1,114 @@
+"""
+COMP5241 Group 10 - Near-Duplicate Answer Detection
+MinHash signatures and LSH banding for short answer submissions
+
+Each answer is reduced to a set of shingles (word 3-grams, or character
+5-grams for short or CJK answers) and summarized by a NUM_PERM-value MinHash
+signature; the fraction of equal signature values estimates the Jaccard
+similarity of two answers. The signature is split into BANDS bands of ROWS
+values and each band is hashed to one integer stored in the submission's
+lsh_bands array. Two answers become candidates only if they share a band
+value, which a multikey index finds without comparing every pair. With 32
+bands of 4 rows, pairs above about 0.5 similarity are very likely to share a
+band and pairs below about 0.2 rarely do.
+"""
+import hashlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .word_normalizer import normalize_text
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+WORD_SHINGLE = 3
+CHAR_SHINGLE = 5
+DEFAULT_THRESHOLD = 0.6
+
+_SEEDS = np.random.default_rng(5241).integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+_MIX_1 = np.uint64(0xff51afd7ed558ccd)
+_MIX_2 = np.uint64(0xc4ceb9fe1a85ec53)
+_SHIFT = np.uint64(33)
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def shingles(text: str) -> List[str]:
+    text = normalize_text(text)
+    words = text.split()
+    if len(words) >= WORD_SHINGLE and not any('⺀' <= char <= '힯' for char in text):
+        return [' '.join(words[i:i + WORD_SHINGLE]) for i in range(len(words) - WORD_SHINGLE + 1)]
+    compact = text.replace(' ', '')
+    return [compact[i:i + CHAR_SHINGLE] for i in range(max(len(compact) - CHAR_SHINGLE + 1, 1))] if compact else []
+
+
+def minhash(text: str) -> np.ndarray:
+    """NUM_PERM uint64 MinHash values; an empty answer gets the all-max signature"""
+    values = np.array([_hash64(shingle) for shingle in set(shingles(text))], dtype=np.uint64)
+    if not values.size:
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # One seeded 64-bit mixing function (murmur3 finalizer) per permutation
+    mixed = values[None, :] ^ _SEEDS[:, None]
+    mixed ^= mixed >> _SHIFT
+    mixed *= _MIX_1
+    mixed ^= mixed >> _SHIFT
+    mixed *= _MIX_2
+    mixed ^= mixed >> _SHIFT
+    return mixed.min(axis=1)
+
+
+def band_keys(signature: np.ndarray) -> List[int]:
+    """One signed 64-bit key per band; the band number is part of the hash"""
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS].astype('<u8').tobytes()
+        digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def signature_fields(text: str) -> Dict:
+    """Fields stored with a submission"""
+    signature = minhash(text)
+    return {'minhash': signature.astype('<u8').tobytes(), 'lsh_bands': band_keys(signature)}
+
+
+def decode_signature(stored) -> np.ndarray:
+    return np.frombuffer(bytes(stored), dtype='<u8')
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(a == b))
+
+
+def candidate_pairs(submissions: Iterable[Dict]) -> List[Tuple[int, int]]:
+    """Index pairs of submissions that share at least one LSH band"""
+    buckets = defaultdict(list)
+    for index, submission in enumerate(submissions):
+        for key in submission.get('lsh_bands', []):
+            buckets[key].append(index)
+    pairs = set()
+    for members in buckets.values():
+        if len(members) > 1:
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pairs.add((first, second))
+    return sorted(pairs)
+
+
+def similar_pairs(submissions: List[Dict], threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[int, int, float]]:
+    """(i, j, similarity) for candidate pairs at or above threshold, most similar first"""
+    pairs = candidate_pairs(submissions)
+    if not pairs:
+        return []
+    signatures = np.stack([decode_signature(submission['minhash']) for submission in submissions])
+    first, second = np.array(pairs).T
+    scores = (signatures[first] == signatures[second]).mean(axis=1)
+    keep = np.flatnonzero(scores >= threshold)
+    order = keep[np.argsort(-scores[keep], kind='stable')]
+    return [(int(first[i]), int(second[i]), round(float(scores[i]), 3)) for i in order]
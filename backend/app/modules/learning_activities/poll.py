@@ -4,7 +4,8 @@ Defines the models for polls
 """
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+from .activities import ResponseModel
 
 class PollOption(BaseModel):
     """Option for a poll"""
@@ -24,6 +25,8 @@ class Poll(BaseModel):
     description: Optional[str] = None
     course_id: str
     options: List[PollOption] = []
+    poll_type: str = "single"  # single, multiple, ranked
+    max_selections: Optional[int] = None  # multi-select polls only
     created_at: datetime = Field(default_factory=datetime.now)
     end_time: Optional[datetime] = None
     is_published: bool = False
@@ -54,4 +57,21 @@ class Poll(BaseModel):
                 'percentage': round(percentage, 2)
             })
         
-        return results
\ No newline at end of file
+        return results
+
+class PollSummary(ResponseModel):
+    """A poll as the API returns it; options are their texts"""
+    question: str
+    options: List[str] = []
+    poll_type: str = "single"
+    max_selections: Optional[int] = None
+    created_by: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+    course_id: str
+
+    @field_validator('options', mode='before')
+    @classmethod
+    def _option_texts(cls, options):
+        return [opt['text'] if isinstance(opt, dict) else opt for opt in options or []]
@@ -3,6 +3,12 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db_connection
+from app.utils import scheduler
+from .poll import PollSummary
+from .ballots import (
+    POLL_TYPES, MAX_MULTI_SELECT_OPTIONS, MAX_RANKED_OPTIONS,
+    encode_selection, pack_ranking, unpack_rankings, instant_runoff
+)
 
 # Define a separate blueprint for polls endpoints
 polls_bp = Blueprint('polls', __name__, url_prefix='/polls')
@@ -45,12 +51,30 @@ def create_poll():
             # skip invalid option entries
             continue
 
+    # Poll type: single choice (default), multi-select or ranked-choice
+    poll_type = data.get('poll_type') or 'single'
+    if poll_type not in POLL_TYPES:
+        return jsonify({'error': f'Invalid poll_type. Must be one of: {", ".join(POLL_TYPES)}'}), 400
+    if poll_type == 'multiple' and len(options) > MAX_MULTI_SELECT_OPTIONS:
+        return jsonify({'error': f'Multi-select polls support at most {MAX_MULTI_SELECT_OPTIONS} options'}), 400
+    if poll_type == 'ranked' and len(options) > MAX_RANKED_OPTIONS:
+        return jsonify({'error': f'Ranked polls support at most {MAX_RANKED_OPTIONS} options'}), 400
+
+    max_selections = None
+    if poll_type == 'multiple':
+        max_selections = data.get('max_selections') or len(options)
+        if not isinstance(max_selections, int) or max_selections < 1 or max_selections > len(options):
+            return jsonify({'error': 'max_selections must be an integer between 1 and the number of options'}), 400
+
     # If JWT identity missing (tests may not provide), fall back to payload created_by or a test default
     created_by = user_id or data.get('created_by') or ('teacher1' if current_app.config.get('TESTING') else None)
 
     poll_data = {
         'question': data['question'],
         'options': options,
+        'poll_type': poll_type,
+        'max_selections': max_selections,
+        'total_voters': 0,
         'created_by': created_by,
         'course_id': data['course_id'],
         'is_active': True,
@@ -58,10 +82,13 @@ def create_poll():
         'expires_at': (datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None)
     }
 
+    poll_data.update(scheduler.initial_state('polls', poll_data))
+
     with get_db_connection() as client:
         db = client['comp5241_g10']
         result = db.polls.insert_one(poll_data)
-    poll_data['_id'] = result.inserted_id
+        poll_data['_id'] = result.inserted_id
+        scheduler.schedule(db, 'polls', poll_data)
 
     return jsonify({'message': 'Poll created successfully', 'poll_id': str(poll_data['_id'])}), 201
 
@@ -79,20 +106,7 @@ def list_polls():
     with get_db_connection() as client:
         db = client['comp5241_g10']
         polls = list(db.polls.find(query).sort('created_at', -1))
-    result = []
-
-    for poll in polls:
-        result.append({
-            'id': str(poll['_id']),
-            'question': poll['question'],
-            'options': [opt['text'] for opt in poll['options']],
-            'created_by': poll['created_by'],
-            'is_active': poll['is_active'],
-            'created_at': poll['created_at'].isoformat(),
-            'expires_at': poll['expires_at'].isoformat() if poll.get('expires_at') else None,
-            'course_id': poll['course_id']
-        })
-    return jsonify(result), 200
+    return jsonify([PollSummary.model_validate(poll) for poll in polls]), 200
 
 
 # Get a specific poll
@@ -106,16 +120,7 @@ def get_poll(poll_id):
         if not poll:
             return jsonify({'error': 'Poll not found'}), 404
 
-        return jsonify({
-            'id': str(poll['_id']),
-            'question': poll['question'],
-            'options': [opt['text'] for opt in poll['options']],
-            'created_by': poll['created_by'],
-            'is_active': poll['is_active'],
-            'created_at': poll['created_at'].isoformat(),
-            'expires_at': poll['expires_at'].isoformat() if poll.get('expires_at') else None,
-            'course_id': poll['course_id']
-        }), 200
+        return jsonify(PollSummary.model_validate(poll)), 200
     except Exception:
         return jsonify({'error': 'Poll not found'}), 404
 
@@ -125,11 +130,7 @@ def get_poll(poll_id):
 @jwt_required(locations=["cookies", "headers"])
 def vote_poll(poll_id):
     user_id = get_jwt_identity()
-    data = request.get_json()
-    option_index = data.get('option_index')
-
-    if option_index is None:
-        return jsonify({'error': 'Missing option_index'}), 400
+    data = request.get_json() or {}
 
     try:
         # Get poll and validate it's active
@@ -144,9 +145,43 @@ def vote_poll(poll_id):
         if poll.get('expires_at') and poll['expires_at'] < datetime.utcnow():
             return jsonify({'error': 'Poll has expired'}), 400
 
-        # Validate option_index
-        if option_index < 0 or option_index >= len(poll['options']):
-            return jsonify({'error': 'Invalid option_index'}), 400
+        poll_type = poll.get('poll_type', 'single')
+        option_count = len(poll['options'])
+
+        # Build the stored ballot and the option tallies it increments
+        if poll_type == 'multiple':
+            option_indices = data.get('option_indices')
+            if not isinstance(option_indices, list):
+                return jsonify({'error': 'Missing option_indices'}), 400
+            max_selections = poll.get('max_selections') or option_count
+            if len(option_indices) > max_selections:
+                return jsonify({'error': f'You can select at most {max_selections} options'}), 400
+            try:
+                selection_mask = encode_selection(option_indices, option_count)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            ballot = {'selection_mask': selection_mask}
+            tallied_indices = option_indices
+        elif poll_type == 'ranked':
+            ranking = data.get('ranking')
+            if not isinstance(ranking, list):
+                return jsonify({'error': 'Missing ranking'}), 400
+            try:
+                packed_ranking = pack_ranking(ranking, option_count)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            ballot = {'ranking': packed_ranking}
+            # Option tallies hold first preferences; the runoff is computed on read
+            tallied_indices = [ranking[0]]
+        else:
+            option_index = data.get('option_index')
+            if option_index is None:
+                return jsonify({'error': 'Missing option_index'}), 400
+            # Validate option_index
+            if option_index < 0 or option_index >= option_count:
+                return jsonify({'error': 'Invalid option_index'}), 400
+            ballot = {'option_index': option_index}
+            tallied_indices = [option_index]
 
         # Check for existing vote
         with get_db_connection() as client:
@@ -162,20 +197,21 @@ def vote_poll(poll_id):
         vote_data = {
             'poll_id': poll_id,
             'student_id': user_id,
-            'option_index': option_index,
             'voted_at': datetime.utcnow()
         }
+        vote_data.update(ballot)
         with get_db_connection() as client:
             db = client['comp5241_g10']
             db.votes.insert_one(vote_data)
 
-        # Increment vote count in poll
-        poll['options'][option_index]['votes'] += 1
+        # Increment the affected option tallies in place
+        increments = {f'options.{index}.votes': 1 for index in tallied_indices}
+        increments['total_voters'] = 1
         with get_db_connection() as client:
             db = client['comp5241_g10']
             db.polls.update_one(
                 {'_id': ObjectId(poll_id)},
-                {'$set': {'options': poll['options']}}
+                {'$inc': increments}
             )
 
         return jsonify({'message': 'Vote recorded successfully'}), 200
@@ -195,11 +231,14 @@ def poll_results(poll_id):
         if not poll:
             return jsonify({'error': 'Poll not found'}), 404
 
+        poll_type = poll.get('poll_type', 'single')
         total_votes = sum((opt.get('votes', 0) for opt in poll['options']))
+        # Multi-select percentages are relative to voters, not selections
+        total_voters = poll.get('total_voters', total_votes) if poll_type == 'multiple' else total_votes
         results = []
 
         for idx, opt in enumerate(poll['options']):
-            percentage = (opt.get('votes', 0) / total_votes * 100) if total_votes > 0 else 0
+            percentage = (opt.get('votes', 0) / total_voters * 100) if total_voters > 0 else 0
             results.append({
                 'option_index': idx,
                 'text': opt['text'],
@@ -207,12 +246,33 @@ def poll_results(poll_id):
                 'percentage': round(percentage, 1)
             })
 
-        return jsonify({
+        response = {
             'poll_id': str(poll['_id']),
             'question': poll['question'],
+            'poll_type': poll_type,
             'results': results,
-            'total_votes': total_votes
-        }), 200
+            'total_votes': total_votes,
+            'total_voters': total_voters
+        }
+
+        if poll_type == 'ranked':
+            with get_db_connection() as client:
+                db = client['comp5241_g10']
+                packed_ballots = [
+                    vote['ranking'] for vote in
+                    db.votes.find({'poll_id': poll_id}, {'ranking': 1, '_id': 0})
+                    if vote.get('ranking')
+                ]
+            option_count = len(poll['options'])
+            runoff = instant_runoff(unpack_rankings(packed_ballots, option_count), option_count)
+            winner = runoff['winner']
+            response['runoff'] = {
+                'winner_index': winner,
+                'winner_text': poll['options'][winner]['text'] if winner is not None else None,
+                'rounds': runoff['rounds']
+            }
+
+        return jsonify(response), 200
     except Exception:
         # Return a JSON 500 with minimal error detail (no server traceback leaked)
         return jsonify({'error': 'Internal server error'}), 500
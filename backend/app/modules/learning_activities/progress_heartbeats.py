@@ -0,0 +1,170 @@
+"""
+COMP5241 Group 10 - Activity Progress Heartbeats
+Single-write progress updates and in-process coalescing of heartbeats
+
+A progress record is updated with one upsert: $max keeps the highest
+progress and latest access time, $inc adds time spent, so concurrent
+updates never overwrite each other and no prior read is needed.
+
+Clients report time spent with a heartbeat every few seconds while an
+activity is open. The coalescer merges heartbeats per (activity, student) in
+memory (highest progress, summed time) and a background thread writes all
+pending records with one bulk_write every FLUSH_INTERVAL_SECONDS. A direct
+progress update takes the pending heartbeat for its key into the same write.
+Each flush also applies the batch's time and completions to the students'
+course progress rollups, one delta per course.
+Heartbeats received in the last interval are lost if the process dies.
+A write that fails is merged back into the pending heartbeats and retried.
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from config.database import get_db_connection
+from . import course_progress
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 10
+
+
+def progress_update(progress_percentage: int, time_spent: int, now: datetime, course_id: Optional[str] = None) -> Dict:
+    """Update document for one progress report, shared by direct and coalesced writes"""
+    update = {
+        '$max': {'progress_percentage': progress_percentage, 'last_accessed': now},
+        '$inc': {'time_spent': time_spent}
+    }
+    if progress_percentage >= 100:
+        update['$set'] = {'is_completed': True}
+    else:
+        update['$setOnInsert'] = {'is_completed': False}
+    if course_id:
+        # Lets course progress be read without resolving activity IDs
+        update.setdefault('$set', {})['course_id'] = course_id
+    return update
+
+
+class HeartbeatCoalescer:
+    """Pending heartbeats per (activity_id, student_id), written in batches"""
+
+    def __init__(self, interval: float = FLUSH_INTERVAL_SECONDS):
+        self.interval = interval
+        self._pending: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.heartbeats = 0
+        self.writes = 0
+
+    def _merge(self, key: Tuple[str, str], progress_percentage: int, time_spent: int, now: datetime) -> Dict:
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = {'progress_percentage': progress_percentage, 'time_spent': 0, 'last_accessed': now}
+        entry['progress_percentage'] = max(entry['progress_percentage'], progress_percentage)
+        entry['time_spent'] += time_spent
+        entry['last_accessed'] = max(entry['last_accessed'], now)
+        return entry
+
+    def add(self, activity_id: str, student_id: str, progress_percentage: int, time_spent: int,
+            now: Optional[datetime] = None) -> Dict:
+        """Queue a heartbeat; returns the merged pending state for its key"""
+        with self._lock:
+            self.heartbeats += 1
+            entry = dict(self._merge((activity_id, student_id), progress_percentage, time_spent, now or datetime.utcnow()))
+        self._ensure_started()
+        return entry
+
+    def take(self, activity_id: str, student_id: str) -> Optional[Dict]:
+        """Remove and return the pending heartbeat for a key, for a caller about to write it"""
+        with self._lock:
+            return self._pending.pop((activity_id, student_id), None)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _requeue(self, entries: Dict[Tuple[str, str], Dict]):
+        """Merge entries that were not written back into the pending heartbeats"""
+        with self._lock:
+            for key, entry in entries.items():
+                self._merge(key, entry['progress_percentage'], entry['time_spent'], entry['last_accessed'])
+
+    def flush(self, db) -> int:
+        """Write every pending heartbeat in one bulk_write; returns the number of records written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        keys = list(pending)
+        failure = None
+        try:
+            courses = course_progress.activity_courses(db, [activity_id for activity_id, _ in keys])
+            requests = [
+                UpdateOne(
+                    {'activity_id': activity_id, 'student_id': student_id},
+                    progress_update(entry['progress_percentage'], entry['time_spent'], entry['last_accessed'],
+                                    courses.get(activity_id)),
+                    upsert=True
+                ) for (activity_id, student_id), entry in pending.items()
+            ]
+            db.activity_progress.bulk_write(requests, ordered=False)
+            written = pending
+        except BulkWriteError as e:
+            # Unordered: every write except the listed ones was applied, so only those are retried
+            # (re-adding the time of a written record would count it twice)
+            failed = {error['index'] for error in e.details.get('writeErrors', [])}
+            self._requeue({keys[i]: pending[keys[i]] for i in failed})
+            written = {key: pending[key] for i, key in enumerate(keys) if i not in failed}
+            failure = e
+        except Exception:
+            # Nothing is known to have been written; retry it all ($max values are safe to re-apply)
+            self._requeue(pending)
+            raise
+        with self._lock:
+            self.writes += len(written)
+
+        try:
+            deltas = {}
+            for (activity_id, student_id), entry in written.items():
+                course_id = courses.get(activity_id)
+                if course_id:
+                    delta = deltas.setdefault(course_id, course_progress.ProgressDelta(course_id))
+                    delta.progress(db, activity_id, student_id, entry['progress_percentage'],
+                                   entry['time_spent'], entry['last_accessed'])
+            for delta in deltas.values():
+                delta.apply(db)
+        except Exception as e:
+            # The heartbeats themselves are stored; a missing rollup change is fixed by a rebuild
+            logger.error(f"Error updating course progress for heartbeats: {str(e)}")
+        if failure:
+            raise failure
+        return len(written)
+
+    def _flush_with_connection(self):
+        try:
+            with get_db_connection() as client:
+                self.flush(client['comp5241_g10'])
+        except Exception as e:
+            logger.error(f"Error flushing progress heartbeats: {str(e)}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self._flush_with_connection()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='progress-heartbeats', daemon=True)
+                self._thread.start()
+                atexit.register(self._flush_with_connection)
+
+
+heartbeat_coalescer = HeartbeatCoalescer()
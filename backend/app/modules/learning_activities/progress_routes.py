@@ -0,0 +1,58 @@
+"""
+COMP5241 Group 10 - Course Progress Routes
+Per-course progress summaries for the student dashboard
+
+Both endpoints read course_progress rollups (see course_progress.py): one
+document per course, with no per-activity scans.
+"""
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from config.database import get_db_connection
+from . import course_progress
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+progress_bp = Blueprint('progress', __name__, url_prefix='/progress')
+
+
+# Progress in every course the current student is enrolled in
+@progress_bp.route('/', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def my_progress():
+    try:
+        user_id = get_jwt_identity()
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            course_ids = [
+                enrollment['course_id'] for enrollment in
+                db.course_enrollments.find({'student_id': user_id}, {'course_id': 1}).sort('enrollment_date', -1)
+            ]
+            rollups = course_progress.read(db, user_id, course_ids) if course_ids else []
+
+        return jsonify({
+            'student_id': user_id,
+            'courses': [course_progress.summarize(rollup) for rollup in rollups]
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error getting course progress: {str(e)}")
+        return jsonify({'error': 'Failed to get course progress', 'details': str(e)}), 500
+
+
+# Progress in one course
+@progress_bp.route('/<course_id>', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def course_progress_summary(course_id):
+    try:
+        user_id = get_jwt_identity()
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            rollup, = course_progress.read(db, user_id, [course_id])
+
+        return jsonify(course_progress.summarize(rollup)), 200
+
+    except Exception as e:
+        logger.error(f"Error getting course progress: {str(e)}")
+        return jsonify({'error': 'Failed to get course progress', 'details': str(e)}), 500
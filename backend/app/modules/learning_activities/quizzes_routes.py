@@ -7,6 +7,9 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db_connection
+from app.utils import scheduler
+from .activities import QuizSummary
+from . import course_progress
 import logging
 
 # Set up logging
@@ -73,6 +76,30 @@ def validate_quiz_data(data):
     
     return errors
 
+def _close_attempt(db, attempt, fields):
+    """Mark an open attempt submitted and count it on the quiz; a no-op if it was already closed"""
+    result = db.quiz_attempts.update_one(
+        {'_id': attempt['_id'], 'is_submitted': False},
+        {'$set': dict(fields, is_submitted=True)}
+    )
+    if result.modified_count:
+        quiz = db.quizzes.find_one_and_update(
+            {'_id': ObjectId(attempt['quiz_id'])},
+            {'$inc': {'submission_count': 1}, '$max': {'last_activity_at': fields['completed_at']}},
+            projection={'course_id': 1}
+        )
+        if quiz:
+            delta = course_progress.ProgressDelta(quiz.get('course_id'))
+            # Only the student's first submitted attempt completes the quiz, as in course_progress.rebuild
+            first_submission = db.quiz_attempts.count_documents({
+                'quiz_id': attempt['quiz_id'], 'student_id': attempt['student_id'], 'is_submitted': True
+            }) == 1
+            if first_submission:
+                delta.completed(attempt['student_id'], 'quiz')
+            delta.score(attempt['student_id'], None, fields.get('score'))
+            delta.touch(attempt['student_id'], fields['completed_at'])
+            delta.apply(db)
+
 # Create a quiz (teacher only)
 @quizzes_bp.route('/', methods=['POST'])
 @jwt_required(locations=["cookies"])
@@ -116,13 +143,18 @@ def create_quiz():
             'time_limit': data.get('time_limit'),
             'expires_at': datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None,
             'is_active': True,
-            'created_at': datetime.utcnow()
+            'created_at': datetime.utcnow(),
+            'attempt_count': 0,
+            'submission_count': 0
         }
 
+        quiz_data.update(scheduler.initial_state('quizzes', quiz_data))
+
         with get_db_connection() as client:
             db = client['comp5241_g10']
             result = db.quizzes.insert_one(quiz_data)
-        quiz_data['_id'] = result.inserted_id
+            quiz_data['_id'] = result.inserted_id
+            scheduler.schedule(db, 'quizzes', quiz_data)
 
         # Calculate total points
         total_points = sum(q['points'] for q in questions)
@@ -152,54 +184,42 @@ def list_quizzes():
         if course_id:
             query['course_id'] = course_id
 
-        # Filter expired quizzes unless specifically requested
+        # Filter expired quizzes unless specifically requested; the
+        # scheduler sets is_expired when expires_at passes
         if not include_expired:
-            now = datetime.utcnow()
-            query['$or'] = [
-                {'expires_at': None},
-                {'expires_at': {'$gt': now}}
-            ]
+            query['is_expired'] = False
 
         # Sort by creation date (newest first)
         with get_db_connection() as client:
             db = client['comp5241_g10']
             quizzes = list(db.quizzes.find(query).sort('created_at', -1))
+            # The user's own attempts for every listed quiz in one query
+            attempts_by_quiz = {}
+            for attempt in db.quiz_attempts.find(
+                {'quiz_id': {'$in': [str(quiz['_id']) for quiz in quizzes]}, 'student_id': user_id},
+                {'quiz_id': 1, 'is_submitted': 1, 'score': 1}
+            ):
+                attempts_by_quiz.setdefault(attempt['quiz_id'], []).append(attempt)
         result = []
 
         for quiz in quizzes:
-            # Get user's attempt info
-            with get_db_connection() as client:
-                db = client['comp5241_g10']
-                user_attempts = list(db.quiz_attempts.find({
-                    'quiz_id': str(quiz['_id']),
-                    'student_id': user_id
-                }))
-
+            user_attempts = attempts_by_quiz.get(str(quiz['_id']), [])
             completed_attempts = [a for a in user_attempts if a.get('is_submitted', False)]
 
             # Calculate total points
             total_points = sum(q['points'] for q in quiz['questions'])
 
-            quiz_data = {
-                'id': str(quiz['_id']),
-                'title': quiz['title'],
-                'description': quiz['description'],
+            quiz_data = QuizSummary.model_validate({
+                **quiz,
                 'question_count': len(quiz['questions']),
                 'total_points': total_points,
-                'created_by': quiz['created_by'],
-                'is_active': quiz['is_active'],
-                'created_at': quiz['created_at'].isoformat(),
-                'expires_at': quiz['expires_at'].isoformat() if quiz.get('expires_at') else None,
-                'course_id': quiz['course_id'],
-                'time_limit': quiz['time_limit'],
-                'is_expired': quiz.get('expires_at') and quiz['expires_at'] < datetime.utcnow(),
                 'user_stats': {
                     'attempts_count': len(user_attempts),
                     'completed_attempts': len(completed_attempts),
                     'best_score': max([a.get('score', 0) for a in completed_attempts], default=0),
                     'has_active_attempt': len([a for a in user_attempts if not a.get('is_submitted', False)]) > 0
                 }
-            }
+            })
             result.append(quiz_data)
         
         return jsonify(result), 200
@@ -301,13 +321,7 @@ def start_quiz_attempt(quiz_id):
             if time_limit and (datetime.utcnow() - started_at).total_seconds() / 60 > time_limit:
                 with get_db_connection() as client:
                     db = client['comp5241_g10']
-                    db.quiz_attempts.update_one(
-                        {'_id': existing_attempt['_id']},
-                        {'$set': {
-                            'is_submitted': True,
-                            'completed_at': datetime.utcnow()
-                        }}
-                    )
+                    _close_attempt(db, existing_attempt, {'completed_at': datetime.utcnow()})
                 return jsonify({'error': 'Previous attempt has expired due to time limit'}), 400
 
             time_remaining = None
@@ -346,6 +360,10 @@ def start_quiz_attempt(quiz_id):
         with get_db_connection() as client:
             db = client['comp5241_g10']
             result = db.quiz_attempts.insert_one(attempt_data)
+            db.quizzes.update_one(
+                {'_id': quiz['_id']},
+                {'$inc': {'attempt_count': 1}, '$max': {'last_activity_at': attempt_data['started_at']}}
+            )
         attempt_data['_id'] = result.inserted_id
 
         # Calculate total points
@@ -399,13 +417,7 @@ def submit_quiz(quiz_id):
         if time_limit and (datetime.utcnow() - started_at).total_seconds() / 60 > time_limit:
             with get_db_connection() as client:
                 db = client['comp5241_g10']
-                db.quiz_attempts.update_one(
-                    {'_id': attempt['_id']},
-                    {'$set': {
-                        'is_submitted': True,
-                        'completed_at': datetime.utcnow()
-                    }}
-                )
+                _close_attempt(db, attempt, {'completed_at': datetime.utcnow()})
             return jsonify({'error': 'Quiz time limit exceeded'}), 400
 
         # Validate answers format
@@ -472,15 +484,11 @@ def submit_quiz(quiz_id):
 
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            db.quiz_attempts.update_one(
-                {'_id': attempt['_id']},
-                {'$set': {
-                    'completed_at': completed_at,
-                    'answers': answers,
-                    'score': score_percentage,
-                    'is_submitted': True
-                }}
-            )
+            _close_attempt(db, attempt, {
+                'completed_at': completed_at,
+                'answers': answers,
+                'score': score_percentage
+            })
 
         logger.info(f"Quiz {quiz_id} submitted by user {user_id}, score: {score_percentage}%")
 
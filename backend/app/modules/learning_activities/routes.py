@@ -11,6 +11,10 @@ from .shortanswers_routes import shortanswers_bp
 from .minigames_routes import minigames_bp
 from .activity_routes import activities_bp
 from .action_routes import action_bp  # Import the new action blueprint
+from .moderation_routes import moderation_bp
+from .feed_routes import feed_bp
+from .progress_routes import progress_bp
+from .delete_routes import delete_bp
 from .services import LearningActivityService
 from bson import ObjectId
 
@@ -24,6 +28,10 @@ learning_bp.register_blueprint(shortanswers_bp)
 learning_bp.register_blueprint(minigames_bp)
 learning_bp.register_blueprint(activities_bp)
 learning_bp.register_blueprint(action_bp)  # Register the action blueprint
+learning_bp.register_blueprint(moderation_bp)
+learning_bp.register_blueprint(feed_bp)
+learning_bp.register_blueprint(progress_bp)
+learning_bp.register_blueprint(delete_bp)
 
 @learning_bp.route('/health', methods=['GET'])
 def learning_health():
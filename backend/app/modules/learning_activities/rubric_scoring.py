@@ -0,0 +1,173 @@
+"""
+COMP5241 Group 10 - Short Answer Rubric Scoring
+Keyword rubrics with fuzzy matching for suggested short answer scores
+
+A rubric lists keywords (single words or phrases) with weights, marks some
+of them as required, and optionally bounds the answer length in words.
+Misspelled keywords are matched through a SymSpell-style index: every
+rubric word is stored under each variant reachable by deleting up to
+max_edit_distance characters, so a typed word only needs its own deletes
+looked up and the few hits verified with a real edit distance. Token matches
+are memoized per scorer, since answers to one question reuse the same words.
+
+Scoring a batch builds one boolean (answers x keywords) matrix and computes
+every score with a single matrix-vector product.
+"""
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .word_normalizer import STOP_WORDS, lemmatize, normalize_text
+
+MAX_KEYWORDS = 100
+MAX_EDIT_DISTANCE = 2
+# A missing required keyword halves the suggestion
+REQUIRED_MISSING_FACTOR = 0.5
+DEFAULT_LENGTH_PENALTY = 10
+
+
+def _words(text: str) -> List[str]:
+    return [lemmatize(word) for word in normalize_text(text).split()]
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    variants = {word}
+    for removed in range(1, min(distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), removed):
+            variants.add(''.join(char for index, char in enumerate(word) if index not in positions))
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, giving up once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def validate_rubric(rubric, max_score: float = 100) -> List[str]:
+    errors = []
+    if not isinstance(rubric, dict):
+        return ['Rubric must be an object']
+
+    keywords = rubric.get('keywords')
+    if not isinstance(keywords, list) or not keywords or len(keywords) > MAX_KEYWORDS:
+        errors.append(f'Rubric needs between 1 and {MAX_KEYWORDS} keywords')
+    else:
+        for keyword in keywords:
+            if not isinstance(keyword, dict) or not isinstance(keyword.get('term'), str) or not _words(keyword['term']):
+                errors.append('Each keyword needs a non-empty term')
+                break
+            weight = keyword.get('weight', 1)
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool) or weight <= 0:
+                errors.append(f'Keyword "{keyword["term"]}" needs a positive weight')
+                break
+
+    for field in ('min_words', 'max_words'):
+        value = rubric.get(field)
+        if value is not None and (not isinstance(value, int) or value < 0):
+            errors.append(f'{field} must be a non-negative integer')
+    if isinstance(rubric.get('min_words'), int) and isinstance(rubric.get('max_words'), int) \
+            and rubric['min_words'] > rubric['max_words']:
+        errors.append('min_words cannot exceed max_words')
+
+    penalty = rubric.get('length_penalty', DEFAULT_LENGTH_PENALTY)
+    if not isinstance(penalty, (int, float)) or isinstance(penalty, bool) or not 0 <= penalty <= max_score:
+        errors.append(f'length_penalty must be a number between 0 and {max_score}')
+
+    distance = rubric.get('max_edit_distance', 1)
+    if not isinstance(distance, int) or distance < 0 or distance > MAX_EDIT_DISTANCE:
+        errors.append(f'max_edit_distance must be between 0 and {MAX_EDIT_DISTANCE}')
+    return errors
+
+
+def rubric_from_example(example_answer: str) -> Optional[Dict]:
+    """Default rubric for questions without one: the example answer's content words, equally weighted"""
+    words = list(dict.fromkeys(word for word in _words(example_answer) if word not in STOP_WORDS and len(word) > 2))
+    if not words:
+        return None
+    return {'keywords': [{'term': word, 'weight': 1, 'required': False} for word in words[:MAX_KEYWORDS]]}
+
+
+class RubricScorer:
+    def __init__(self, rubric: Dict, max_score: float = 100):
+        self.max_score = max_score
+        self.max_edit_distance = rubric.get('max_edit_distance', 1)
+        self.min_words = rubric.get('min_words')
+        self.max_words = rubric.get('max_words')
+        self.length_penalty = rubric.get('length_penalty', DEFAULT_LENGTH_PENALTY)
+
+        self.terms = [keyword['term'] for keyword in rubric['keywords']]
+        self.weights = np.array([float(keyword.get('weight', 1)) for keyword in rubric['keywords']])
+        self.required = np.array([bool(keyword.get('required', False)) for keyword in rubric['keywords']])
+
+        # Each keyword is the set of rubric words it needs (phrases need all of theirs)
+        self.vocabulary: Dict[str, int] = {}
+        self._keyword_words = []
+        for term in self.terms:
+            self._keyword_words.append([self.vocabulary.setdefault(word, len(self.vocabulary)) for word in _words(term)])
+
+        self._index: Dict[str, Set[int]] = {}
+        for word, index in self.vocabulary.items():
+            for variant in _deletes(word, self._distance_for(word)):
+                self._index.setdefault(variant, set()).add(index)
+        self._vocabulary_words = list(self.vocabulary)
+        self.match_token = lru_cache(maxsize=65536)(self._match_token)
+
+    def _distance_for(self, word: str) -> int:
+        # Short words would match too much at distance 2
+        return min(self.max_edit_distance, 0 if len(word) <= 3 else 1 if len(word) <= 6 else 2)
+
+    def _match_token(self, token: str) -> Tuple[int, ...]:
+        """Rubric word indices a typed token matches within their edit distance"""
+        candidates = set()
+        for variant in _deletes(token, self.max_edit_distance):
+            candidates |= self._index.get(variant, set())
+        return tuple(sorted(
+            index for index in candidates
+            if edit_distance(token, self._vocabulary_words[index], self._distance_for(self._vocabulary_words[index]))
+            <= self._distance_for(self._vocabulary_words[index])
+        ))
+
+    def score(self, texts: List[str]) -> Tuple[np.ndarray, List[Dict]]:
+        """Suggested scores for texts plus per-answer match details"""
+        word_hits = np.zeros((len(texts), len(self.vocabulary)), dtype=bool)
+        word_counts = np.zeros(len(texts), dtype=np.int64)
+        for row, text in enumerate(texts):
+            tokens = _words(text)
+            word_counts[row] = len(tokens)
+            for token in set(tokens):
+                for index in self.match_token(token):
+                    word_hits[row, index] = True
+
+        matched = np.stack([word_hits[:, words].all(axis=1) for words in self._keyword_words], axis=1)
+        scores = matched @ self.weights / self.weights.sum() * self.max_score
+        missing_required = (~matched & self.required).any(axis=1)
+        scores = np.where(missing_required, scores * REQUIRED_MISSING_FACTOR, scores)
+        outside_length = np.zeros(len(texts), dtype=bool)
+        if self.min_words is not None:
+            outside_length |= word_counts < self.min_words
+        if self.max_words is not None:
+            outside_length |= word_counts > self.max_words
+        scores = np.clip(np.where(outside_length, scores - self.length_penalty, scores), 0, self.max_score).round(1)
+
+        details = [{
+            'matched_keywords': [self.terms[i] for i in np.flatnonzero(matched[row])],
+            'missing_required': [self.terms[i] for i in np.flatnonzero(~matched[row] & self.required)],
+            'word_count': int(word_counts[row]),
+            'length_ok': not bool(outside_length[row])
+        } for row in range(len(texts))]
+        return scores, details
@@ -6,7 +6,12 @@ from datetime import datetime
 from typing import Any, List, Optional
 from flask import current_app
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from config.database import get_db_connection
+from app.utils import scheduler
+from app.modules.learning_activities import cascade_delete, course_progress, grading_queue
+from app.modules.learning_activities.progress_heartbeats import heartbeat_coalescer, progress_update
 
 
 class LearningActivityService:
@@ -129,38 +134,52 @@ class LearningActivityService:
         except Exception:
             return None
 
-        # Parse optional due_date
-        due_date = kwargs.get('due_date')
-        if isinstance(due_date, str):
-            try:
-                kwargs['due_date'] = datetime.fromisoformat(due_date)
-            except Exception:
-                raise ValueError('due_date must be a datetime or ISO date string')
+        # Parse optional dates
+        for field in ('due_date', 'start_date', 'end_date'):
+            value = kwargs.get(field)
+            if isinstance(value, str):
+                try:
+                    kwargs[field] = datetime.fromisoformat(value)
+                except Exception:
+                    raise ValueError(f'{field} must be a datetime or ISO date string')
 
         # Add updated_at timestamp
         kwargs['updated_at'] = datetime.utcnow()
 
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            result = db.learning_activities.update_one(
+            activity = db.learning_activities.find_one_and_update(
                 {'_id': activity_id},
-                {'$set': kwargs}
+                {'$set': kwargs},
+                return_document=ReturnDocument.AFTER
             )
+            if activity is None:
+                return None
+            LearningActivityService._update_schedule(db, activity, kwargs)
 
-        if result.matched_count == 0:
-            return None
+        return activity
 
-        with get_db_connection() as client:
-            db = client['comp5241_g10']
-            return db.learning_activities.find_one({'_id': activity_id})
+    @staticmethod
+    def _update_schedule(db, activity: dict, changes: dict) -> None:
+        """Keep the scheduled publish/close transitions in line with an update.
+
+        Setting is_active by hand overrides the dates, so it cancels the
+        pending transitions; changing a date without it resets is_active for
+        the new dates and reschedules.
+        """
+        if 'is_active' in changes:
+            scheduler.cancel(db, 'learning_activities', activity['_id'])
+        elif 'start_date' in changes or 'end_date' in changes:
+            scheduler.reschedule(db, 'learning_activities', activity)
 
     @staticmethod
     def delete_activity(activity_id: str, user_id: str, hard_delete: bool = False) -> bool:
         """Delete a learning activity.
         
         By default, performs a soft delete (sets status to 'deleted').
-        If hard_delete=True, completely removes the activity and related data.
-        Returns True on success, False if activity not found or user not authorized.
+        If hard_delete=True, queues a job that removes the activity and all related data.
+        Returns True (or the delete job's ID for a hard delete) on success, False if
+        activity not found or user not authorized.
         
         Args:
             activity_id: ID of the activity to delete
@@ -168,7 +187,7 @@ class LearningActivityService:
             hard_delete: If True, permanently delete; otherwise mark as deleted
             
         Returns:
-            bool: True if deletion was successful, False otherwise
+            True, or the queued job's ObjectId for a hard delete; False if not found or not authorized
         """
         if not activity_id or not user_id:
             raise ValueError('activity_id and user_id are required')
@@ -193,31 +212,14 @@ class LearningActivityService:
             # Only the creator can delete the activity
             return False
             
-        activity_type = activity.get('activity_type')
-        
         if hard_delete:
-            # Perform hard delete (completely remove from database)
+            # Queue the hard delete; the activity is hidden now and its data removed in the background
             with get_db_connection() as client:
                 db = client['comp5241_g10']
-                
-                # Delete the activity document
-                db.learning_activities.delete_one({'_id': activity_id})
-                
-                # Delete type-specific data
-                if activity_type == 'quiz':
-                    db.quizzes.delete_one({'activity_id': str(activity_id)})
-                elif activity_type == 'poll':
-                    db.polls.delete_one({'activity_id': str(activity_id)})
-                elif activity_type == 'wordcloud':
-                    db.wordclouds.delete_one({'activity_id': str(activity_id)})
-                elif activity_type == 'shortanswer':
-                    db.shortanswers.delete_one({'activity_id': str(activity_id)})
-                elif activity_type == 'minigame':
-                    db.minigames.delete_one({'activity_id': str(activity_id)})
-                
-                # Delete related data (submissions, progress, etc.)
-                db.activity_progress.delete_many({'activity_id': str(activity_id)})
-                db.activity_submissions.delete_many({'activity_id': str(activity_id)})
+                job_id = cascade_delete.enqueue(db, 'activity', activity, user_id)
+            if not (current_app and current_app.config.get('TESTING')):
+                cascade_delete.cascade_delete_worker.wake()
+            return job_id
         else:
             # Perform soft delete (mark as deleted)
             with get_db_connection() as client:
@@ -237,7 +239,8 @@ class LearningActivityService:
     def record_activity_progress(activity_id: str, student_id: str, progress_percentage: int, time_spent: int = 0) -> Any:
         """Record student's progress on an activity.
 
-        Adds or updates progress record with time spent (in seconds) and completion percentage.
+        Adds or updates progress record with time spent (in seconds) and completion percentage
+        in a single upsert, together with any heartbeats still pending for the same record.
         Returns the progress record.
         """
         if not activity_id or not student_id:
@@ -245,49 +248,33 @@ class LearningActivityService:
         if progress_percentage < 0 or progress_percentage > 100:
             raise ValueError('progress_percentage must be between 0 and 100')
 
-        # Check if progress record exists
+        activity_id, student_id = str(activity_id), str(student_id)
+        now = datetime.utcnow()
+        pending = heartbeat_coalescer.take(activity_id, student_id)
+        if pending:
+            progress_percentage = max(progress_percentage, pending['progress_percentage'])
+            time_spent += pending['time_spent']
+
+        query = {'activity_id': activity_id, 'student_id': student_id}
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            existing_progress = db.activity_progress.find_one({
-                'activity_id': str(activity_id),
-                'student_id': str(student_id)
-            })
-
-        if not existing_progress:
-            progress_data = {
-                'activity_id': str(activity_id),
-                'student_id': str(student_id),
-                'progress_percentage': progress_percentage,
-                'time_spent': time_spent,
-                'last_accessed': datetime.utcnow(),
-                'is_completed': (progress_percentage >= 100)
-            }
-            with get_db_connection() as client:
-                db = client['comp5241_g10']
-                result = db.activity_progress.insert_one(progress_data)
-            progress_data['_id'] = result.inserted_id
-            return progress_data
-        else:
-            # Update fields incrementally
-            update_data = {
-                'progress_percentage': max(existing_progress.get('progress_percentage', 0), progress_percentage),
-                'time_spent': existing_progress.get('time_spent', 0) + time_spent,
-                'last_accessed': datetime.utcnow()
-            }
-            if progress_percentage >= 100:
-                update_data['is_completed'] = True
-
-            with get_db_connection() as client:
-                db = client['comp5241_g10']
-                db.activity_progress.update_one(
-                    {'_id': existing_progress['_id']},
-                    {'$set': update_data}
+            course_id = course_progress.activity_courses(db, [activity_id]).get(activity_id)
+            update = progress_update(progress_percentage, time_spent, now, course_id)
+            try:
+                progress = db.activity_progress.find_one_and_update(
+                    query, update, upsert=True, return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                # A concurrent first write created the record between our match and insert
+                progress = db.activity_progress.find_one_and_update(
+                    query, update, return_document=ReturnDocument.AFTER
                 )
 
-            # Return updated progress
-            with get_db_connection() as client:
-                db = client['comp5241_g10']
-                return db.activity_progress.find_one({'_id': existing_progress['_id']})
+            # Roll the change up into the student's course progress
+            delta = course_progress.ProgressDelta(course_id)
+            delta.progress(db, activity_id, student_id, progress_percentage, time_spent, now)
+            delta.apply(db)
+        return progress
 
     @staticmethod
     def get_student_progress(student_id: str, course_id: Optional[str] = None) -> Any:
@@ -298,15 +285,13 @@ class LearningActivityService:
         query = {'student_id': student_id}
 
         if course_id:
-            # Find activity IDs for the course
+            # Progress records carry their activity's course; building the course rollup
+            # fills it in on records written before that
             with get_db_connection() as client:
                 db = client['comp5241_g10']
-                activities = list(db.learning_activities.find({'course_id': course_id}, {'_id': 1}))
-            activity_ids = [str(a['_id']) for a in activities]
-            if activity_ids:
-                query['activity_id'] = {'$in': activity_ids}
-            else:
-                return []
+                if not db.course_progress.find_one({'course_id': course_id, 'student_id': student_id}, {'_id': 1}):
+                    course_progress.rebuild(db, course_id, student_id)
+            query['course_id'] = course_id
 
         with get_db_connection() as client:
             db = client['comp5241_g10']
@@ -314,34 +299,26 @@ class LearningActivityService:
         return progresses
 
     @staticmethod
-    def get_submissions_for_grading(teacher_id: str, course_id: Optional[str] = None) -> Any:
-        """Return submissions in status 'submitted' for activities created by teacher_id.
+    def get_submissions_for_grading(teacher_id: str, course_id: Optional[str] = None, after: Optional[tuple] = None,
+                                    limit: int = grading_queue.DEFAULT_LIMIT) -> Any:
+        """Return one page of ungraded submissions for activities created by teacher_id, oldest first.
 
-        If course_id provided, limit to that course.
+        If course_id provided, limit to that course. after is the (submitted_at, _id)
+        of the last row of the previous page. Returns (rows, next_after), where
+        next_after is None on the last page.
         """
         if not teacher_id:
             raise ValueError('teacher_id is required')
 
-        # Find activities created by this teacher
-        activity_query = {'created_by': teacher_id}
-        if course_id:
-            activity_query['course_id'] = course_id
-
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            activities = list(db.learning_activities.find(activity_query, {'_id': 1}))
-        activity_ids = [str(a['_id']) for a in activities]
-
-        if not activity_ids:
-            return []
-
-        with get_db_connection() as client:
-            db = client['comp5241_g10']
-            submissions = list(db.activity_submissions.find({
-                'activity_id': {'$in': activity_ids},
-                'status': 'submitted'
-            }).sort('submitted_at', 1))
-        return submissions
+            rows = list(db.learning_activities.aggregate(
+                grading_queue.queue_pipeline(teacher_id, course_id, after, limit)
+            ))
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1]['submitted_at'], rows[-1]['_id'])
 
     @staticmethod
     def get_submissions_for_activity(activity_id: str, teacher_id: Optional[str] = None) -> Any:
@@ -6,7 +6,20 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
+import csv
+import io
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from config.database import get_db_connection
+from app.utils import scheduler
+from .moderation import moderation_registry
+from .answer_clusters import cluster_texts, cluster_cache, DEFAULT_THRESHOLD
+from . import near_duplicates
+from .rubric_scoring import RubricScorer, validate_rubric, rubric_from_example
+from . import grading_stats
+from . import answer_search
+from . import course_progress
+import time
 import logging
 
 # Set up logging
@@ -69,13 +82,18 @@ def create_shortanswer():
             'expires_at': datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None,
             'is_active': True,
             'created_at': datetime.utcnow(),
-            'submissions': []
+            'submission_count': 0,
+            'graded_count': 0
         }
 
+        shortanswer_data.update(scheduler.initial_state('short_answer_questions', shortanswer_data))
+
         with get_db_connection() as client:
             db = client['comp5241_g10']
             result = db.short_answer_questions.insert_one(shortanswer_data)
-        shortanswer_data['_id'] = result.inserted_id
+            db.shortanswer_stats.insert_one(grading_stats.empty_stats(str(result.inserted_id)))
+            shortanswer_data['_id'] = result.inserted_id
+            scheduler.schedule(db, 'short_answer_questions', shortanswer_data)
 
         logger.info(f"Short answer question created successfully by user {user_id}: {shortanswer_data['_id']}")
         return jsonify({
@@ -97,16 +115,20 @@ def list_shortanswers():
         query['course_id'] = course_id
 
     # Sort by creation date (newest first)
+    user_id = get_jwt_identity()
     with get_db_connection() as client:
         db = client['comp5241_g10']
         questions = list(db.short_answer_questions.find(query).sort('created_at', -1))
+        # Only the user's own submissions are read; counts are maintained on each question
+        submitted_ids = {
+            sub['question_id'] for sub in db.shortanswer_submissions.find(
+                {'question_id': {'$in': [str(q['_id']) for q in questions]}, 'submitted_by': user_id},
+                {'_id': 0, 'question_id': 1}
+            )
+        }
     result = []
-    user_id = get_jwt_identity()
 
     for q in questions:
-        # Check if user has already submitted an answer
-        submissions = q.get('submissions', [])
-        has_submitted = any(sub.get('submitted_by') == user_id for sub in submissions)
 
         question_data = {
             'id': str(q['_id']),
@@ -117,8 +139,10 @@ def list_shortanswers():
             'expires_at': q['expires_at'].isoformat() if q.get('expires_at') else None,
             'course_id': q['course_id'],
             'max_length': q['max_length'],
-            'submission_count': len(submissions),
-            'has_submitted': has_submitted
+            'submission_count': q.get('submission_count', 0),
+            'graded_count': q.get('graded_count', 0),
+            'last_activity_at': q['last_activity_at'].isoformat() if q.get('last_activity_at') else None,
+            'has_submitted': str(q['_id']) in submitted_ids
         }
 
         # Include hints for students
@@ -141,15 +165,17 @@ def get_shortanswer(question_id):
         with get_db_connection() as client:
             db = client['comp5241_g10']
             question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)})
-        if not question:
-            return jsonify({'error': 'Short answer question not found'}), 404
-            
-        user_id = get_jwt_identity()
-        is_creator = question['created_by'] == user_id
-        
-        # Find user's submission if exists
-        submissions = question.get('submissions', [])
-        user_submission = next((sub for sub in submissions if sub.get('submitted_by') == user_id), None)
+            if not question:
+                return jsonify({'error': 'Short answer question not found'}), 404
+
+            user_id = get_jwt_identity()
+            is_creator = question['created_by'] == user_id
+
+            # Find user's submission if exists
+            user_submission = db.shortanswer_submissions.find_one({'question_id': question_id, 'submitted_by': user_id})
+            submissions = list(db.shortanswer_submissions.find(
+                {'question_id': question_id}
+            ).sort('submitted_at', 1)) if is_creator else []
         
         result = {
             'id': str(question['_id']),
@@ -194,6 +220,49 @@ def get_shortanswer(question_id):
         logger.error(f"Error getting short answer question: {str(e)}")
         return jsonify({'error': 'Failed to get short answer question', 'details': str(e)}), 500
 
+def _upsert_submission(db, question, user_id, answer, submitted_at):
+    """Store a student's answer; returns True when it replaced an earlier one"""
+    query = {'question_id': str(question['_id']), 'submitted_by': user_id}
+    update = {
+        '$set': {
+            'text': answer,
+            'submitted_at': submitted_at,
+            'is_graded': False,
+            'feedback': '',
+            'score': None,
+            # Terms for the text index used by answer search
+            'search_text': answer_search.search_field(answer),
+            # MinHash signature and LSH band keys for near-duplicate lookups
+            **near_duplicates.signature_fields(answer)
+        },
+        '$setOnInsert': {'course_id': question.get('course_id')},
+        '$unset': {'suggested_score': '', 'suggestion': ''}
+    }
+    # The previous grading state is needed to adjust the question's statistics
+    state = {'is_graded': 1, 'score': 1}
+    try:
+        before = db.shortanswer_submissions.find_one_and_update(
+            query, update, projection=state, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # A concurrent first submission inserted the document; this one becomes an update
+        before = db.shortanswer_submissions.find_one_and_update(
+            query, update, projection=state, return_document=ReturnDocument.BEFORE
+        )
+    grading_stats.record_transition(db, str(question['_id']), before, {'is_graded': False, 'score': None})
+    delta = course_progress.ProgressDelta(question.get('course_id'))
+    if before is None:
+        delta.completed(user_id, 'shortanswer')
+    delta.score(user_id, grading_stats.graded_score(before), None)
+    delta.touch(user_id, submitted_at)
+    delta.apply(db)
+    # submission_version invalidates anything derived from the set of answers (e.g. clusters)
+    db.short_answer_questions.update_one(
+        {'_id': question['_id']},
+        {'$inc': {'submission_version': 1}, '$max': {'last_activity_at': submitted_at}}
+    )
+    return before is not None
+
 # Enhanced answer submission with better validation
 @shortanswers_bp.route('/<question_id>/submit', methods=['POST'])
 @jwt_required(locations=["cookies"])
@@ -211,7 +280,9 @@ def submit_answer(question_id):
         
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)})
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'submissions': 0})
+            if question:
+                moderation = moderation_registry.check(db, question.get('course_id'), answer, 'shortanswer')
         if not question:
             return jsonify({'error': 'Short answer question not found'}), 404
         
@@ -232,40 +303,18 @@ def submit_answer(question_id):
                 'max_length': max_length
             }), 400
         
-        # Find existing submission
-        submissions = question.get('submissions', [])
-        existing_submission = next((sub for sub in submissions if sub.get('submitted_by') == user_id), None)
+        # Blocked language: reject, or mask it if the course list says so
+        if moderation.blocked:
+            if moderation.action != 'mask':
+                return jsonify({'error': 'Answer contains blocked language'}), 400
+            answer = moderation.masked_text
         
         current_time = datetime.utcnow()
         
-        if existing_submission:
-            # Update existing submission
-            existing_submission['text'] = answer
-            existing_submission['submitted_at'] = current_time
-            existing_submission['is_graded'] = False  # Reset graded status on resubmission
-            existing_submission['feedback'] = ''
-            existing_submission['score'] = None
-            is_update = True
-        else:
-            # Create new submission
-            new_submission = {
-                'text': answer,
-                'submitted_by': user_id,
-                'submitted_at': current_time,
-                'is_graded': False,
-                'feedback': '',
-                'score': None
-            }
-            submissions.append(new_submission)
-            is_update = False
-        
-        # Update the question in database
+        # Upsert on (question_id, submitted_by); resubmission resets grading
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            db.short_answer_questions.update_one(
-                {'_id': ObjectId(question_id)},
-                {'$set': {'submissions': submissions}}
-            )
+            is_update = _upsert_submission(db, question, user_id, answer, current_time)
         
         logger.info(f"Answer {'updated' if is_update else 'submitted'} for question {question_id} by user {user_id}")
         
@@ -273,6 +322,7 @@ def submit_answer(question_id):
             'message': f'Answer {"updated" if is_update else "submitted"} successfully',
             'is_update': is_update,
             'answer_length': len(answer),
+            'masked': moderation.blocked,
             'submitted_at': current_time.isoformat()
         }), 200
         
@@ -293,7 +343,7 @@ def provide_feedback(question_id, student_id):
         
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)})
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'created_by': 1, 'course_id': 1})
         if not question:
             return jsonify({'error': 'Short answer question not found'}), 404
         
@@ -301,17 +351,10 @@ def provide_feedback(question_id, student_id):
         if question['created_by'] != user_id:
             return jsonify({'error': 'Only the creator can provide feedback'}), 403
         
-        # Find the student's submission
-        submissions = question.get('submissions', [])
-        submission = next((sub for sub in submissions if sub.get('submitted_by') == student_id), None)
-        
-        if not submission:
-            return jsonify({'error': 'Student submission not found'}), 404
-        
+        updates = {}
         # Update feedback
         if 'feedback' in data:
-            feedback = str(data['feedback']).strip()
-            submission['feedback'] = feedback
+            updates['feedback'] = str(data['feedback']).strip()
         
         # Update score with validation
         if 'score' in data:
@@ -319,18 +362,31 @@ def provide_feedback(question_id, student_id):
                 score = float(data['score'])
                 if score < 0 or score > 100:
                     return jsonify({'error': 'Score must be between 0 and 100'}), 400
-                submission['score'] = score
-                submission['is_graded'] = True
+                updates['score'] = score
+                updates['is_graded'] = True
             except (ValueError, TypeError):
                 return jsonify({'error': 'Invalid score format - must be a number'}), 400
         
-        # Update the question in database
+        # Update only the student's submission
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            db.short_answer_questions.update_one(
-                {'_id': ObjectId(question_id)},
-                {'$set': {'submissions': submissions}}
-            )
+            query = {'question_id': question_id, 'submitted_by': student_id}
+            projection = {'feedback': 1, 'score': 1, 'is_graded': 1}
+            if updates:
+                before = db.shortanswer_submissions.find_one_and_update(
+                    query, {'$set': updates}, projection=projection, return_document=ReturnDocument.BEFORE
+                )
+                submission = dict(before, **updates) if before else None
+                if before:
+                    grading_stats.record_transition(db, question_id, before, submission)
+                    delta = course_progress.ProgressDelta(question.get('course_id'))
+                    delta.score(student_id, grading_stats.graded_score(before), grading_stats.graded_score(submission))
+                    delta.apply(db)
+            else:
+                submission = db.shortanswer_submissions.find_one(query, projection)
+        
+        if not submission:
+            return jsonify({'error': 'Student submission not found'}), 404
         
         logger.info(f"Feedback provided for question {question_id}, student {student_id} by user {user_id}")
         
@@ -346,6 +402,130 @@ def provide_feedback(question_id, student_id):
         logger.error(f"Error providing feedback: {str(e)}")
         return jsonify({'error': 'Failed to provide feedback', 'details': str(e)}), 500
 
+GRADE_CHUNK_SIZE = 500
+
+def _parse_grade(grade_data):
+    """Validate one grade row; returns (student_id, updates) or raises ValueError"""
+    student_id = grade_data.get('student_id')
+    if not student_id:
+        raise ValueError('Missing student_id')
+    student_id = str(student_id).strip()
+
+    updates = {}
+    feedback = grade_data.get('feedback', '')
+    if feedback:
+        updates['feedback'] = str(feedback).strip()
+
+    score = grade_data.get('score')
+    if score is not None and score != '':
+        try:
+            score_value = float(score)
+        except (ValueError, TypeError):
+            raise ValueError(f'Invalid score format for student {student_id}')
+        if score_value < 0 or score_value > 100:
+            raise ValueError(f'Invalid score {score_value} for student {student_id}')
+        updates['score'] = score_value
+        updates['is_graded'] = True
+    return student_id, updates
+
+def _apply_grades(db, question_id, grades):
+    """Grade submissions with one existence lookup and one bulk_write per chunk.
+
+    Each update is conditional on the grading state read by the lookup, so the
+    chunk's statistics change can be applied as one delta; if a concurrent
+    grader changed a submission in between, the statistics are rebuilt instead.
+
+    Returns (successful_grades, failed_grades) in the same shape the batch
+    grading endpoints report.
+    """
+    successful_grades = []
+    failed_grades = []
+    question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'course_id': 1}) or {}
+
+    for offset in range(0, len(grades), GRADE_CHUNK_SIZE):
+        chunk = grades[offset:offset + GRADE_CHUNK_SIZE]
+        parsed = {}  # student_id -> updates; a later row for the same student wins
+        for grade_data in chunk:
+            try:
+                if not isinstance(grade_data, dict):
+                    raise ValueError('Grade entry must be an object')
+                student_id, updates = _parse_grade(grade_data)
+            except ValueError as e:
+                failed_grades.append({'error': str(e), 'data': grade_data})
+                continue
+            parsed[student_id] = dict(parsed.get(student_id, {}), **updates)
+        if not parsed:
+            continue
+
+        existing = {
+            sub['submitted_by']: sub for sub in db.shortanswer_submissions.find(
+                {'question_id': question_id, 'submitted_by': {'$in': list(parsed)}},
+                {'submitted_by': 1, 'is_graded': 1, 'score': 1}
+            )
+        }
+        requests, written, graded = [], [], []
+        for student_id, updates in parsed.items():
+            if student_id not in existing:
+                failed_grades.append({'error': f'Submission not found for student {student_id}', 'student_id': student_id})
+                continue
+            if updates:
+                before = existing[student_id]
+                requests.append(UpdateOne({
+                    'question_id': question_id,
+                    'submitted_by': student_id,
+                    'is_graded': before.get('is_graded'),
+                    'score': before.get('score')
+                }, {'$set': updates}))
+                written.append(student_id)
+            graded.append((student_id, updates))
+
+        write_failures = set()
+        if requests:
+            try:
+                matched = db.shortanswer_submissions.bulk_write(requests, ordered=False).matched_count
+            except BulkWriteError as e:
+                # Unordered: every other write still applied
+                matched = e.details.get('nMatched', 0)
+                for error in e.details.get('writeErrors', []):
+                    student_id = written[error['index']]
+                    write_failures.add(student_id)
+                    failed_grades.append({'error': error.get('errmsg', 'Write failed'), 'student_id': student_id})
+
+            if matched == len(requests) - len(write_failures):
+                delta = grading_stats.StatsDelta()
+                progress = course_progress.ProgressDelta(question.get('course_id'))
+                for student_id in written:
+                    if student_id not in write_failures:
+                        before = existing[student_id]
+                        after = dict(before, **parsed[student_id])
+                        delta.transition(before, after)
+                        progress.score(student_id, grading_stats.graded_score(before), grading_stats.graded_score(after))
+                delta.apply(db, question_id)
+                progress.apply(db)
+            else:
+                # Some submission changed after the lookup: apply the missed grades
+                # unconditionally and recompute the statistics from scratch
+                pending = [student_id for student_id in written if student_id not in write_failures]
+                for submission in db.shortanswer_submissions.find(
+                    {'question_id': question_id, 'submitted_by': {'$in': pending}},
+                    {'submitted_by': 1, 'feedback': 1, 'is_graded': 1, 'score': 1}
+                ):
+                    updates = parsed[submission['submitted_by']]
+                    if any(submission.get(field) != value for field, value in updates.items()):
+                        db.shortanswer_submissions.update_one({'_id': submission['_id']}, {'$set': updates})
+                grading_stats.rebuild_stats(db, question_id)
+                if question.get('course_id'):
+                    for student_id in pending:
+                        course_progress.rebuild(db, question['course_id'], student_id)
+
+        successful_grades.extend({
+            'student_id': student_id,
+            'feedback': updates.get('feedback'),
+            'score': updates.get('score')
+        } for student_id, updates in graded if student_id not in write_failures)
+
+    return successful_grades, failed_grades
+
 # Batch grading endpoint
 @shortanswers_bp.route('/<question_id>/batch-grade', methods=['POST'])
 @jwt_required(locations=["cookies"])
@@ -359,7 +539,7 @@ def batch_grade(question_id):
         
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)})
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'created_by': 1})
         if not question:
             return jsonify({'error': 'Short answer question not found'}), 404
         
@@ -371,58 +551,9 @@ def batch_grade(question_id):
         if not isinstance(grades, list):
             return jsonify({'error': 'Grades must be provided as a list'}), 400
         
-        submissions = question.get('submissions', [])
-        successful_grades = []
-        failed_grades = []
-        
-        for grade_data in grades:
-            try:
-                student_id = grade_data.get('student_id')
-                feedback = grade_data.get('feedback', '')
-                score = grade_data.get('score')
-                
-                if not student_id:
-                    failed_grades.append({'error': 'Missing student_id', 'data': grade_data})
-                    continue
-                
-                # Find submission
-                submission = next((sub for sub in submissions if sub.get('submitted_by') == student_id), None)
-                if not submission:
-                    failed_grades.append({'error': f'Submission not found for student {student_id}', 'student_id': student_id})
-                    continue
-                
-                # Update submission
-                if feedback:
-                    submission['feedback'] = str(feedback).strip()
-                
-                if score is not None:
-                    try:
-                        score_value = float(score)
-                        if score_value < 0 or score_value > 100:
-                            failed_grades.append({'error': f'Invalid score {score_value} for student {student_id}', 'student_id': student_id})
-                            continue
-                        submission['score'] = score_value
-                        submission['is_graded'] = True
-                    except (ValueError, TypeError):
-                        failed_grades.append({'error': f'Invalid score format for student {student_id}', 'student_id': student_id})
-                        continue
-                
-                successful_grades.append({
-                    'student_id': student_id,
-                    'feedback': submission.get('feedback'),
-                    'score': submission.get('score')
-                })
-                
-            except Exception as e:
-                failed_grades.append({'error': str(e), 'data': grade_data})
-        
-        # Update the question in database
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            db.short_answer_questions.update_one(
-                {'_id': ObjectId(question_id)},
-                {'$set': {'submissions': submissions}}
-            )
+            successful_grades, failed_grades = _apply_grades(db, question_id, grades)
         
         logger.info(f"Batch grading completed for question {question_id}: {len(successful_grades)} successful, {len(failed_grades)} failed")
         
@@ -438,68 +569,643 @@ def batch_grade(question_id):
         logger.error(f"Error in batch grading: {str(e)}")
         return jsonify({'error': 'Failed to process batch grading', 'details': str(e)}), 500
 
-# Get grading statistics for teachers
-@shortanswers_bp.route('/<question_id>/stats', methods=['GET'])
+def _grade_csv_rows(db, question_id, reader):
+    """Grade CSV rows in chunks of GRADE_CHUNK_SIZE as they are read.
+
+    A file that turns out to be unreadable part way through keeps the grades
+    of the chunks already written; the break is reported as one more failure
+    and the rows after it are not read.
+
+    Returns (successful_grades, failed_grades) as _apply_grades does.
+    """
+    successful_grades, failed_grades, rows = [], [], []
+    try:
+        for row in reader:
+            rows.append(row)
+            if len(rows) == GRADE_CHUNK_SIZE:
+                successful, failed = _apply_grades(db, question_id, rows)
+                successful_grades.extend(successful)
+                failed_grades.extend(failed)
+                rows = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        failed_grades.append({'error': f'Invalid CSV after line {reader.line_num}, later rows were not read: {e}',
+                              'line': reader.line_num})
+    if rows:
+        successful, failed = _apply_grades(db, question_id, rows)
+        successful_grades.extend(successful)
+        failed_grades.extend(failed)
+    return successful_grades, failed_grades
+
+# Batch grading from a CSV upload (student_id, score, feedback columns)
+@shortanswers_bp.route('/<question_id>/batch-grade/csv', methods=['POST'])
 @jwt_required(locations=["cookies"])
-def get_grading_stats(question_id):
+def batch_grade_csv(question_id):
     try:
         user_id = get_jwt_identity()
+        
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)})
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'created_by': 1})
         if not question:
             return jsonify({'error': 'Short answer question not found'}), 404
         
         # Ensure user is the creator of the question
         if question['created_by'] != user_id:
-            return jsonify({'error': 'Only the creator can view statistics'}), 403
-        
-        submissions = question.get('submissions', [])
-        total_submissions = len(submissions)
-        graded_count = sum(1 for sub in submissions if sub.get('is_graded', False))
-        ungraded_count = total_submissions - graded_count
-        
-        # Calculate score statistics
-        graded_submissions = [s for s in submissions if s.get('is_graded', False) and s.get('score') is not None]
-        
-        if graded_submissions:
-            scores = [s['score'] for s in graded_submissions]
-            avg_score = sum(scores) / len(scores)
-            max_score = max(scores)
-            min_score = min(scores)
-        else:
-            avg_score = max_score = min_score = 0
-        
-        # Get submission timeline data
-        submission_timeline = []
-        for submission in submissions:
-            submission_timeline.append({
-                'student_id': submission.get('submitted_by'),
-                'submitted_at': submission.get('submitted_at').isoformat(),
-                'is_graded': submission.get('is_graded', False),
-                'score': submission.get('score'),
-                'word_count': len(submission.get('text', '').split())
+            return jsonify({'error': 'Only the creator can grade submissions'}), 403
+        
+        # Either a multipart 'file' field or a raw text/csv body; rows are read as they arrive
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        if not reader.fieldnames or 'student_id' not in reader.fieldnames:
+            return jsonify({'error': 'CSV must have a header row with a student_id column'}), 400
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            successful_grades, failed_grades = _grade_csv_rows(db, question_id, reader)
+        
+        logger.info(f"CSV batch grading completed for question {question_id}: {len(successful_grades)} successful, {len(failed_grades)} failed")
+        
+        # Rows are written chunk by chunk, so a partial failure is reported per row rather than undone
+        return jsonify({
+            'message': 'Batch grading completed' if not failed_grades else 'Batch grading completed with failures',
+            'successful_grades': len(successful_grades),
+            'failed_grades': len(failed_grades),
+            'success_details': successful_grades,
+            'error_details': failed_grades
+        }), 207 if failed_grades else 200
+        
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'error': 'Invalid CSV file', 'details': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in CSV batch grading: {str(e)}")
+        return jsonify({'error': 'Failed to process batch grading', 'details': str(e)}), 500
+
+def _load_clusters(db, question_id, version, threshold):
+    """Clusters of student IDs for this submission version, from cache or freshly computed"""
+    key = (question_id, version, threshold)
+    clusters = cluster_cache.get(key)
+    if clusters is None:
+        submissions = list(db.shortanswer_submissions.find(
+            {'question_id': question_id}, {'_id': 0, 'submitted_by': 1, 'text': 1}
+        ).sort('submitted_by', 1))
+        groups = cluster_texts([sub.get('text', '') for sub in submissions], threshold)
+        clusters = [[submissions[index]['submitted_by'] for index in group] for group in groups]
+        cluster_cache.put(key, clusters)
+    return clusters
+
+def _clamp_cluster_threshold(value):
+    return round(min(max(value, 0.3), 0.95), 2)
+
+def _cluster_threshold():
+    return _clamp_cluster_threshold(request.args.get('threshold', DEFAULT_THRESHOLD, type=float))
+
+def _cluster_grade_conflict(data, version):
+    """Reject a cluster grade that doesn't name the clusters the teacher looked at.
+
+    Cluster IDs are only meaningful for one submission_version and threshold,
+    so both must be sent back exactly as the clusters response gave them.
+    Returns (message, status) or None.
+    """
+    threshold = data.get('threshold')
+    if 'submission_version' not in data or threshold is None:
+        return 'submission_version and threshold from the clusters response are required', 400
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+        return 'threshold must be a number', 400
+    # The clusters response only ever echoes a clamped threshold
+    if _clamp_cluster_threshold(threshold) != threshold:
+        return 'Threshold does not match a clusters response; reload the clusters', 409
+    if data['submission_version'] != version:
+        return 'Answers have changed; reload the clusters', 409
+    return None
+
+# Similar answers grouped for grading together (teacher only)
+@shortanswers_bp.route('/<question_id>/clusters', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def get_answer_clusters(question_id):
+    try:
+        user_id = get_jwt_identity()
+        threshold = _cluster_threshold()
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            question = db.short_answer_questions.find_one(
+                {'_id': ObjectId(question_id)}, {'created_by': 1, 'submission_version': 1}
+            )
+            if not question:
+                return jsonify({'error': 'Short answer question not found'}), 404
+            if question['created_by'] != user_id:
+                return jsonify({'error': 'Only the creator can view answer clusters'}), 403
+            
+            version = question.get('submission_version', 0)
+            clusters = _load_clusters(db, question_id, version, threshold)
+            # Grading state is read fresh; only the grouping is cached
+            submissions = {
+                sub['submitted_by']: sub for sub in db.shortanswer_submissions.find(
+                    {'question_id': question_id},
+                    {'_id': 0, 'submitted_by': 1, 'text': 1, 'is_graded': 1, 'score': 1}
+                )
+            }
+        
+        result = []
+        for cluster_id, members in enumerate(clusters):
+            member_data = [{
+                'student_id': student_id,
+                'text': submissions[student_id].get('text'),
+                'is_graded': submissions[student_id].get('is_graded', False),
+                'score': submissions[student_id].get('score')
+            } for student_id in members if student_id in submissions]
+            result.append({
+                'cluster_id': cluster_id,
+                'size': len(member_data),
+                'graded_count': sum(1 for member in member_data if member['is_graded']),
+                'representative': member_data[0] if member_data else None,
+                'members': member_data
             })
         
         return jsonify({
             'question_id': question_id,
-            'title': question['question'][:100] + '...' if len(question['question']) > 100 else question['question'],
-            'statistics': {
-                'total_submissions': total_submissions,
-                'graded_submissions': graded_count,
-                'ungraded_submissions': ungraded_count,
-                'grading_progress': round((graded_count / total_submissions * 100), 1) if total_submissions > 0 else 0,
-                'average_score': round(avg_score, 1),
-                'highest_score': max_score,
-                'lowest_score': min_score
-            },
-            'submission_timeline': sorted(submission_timeline, key=lambda x: x['submitted_at'], reverse=True)
+            'submission_version': version,
+            'threshold': threshold,
+            'cluster_count': len(result),
+            'clustered_answers': sum(cluster['size'] for cluster in result if cluster['size'] > 1),
+            'clusters': result
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error clustering answers: {str(e)}")
+        return jsonify({'error': 'Failed to cluster answers', 'details': str(e)}), 500
+
+# Grade every answer in a cluster at once (teacher only)
+@shortanswers_bp.route('/<question_id>/clusters/<int:cluster_id>/grade', methods=['POST'])
+@jwt_required(locations=["cookies"])
+def grade_answer_cluster(question_id, cluster_id):
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        if not data or ('score' not in data and 'feedback' not in data):
+            return jsonify({'error': 'Missing score or feedback'}), 400
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            question = db.short_answer_questions.find_one(
+                {'_id': ObjectId(question_id)}, {'created_by': 1, 'submission_version': 1}
+            )
+            if not question:
+                return jsonify({'error': 'Short answer question not found'}), 404
+            if question['created_by'] != user_id:
+                return jsonify({'error': 'Only the creator can grade submissions'}), 403
+            
+            # Answers or threshold changed since the teacher looked at the clusters
+            version = question.get('submission_version', 0)
+            conflict = _cluster_grade_conflict(data, version)
+            if conflict:
+                message, status = conflict
+                return jsonify({'error': message, 'submission_version': version}), status
+            
+            clusters = _load_clusters(db, question_id, version, data['threshold'])
+            if cluster_id < 0 or cluster_id >= len(clusters):
+                return jsonify({'error': 'Cluster not found'}), 404
+            
+            grades = [{
+                'student_id': student_id,
+                'score': data.get('score'),
+                'feedback': data.get('feedback', '')
+            } for student_id in clusters[cluster_id]]
+            successful_grades, failed_grades = _apply_grades(db, question_id, grades)
+        
+        logger.info(f"Cluster {cluster_id} of question {question_id} graded by user {user_id}: {len(successful_grades)} answers")
+        
+        return jsonify({
+            'message': 'Cluster graded successfully',
+            'cluster_id': cluster_id,
+            'successful_grades': len(successful_grades),
+            'failed_grades': len(failed_grades),
+            'error_details': failed_grades
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error grading cluster: {str(e)}")
+        return jsonify({'error': 'Failed to grade cluster', 'details': str(e)}), 500
+
+def _backfill_signatures(db, query):
+    """Compute signatures for submissions stored before they were recorded at submit time"""
+    missing = list(db.shortanswer_submissions.find(dict(query, minhash={'$exists': False}), {'text': 1}))
+    if missing:
+        db.shortanswer_submissions.bulk_write([
+            UpdateOne({'_id': sub['_id']}, {'$set': near_duplicates.signature_fields(sub.get('text', ''))})
+            for sub in missing
+        ], ordered=False)
+
+def _course_scope_error(question, scope):
+    """Why scope can't be used for this question, or None.
+
+    A course scope on a question without a course would match every other
+    course-less answer instead of one course's.
+    """
+    if scope == 'course' and not question.get('course_id'):
+        return 'Question is not in a course; use scope=question'
+    return None
+
+def _similarity_threshold():
+    return min(max(request.args.get('threshold', near_duplicates.DEFAULT_THRESHOLD, type=float), 0.3), 1.0)
+
+# Near-duplicates of one student's answer, in this question or across the course (teacher only)
+@shortanswers_bp.route('/<question_id>/near-duplicates/<student_id>', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def get_near_duplicates(question_id, student_id):
+    try:
+        user_id = get_jwt_identity()
+        threshold = _similarity_threshold()
+        scope = request.args.get('scope', 'question')
+        if scope not in ('question', 'course'):
+            return jsonify({'error': 'Scope must be question or course'}), 400
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'created_by': 1, 'course_id': 1})
+            if not question:
+                return jsonify({'error': 'Short answer question not found'}), 404
+            if question['created_by'] != user_id:
+                return jsonify({'error': 'Only the creator can check for copied answers'}), 403
+            scope_error = _course_scope_error(question, scope)
+            if scope_error:
+                return jsonify({'error': scope_error}), 400
+            
+            scope_query = {'question_id': question_id} if scope == 'question' else {'course_id': question.get('course_id')}
+            _backfill_signatures(db, scope_query)
+            submission = db.shortanswer_submissions.find_one(
+                {'question_id': question_id, 'submitted_by': student_id}, {'minhash': 1, 'lsh_bands': 1}
+            )
+            if not submission:
+                return jsonify({'error': 'Student submission not found'}), 404
+            
+            # Only answers sharing an LSH band are compared
+            candidates = list(db.shortanswer_submissions.find(
+                dict(scope_query, lsh_bands={'$in': submission['lsh_bands']}, _id={'$ne': submission['_id']}),
+                {'question_id': 1, 'submitted_by': 1, 'text': 1, 'minhash': 1}
+            ))
+        
+        signature = near_duplicates.decode_signature(submission['minhash'])
+        matches = []
+        for candidate in candidates:
+            score = near_duplicates.similarity(signature, near_duplicates.decode_signature(candidate['minhash']))
+            if score >= threshold:
+                matches.append({
+                    'question_id': candidate['question_id'],
+                    'student_id': candidate['submitted_by'],
+                    'similarity': round(score, 3),
+                    'text': candidate.get('text')
+                })
+        matches.sort(key=lambda match: match['similarity'], reverse=True)
+        
+        return jsonify({
+            'question_id': question_id,
+            'student_id': student_id,
+            'scope': scope,
+            'threshold': threshold,
+            'candidates_checked': len(candidates),
+            'near_duplicates': matches
         }), 200
         
+    except Exception as e:
+        logger.error(f"Error finding near-duplicates: {str(e)}")
+        return jsonify({'error': 'Failed to find near-duplicates', 'details': str(e)}), 500
+
+# Report of suspiciously similar answer pairs for a question (teacher only)
+@shortanswers_bp.route('/<question_id>/suspicious-pairs', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def get_suspicious_pairs(question_id):
+    try:
+        user_id = get_jwt_identity()
+        threshold = _similarity_threshold()
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'created_by': 1})
+            if not question:
+                return jsonify({'error': 'Short answer question not found'}), 404
+            if question['created_by'] != user_id:
+                return jsonify({'error': 'Only the creator can check for copied answers'}), 403
+            
+            _backfill_signatures(db, {'question_id': question_id})
+            submissions = list(db.shortanswer_submissions.find(
+                {'question_id': question_id}, {'submitted_by': 1, 'text': 1, 'minhash': 1, 'lsh_bands': 1}
+            ))
+        
+        pairs = near_duplicates.similar_pairs(submissions, threshold)
+        report = [{
+            'student_a': submissions[first]['submitted_by'],
+            'student_b': submissions[second]['submitted_by'],
+            'similarity': score,
+            'text_a': submissions[first].get('text'),
+            'text_b': submissions[second].get('text')
+        } for first, second, score in pairs[:limit]]
+        
+        return jsonify({
+            'question_id': question_id,
+            'threshold': threshold,
+            'submission_count': len(submissions),
+            'pair_count': len(pairs),
+            'pairs': report
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error building suspicious pairs report: {str(e)}")
+        return jsonify({'error': 'Failed to build suspicious pairs report', 'details': str(e)}), 500
+
+def _backfill_search_text(db, query):
+    """Compute search terms for submissions stored before they were recorded at submit time"""
+    missing = list(db.shortanswer_submissions.find(dict(query, search_text={'$exists': False}), {'text': 1}))
+    if missing:
+        db.shortanswer_submissions.bulk_write([
+            UpdateOne({'_id': sub['_id']}, {'$set': {'search_text': answer_search.search_field(sub.get('text', ''))}})
+            for sub in missing
+        ], ordered=False)
+
+# Full-text search over answers to this question or across its course (teacher only)
+@shortanswers_bp.route('/<question_id>/search', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def search_answers(question_id):
+    try:
+        user_id = get_jwt_identity()
+        scope = request.args.get('scope', 'question')
+        if scope not in ('question', 'course'):
+            return jsonify({'error': 'Scope must be question or course'}), 400
+        try:
+            query = answer_search.parse_query(request.args.get('q', ''))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'created_by': 1, 'course_id': 1})
+            if not question:
+                return jsonify({'error': 'Short answer question not found'}), 404
+            if question['created_by'] != user_id:
+                return jsonify({'error': 'Only the creator can search answers'}), 403
+            scope_error = _course_scope_error(question, scope)
+            if scope_error:
+                return jsonify({'error': scope_error}), 400
+            
+            # course_id is the text index's prefix, so the search only touches this course's answers
+            scope_query = {'course_id': question.get('course_id')}
+            if scope == 'question':
+                scope_query['question_id'] = question_id
+            _backfill_search_text(db, scope_query)
+            text_query = dict(scope_query, **{'$text': {'$search': query.search}})
+            total = db.shortanswer_submissions.count_documents(text_query)
+            results = list(db.shortanswer_submissions.find(text_query, {
+                'question_id': 1, 'submitted_by': 1, 'text': 1, 'submitted_at': 1,
+                'is_graded': 1, 'score': 1, 'relevance': {'$meta': 'textScore'}
+            }).sort([('relevance', {'$meta': 'textScore'})]).skip((page - 1) * per_page).limit(per_page))
+        
+        return jsonify({
+            'question_id': question_id,
+            'scope': scope,
+            'query': request.args.get('q', ''),
+            'results': [{
+                'question_id': result['question_id'],
+                'student_id': result['submitted_by'],
+                'text': result.get('text', ''),
+                'highlights': answer_search.highlight(result.get('text', ''), query),
+                'relevance': round(result['relevance'], 3),
+                'submitted_at': result['submitted_at'].isoformat() if result.get('submitted_at') else None,
+                'is_graded': result.get('is_graded', False),
+                'score': result.get('score')
+            } for result in results],
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'pages': (total + per_page - 1) // per_page
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error searching answers: {str(e)}")
+        return jsonify({'error': 'Failed to search answers', 'details': str(e)}), 500
+
+# Set the keyword rubric used for suggested scores (teacher only)
+@shortanswers_bp.route('/<question_id>/rubric', methods=['PUT'])
+@jwt_required(locations=["cookies"])
+def set_rubric(question_id):
+    try:
+        user_id = get_jwt_identity()
+        rubric = request.get_json()
+        
+        validation_errors = validate_rubric(rubric)
+        if validation_errors:
+            return jsonify({'error': 'Validation failed', 'details': validation_errors}), 400
+        
+        stored = {
+            'keywords': [{
+                'term': str(keyword['term']).strip(),
+                'weight': keyword.get('weight', 1),
+                'required': bool(keyword.get('required', False))
+            } for keyword in rubric['keywords']],
+            'min_words': rubric.get('min_words'),
+            'max_words': rubric.get('max_words'),
+            'max_edit_distance': rubric.get('max_edit_distance', 1),
+            'length_penalty': rubric.get('length_penalty', 10)
+        }
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            result = db.short_answer_questions.update_one(
+                {'_id': ObjectId(question_id), 'created_by': user_id},
+                {'$set': {'rubric': stored}}
+            )
+        if not result.matched_count:
+            return jsonify({'error': 'Short answer question not found or not owned by you'}), 404
+        
+        return jsonify({'message': 'Rubric saved successfully', 'rubric': stored}), 200
+        
+    except Exception as e:
+        logger.error(f"Error saving rubric: {str(e)}")
+        return jsonify({'error': 'Failed to save rubric', 'details': str(e)}), 500
+
+# Suggest scores for all ungraded answers from the rubric (teacher only)
+@shortanswers_bp.route('/<question_id>/autoscore', methods=['POST'])
+@jwt_required(locations=["cookies"])
+def autoscore_answers(question_id):
+    try:
+        user_id = get_jwt_identity()
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            question = db.short_answer_questions.find_one(
+                {'_id': ObjectId(question_id)}, {'created_by': 1, 'rubric': 1, 'example_answer': 1}
+            )
+            if not question:
+                return jsonify({'error': 'Short answer question not found'}), 404
+            if question['created_by'] != user_id:
+                return jsonify({'error': 'Only the creator can score submissions'}), 403
+            
+            # Without a rubric, the example answer's content words are the keywords
+            rubric = question.get('rubric') or rubric_from_example(question.get('example_answer', ''))
+            if not rubric:
+                return jsonify({'error': 'Set a rubric or an example answer before auto-scoring'}), 400
+            
+            submissions = list(db.shortanswer_submissions.find(
+                {'question_id': question_id, 'is_graded': False}, {'text': 1}
+            ))
+            start = time.perf_counter()
+            scores, details = RubricScorer(rubric).score([sub.get('text', '') for sub in submissions])
+            elapsed = time.perf_counter() - start
+            
+            if submissions:
+                suggested_at = datetime.utcnow()
+                db.shortanswer_submissions.bulk_write([
+                    UpdateOne(
+                        # Skip answers graded or resubmitted while scoring ran
+                        {'_id': sub['_id'], 'is_graded': False, 'text': sub.get('text')},
+                        {'$set': {'suggested_score': float(score), 'suggestion': dict(detail, suggested_at=suggested_at)}}
+                    ) for sub, score, detail in zip(submissions, scores, details)
+                ], ordered=False)
+        
+        return jsonify({
+            'message': 'Suggested scores saved',
+            'scored_submissions': len(submissions),
+            'average_suggested_score': round(float(scores.mean()), 1) if len(submissions) else None,
+            'answers_per_second': round(len(submissions) / elapsed) if elapsed > 0 else None,
+            'used_example_answer': not question.get('rubric')
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error auto-scoring answers: {str(e)}")
+        return jsonify({'error': 'Failed to auto-score answers', 'details': str(e)}), 500
+
+# Accept suggested scores as final grades (teacher only)
+@shortanswers_bp.route('/<question_id>/suggestions/confirm', methods=['POST'])
+@jwt_required(locations=["cookies"])
+def confirm_suggestions(question_id):
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        student_ids = data.get('student_ids')
+        if student_ids is not None and not isinstance(student_ids, list):
+            return jsonify({'error': 'student_ids must be a list'}), 400
+        
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'created_by': 1, 'course_id': 1})
+            if not question:
+                return jsonify({'error': 'Short answer question not found'}), 404
+            if question['created_by'] != user_id:
+                return jsonify({'error': 'Only the creator can grade submissions'}), 403
+            
+            query = {'question_id': question_id, 'is_graded': False, 'suggested_score': {'$ne': None}}
+            if student_ids is not None:
+                query['submitted_by'] = {'$in': [str(student_id) for student_id in student_ids]}
+            pending = list(db.shortanswer_submissions.find(query, {'submitted_by': 1, 'score': 1, 'suggested_score': 1}))
+            query['_id'] = {'$in': [submission['_id'] for submission in pending]}
+            # Pipeline update copies each document's own suggestion into its score
+            result = db.shortanswer_submissions.update_many(query, [
+                {'$set': {'score': '$suggested_score', 'is_graded': True}},
+                {'$unset': ['suggested_score', 'suggestion']}
+            ])
+            if result.modified_count == len(pending):
+                delta = grading_stats.StatsDelta()
+                progress = course_progress.ProgressDelta(question.get('course_id'))
+                for submission in pending:
+                    delta.transition(
+                        {'is_graded': False, 'score': submission.get('score')},
+                        {'is_graded': True, 'score': submission['suggested_score']}
+                    )
+                    progress.score(submission['submitted_by'], None, submission['suggested_score'])
+                delta.apply(db, question_id)
+                progress.apply(db)
+            else:
+                # An answer was resubmitted or graded in between
+                grading_stats.rebuild_stats(db, question_id)
+                if question.get('course_id'):
+                    for submission in pending:
+                        course_progress.rebuild(db, question['course_id'], submission['submitted_by'])
+        
+        logger.info(f"{result.modified_count} suggested scores confirmed for question {question_id} by user {user_id}")
+        return jsonify({
+            'message': 'Suggested scores confirmed',
+            'confirmed': result.modified_count
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error confirming suggestions: {str(e)}")
+        return jsonify({'error': 'Failed to confirm suggested scores', 'details': str(e)}), 500
+
+def _submission_timeline(db, question_id):
+    """Per-student submission timeline, newest first; scans every submission to the question"""
+    return [{
+        'student_id': submission.get('submitted_by'),
+        'submitted_at': submission.get('submitted_at').isoformat(),
+        'is_graded': submission.get('is_graded', False),
+        'score': submission.get('score'),
+        'word_count': len(submission.get('text', '').split())
+    } for submission in db.shortanswer_submissions.find(
+        {'question_id': question_id},
+        {'submitted_by': 1, 'submitted_at': 1, 'is_graded': 1, 'score': 1, 'text': 1}
+    ).sort('submitted_at', -1)]
+
+def _creator_question(db, question_id, user_id, projection):
+    """The question if user_id created it, else (None, error response)"""
+    question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, dict(projection, created_by=1))
+    if not question:
+        return None, (jsonify({'error': 'Short answer question not found'}), 404)
+    if question['created_by'] != user_id:
+        return None, (jsonify({'error': 'Only the creator can view statistics'}), 403)
+    return question, None
+
+# Get grading statistics for teachers
+@shortanswers_bp.route('/<question_id>/stats', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def get_grading_stats(question_id):
+    try:
+        user_id = get_jwt_identity()
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            question, error = _creator_question(db, question_id, user_id, {'question': 1})
+            if error:
+                return error
+
+            # Only the maintained stats document is read; the timeline has its own endpoint
+            # (GET /<question_id>/timeline), or ?include_timeline=true embeds it as before
+            response = {
+                'question_id': question_id,
+                'title': question['question'][:100] + '...' if len(question['question']) > 100 else question['question'],
+                'statistics': grading_stats.summarize(grading_stats.read_stats(db, question_id))
+            }
+            if request.args.get('include_timeline', 'false').lower() == 'true':
+                response['submission_timeline'] = _submission_timeline(db, question_id)
+
+        return jsonify(response), 200
+        
     except Exception as e:
         logger.error(f"Error getting stats: {str(e)}")
         return jsonify({'error': 'Failed to get statistics', 'details': str(e)}), 500
 
+# Get the per-student submission timeline for teachers
+@shortanswers_bp.route('/<question_id>/timeline', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def get_submission_timeline(question_id):
+    try:
+        user_id = get_jwt_identity()
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            _, error = _creator_question(db, question_id, user_id, {})
+            if error:
+                return error
+            timeline = _submission_timeline(db, question_id)
+
+        return jsonify({'question_id': question_id, 'submission_timeline': timeline}), 200
+
+    except Exception as e:
+        logger.error(f"Error getting submission timeline: {str(e)}")
+        return jsonify({'error': 'Failed to get submission timeline', 'details': str(e)}), 500
+
 # Close/deactivate a short answer question (teacher only)
 @shortanswers_bp.route('/<question_id>/close', methods=['POST'])
 @jwt_required(locations=["cookies"])
@@ -509,7 +1215,7 @@ def close_shortanswer(question_id):
     try:
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)})
+            question = db.short_answer_questions.find_one({'_id': ObjectId(question_id)}, {'created_by': 1})
         if not question:
             return jsonify({'error': 'Short answer question not found'}), 404
             
@@ -0,0 +1,170 @@
+"""
+COMP5241 Group 10 - Word Cloud Word Normalization
+Unicode-aware cleaning, segmentation and merging of word cloud submissions
+
+Submissions are folded with NFKC and casefold, stripped of punctuation while
+keeping letters, marks and digits from every script, and segmented so that
+CJK runs are separated from surrounding Latin text. CJK runs are split into
+words with jieba when it is installed and otherwise kept whole; jieba is an
+optional dependency (commented in requirements.txt) because without it a
+run still matches itself, only less often another submission. Stop-word
+removal and light English lemmatization are optional per word cloud, and a
+cloud's synonyms map merged variants onto one canonical word.
+
+The expensive part of normalization is memoized in a bounded LRU cache keyed
+on the raw submission, so popular words cost a dictionary lookup.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+try:
+    import jieba
+    jieba.setLogLevel(60)
+except ImportError:  # Optional: CJK runs are kept whole without it
+    jieba = None
+
+CACHE_SIZE = 16384
+MAX_SYNONYMS = 500
+
+# Hiragana/katakana, CJK ideographs (incl. extension A and compatibility) and Hangul
+_CJK_RUN = re.compile(r'([぀-ヿ㐀-䶿一-鿿豈-﫿가-힯]+)')
+_WHITESPACE = re.compile(r'\s+')
+_KEPT_CATEGORIES = ('L', 'M', 'N')
+
+STOP_WORDS = frozenset({
+    # English
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of',
+    'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'with',
+    # Chinese
+    '的', '了', '和', '是', '在', '就', '也', '都', '而', '及', '与', '着', '或', '之',
+    # Japanese particles
+    'の', 'は', 'が', 'を', 'に', 'で', 'と', 'も',
+})
+
+
+def _clean_char(char: str) -> str:
+    if char in '-\'' or unicodedata.category(char)[0] in _KEPT_CATEGORIES:
+        return char
+    return ' '
+
+
+def _is_cjk(token: str) -> bool:
+    return bool(_CJK_RUN.fullmatch(token))
+
+
+def segment(text: str) -> List[str]:
+    """Split cleaned text into tokens, separating CJK runs from other scripts"""
+    tokens = []
+    for chunk in text.split():
+        for part in _CJK_RUN.split(chunk):
+            if not part:
+                continue
+            if jieba is not None and _is_cjk(part):
+                tokens.extend(word for word in jieba.lcut(part) if word.strip())
+            else:
+                tokens.append(part)
+    return tokens
+
+
+def lemmatize(token: str) -> str:
+    """Light suffix rules for English plurals; other scripts pass through"""
+    if not token.isascii() or len(token) <= 3:
+        return token
+    if token.endswith('ies') and len(token) > 4:
+        return token[:-3] + 'y'
+    if token.endswith(('sses', 'shes', 'ches', 'xes')):
+        return token[:-2]
+    if token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def _join(tokens: List[str]) -> str:
+    """Join tokens with spaces, except between two CJK tokens"""
+    result = ''
+    for token in tokens:
+        if result and not (_is_cjk(result[-1]) and _is_cjk(token[0])):
+            result += ' '
+        result += token
+    return result
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _normalize(raw: str, use_lemmatizer: bool, remove_stop_words: bool) -> str:
+    text = unicodedata.normalize('NFKC', raw).casefold()
+    text = ''.join(_clean_char(char) for char in text)
+    text = _WHITESPACE.sub(' ', text).strip(' -\'')
+
+    # Segmented per space-separated chunk, so the spaces that were typed are kept
+    chunks = [segment(chunk) for chunk in text.split(' ')]
+    if remove_stop_words:
+        kept = [[token for token in tokens if token not in STOP_WORDS] for tokens in chunks]
+        # Never reduce a submission to nothing; "the the" stays as typed
+        if any(kept):
+            chunks = kept
+    if use_lemmatizer:
+        chunks = [[lemmatize(token) for token in tokens] for tokens in chunks]
+    return ' '.join(_join(tokens) for tokens in chunks if tokens)
+
+
+def normalize_text(raw: str) -> str:
+    """Unicode folding, punctuation cleanup and segmentation only (cached)"""
+    return _normalize(raw, False, False)
+
+
+def cache_info():
+    return _normalize.cache_info()
+
+
+class WordNormalizer:
+    """Normalization settings for one word cloud"""
+
+    def __init__(self, lemmatize: bool = False, remove_stop_words: bool = False,
+                 synonyms: Optional[Dict[str, str]] = None):
+        self.lemmatize = bool(lemmatize)
+        self.remove_stop_words = bool(remove_stop_words)
+        self.synonyms = synonyms or {}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict]) -> 'WordNormalizer':
+        settings = settings or {}
+        return cls(settings.get('lemmatize', False), settings.get('remove_stop_words', False),
+                   settings.get('synonyms'))
+
+    def normalize(self, raw: str) -> str:
+        word = _normalize(raw, self.lemmatize, self.remove_stop_words)
+        return self.synonyms.get(word, word)
+
+    def to_settings(self) -> Dict:
+        return {'lemmatize': self.lemmatize, 'remove_stop_words': self.remove_stop_words, 'synonyms': self.synonyms}
+
+
+def build_settings(options: Optional[Dict]) -> Dict:
+    """Validate a cloud's normalization options and normalize its synonym map.
+
+    Synonym keys and values go through the same pipeline as submissions so
+    that they match what is actually stored. Raises ValueError on bad input.
+    """
+    options = options or {}
+    if not isinstance(options, dict):
+        raise ValueError('Normalization must be an object')
+
+    synonyms = options.get('synonyms') or {}
+    if not isinstance(synonyms, dict) or len(synonyms) > MAX_SYNONYMS:
+        raise ValueError(f'Synonyms must be an object with at most {MAX_SYNONYMS} entries')
+
+    normalizer = WordNormalizer(options.get('lemmatize', False), options.get('remove_stop_words', False))
+    merged = {}
+    for variant, canonical in synonyms.items():
+        if not isinstance(variant, str) or not isinstance(canonical, str):
+            raise ValueError('Synonyms must map words to words')
+        variant, canonical = normalizer.normalize(variant), normalizer.normalize(canonical)
+        if not variant or not canonical:
+            raise ValueError('Synonyms cannot be empty after normalization')
+        if variant != canonical:
+            merged[variant] = canonical
+
+    normalizer.synonyms = merged
+    return normalizer.to_settings()
@@ -0,0 +1,364 @@
+"""
+COMP5241 Group 10 - Word Cloud Heavy-Hitter Sketches
+Approximate word counting for very large word clouds
+
+A HeavyHitters sketch combines a Space-Saving summary (the top-K words with
+per-word overestimation bounds) with a Count-Min sketch (a fixed-size
+frequency table that never underestimates). Memory is constant in the number
+of submissions and distinct words.
+
+Each worker process keeps its own sketch per word cloud and checkpoints it to
+the wordcloud_sketches collection as a shard keyed by (wordcloud_id,
+worker_id). Both structures are mergeable, so results merge the stored shards
+of other workers with the live local sketch. A background thread
+checkpoints every sketch with pending updates each
+CHECKPOINT_INTERVAL_SECONDS, and once more at exit, so a quiet cloud's
+shard is never further behind than that; only updates made since a
+worker's last checkpoint are lost if that worker crashes.
+"""
+import atexit
+import hashlib
+import heapq
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 200
+DEFAULT_WIDTH = 2048
+DEFAULT_DEPTH = 4
+CHECKPOINT_INTERVAL_SECONDS = 5
+CHECKPOINT_EVERY_UPDATES = 500
+
+
+def _hash_pair(item: str) -> Tuple[int, int]:
+    """Two independent 64-bit hashes of an item for double hashing"""
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class CountMinSketch:
+    """Count-Min sketch over a depth x width table of counters.
+
+    estimate(x) >= true count, and estimate(x) <= true count + e/width * total
+    with probability 1 - exp(-depth).
+    """
+
+    def __init__(self, width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH, table: Optional[np.ndarray] = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else np.zeros((depth, width), dtype=np.int64)
+        self.total = int(self.table[0].sum())
+        self._rows = np.arange(depth)
+
+    def _columns(self, item: str) -> np.ndarray:
+        h1, h2 = _hash_pair(item)
+        return np.array([(h1 + row * h2) % self.width for row in range(self.depth)])
+
+    def add(self, item: str, count: int = 1) -> int:
+        """Add count occurrences of item and return its new estimate"""
+        columns = self._columns(item)
+        self.table[self._rows, columns] += count
+        self.total += count
+        return int(self.table[self._rows, columns].min())
+
+    def estimate(self, item: str) -> int:
+        return int(self.table[self._rows, self._columns(item)].min())
+
+    @property
+    def error_bound(self) -> float:
+        """Additive overestimation bound (holds with probability 1 - exp(-depth))"""
+        return np.e / self.width * self.total
+
+    def merge(self, other: 'CountMinSketch'):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError('Cannot merge Count-Min sketches of different shapes')
+        self.table += other.table
+        self.total += other.total
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.table.nbytes
+
+
+class SpaceSaving:
+    """Space-Saving summary tracking at most `capacity` items.
+
+    For every tracked item, count - error <= true count <= count. Any item
+    with a true count above total / capacity is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = {}  # item -> [count, error]
+        self._heap: List[Tuple[int, str]] = []
+
+    def _push(self, item: str):
+        heapq.heappush(self._heap, (self.counters[item][0], item))
+        # Stale heap entries are skipped lazily; rebuild before they pile up
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(counter[0], key) for key, counter in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[str, List[int]]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            counter = self.counters.get(item)
+            if counter is not None and counter[0] == count:
+                return item, counter
+
+    def min_count(self) -> int:
+        if len(self.counters) < self.capacity:
+            return 0
+        while True:
+            count, item = self._heap[0]
+            counter = self.counters.get(item)
+            if counter is not None and counter[0] == count:
+                return count
+            heapq.heappop(self._heap)
+
+    def add(self, item: str, count: int = 1):
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+        else:
+            # Replace the smallest counter; its count becomes the new item's error
+            evicted, (min_count, _) = self._pop_min()
+            del self.counters[evicted]
+            self.counters[item] = [min_count + count, min_count]
+        self._push(item)
+
+    def remove(self, item: str, count: int = 1):
+        """Undo an earlier add. Untracked items only affect the Count-Min side."""
+        counter = self.counters.get(item)
+        if counter is None:
+            return
+        counter[0] = max(counter[0] - count, 0)
+        counter[1] = min(counter[1], counter[0])
+        self._push(item)
+
+    def merge(self, other: 'SpaceSaving'):
+        """Combine two summaries (Agarwal et al. mergeable summaries).
+
+        An item missing from one summary may still have been counted up to
+        that summary's minimum, which is added to both its count and error.
+        """
+        self_min, other_min = self.min_count(), other.min_count()
+        merged = {}
+        for item in set(self.counters) | set(other.counters):
+            count_a, error_a = self.counters.get(item, (self_min, self_min))
+            count_b, error_b = other.counters.get(item, (other_min, other_min))
+            merged[item] = [count_a + count_b, error_a + error_b]
+        top = heapq.nlargest(self.capacity, merged.items(), key=lambda entry: entry[1][0])
+        self.counters = {item: counter for item, counter in top}
+        self._heap = [(counter[0], item) for item, counter in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """Return up to n (item, count, error) tuples, highest count first"""
+        entries = heapq.nlargest(n, self.counters.items(), key=lambda entry: (entry[1][0], -entry[1][1]))
+        return [(item, counter[0], counter[1]) for item, counter in entries]
+
+
+class HeavyHitters:
+    """Space-Saving top-K plus Count-Min frequency estimates for one word cloud"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH):
+        self.summary = SpaceSaving(capacity)
+        self.sketch = CountMinSketch(width, depth)
+
+    def add(self, word: str):
+        self.summary.add(word)
+        self.sketch.add(word)
+
+    def remove(self, word: str):
+        self.summary.remove(word)
+        self.sketch.add(word, -1)
+
+    def merge(self, other: 'HeavyHitters'):
+        self.summary.merge(other.summary)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def total(self) -> int:
+        return self.sketch.total
+
+    @property
+    def memory_bytes(self) -> int:
+        # Counter table plus a rough per-entry cost for the summary dict and heap
+        return self.sketch.memory_bytes + self.summary.capacity * 160
+
+    def top(self, n: int) -> List[Dict]:
+        """Top n words with estimates and [lower_bound, upper_bound] per word.
+
+        The Space-Saving count and the Count-Min estimate are both upper
+        bounds, so the tighter one is reported; the Space-Saving error gives
+        a guaranteed lower bound.
+        """
+        result = []
+        for word, count, error in self.summary.top(n):
+            upper = min(count, self.sketch.estimate(word))
+            result.append({
+                'word': word,
+                'count': upper,
+                'lower_bound': max(count - error, 0),
+                'upper_bound': upper
+            })
+        return result
+
+    def to_document(self) -> Dict:
+        return {
+            'capacity': self.summary.capacity,
+            'width': self.sketch.width,
+            'depth': self.sketch.depth,
+            'total': self.sketch.total,
+            'table': self.sketch.table.astype('<i8').tobytes(),
+            'summary': [[word, counter[0], counter[1]] for word, counter in self.summary.counters.items()]
+        }
+
+    @classmethod
+    def from_document(cls, document: Dict) -> 'HeavyHitters':
+        hitters = cls(document['capacity'], document['width'], document['depth'])
+        table = np.frombuffer(bytes(document['table']), dtype='<i8').reshape(document['depth'], document['width'])
+        hitters.sketch = CountMinSketch(document['width'], document['depth'], table.astype(np.int64))
+        for word, count, error in document.get('summary', []):
+            hitters.summary.counters[word] = [count, error]
+        hitters.summary._heap = [(counter[0], word) for word, counter in hitters.summary.counters.items()]
+        heapq.heapify(hitters.summary._heap)
+        return hitters
+
+
+class _Shard:
+    def __init__(self, hitters: HeavyHitters, updates: int = 0):
+        self.hitters = hitters
+        self.updates = updates  # every add/remove applied to this shard, kept across checkpoints
+        self.lock = threading.Lock()
+        self.pending_updates = 0
+        self.last_checkpoint = time.monotonic()
+
+
+class SketchRegistry:
+    """Process-wide live sketches, checkpointed to Mongo as per-worker shards"""
+
+    def __init__(self, interval: float = CHECKPOINT_INTERVAL_SECONDS):
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.interval = interval
+        self._shards: Dict[str, _Shard] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _shard(self, db, wordcloud_id: str) -> _Shard:
+        self._ensure_started()
+        with self._lock:
+            shard = self._shards.get(wordcloud_id)
+            if shard is None:
+                # Resume from this worker's last checkpoint if there is one
+                document = db.wordcloud_sketches.find_one({'wordcloud_id': wordcloud_id, 'worker_id': self.worker_id})
+                shard = _Shard(HeavyHitters.from_document(document), document.get('updates', 0)) if document \
+                    else _Shard(HeavyHitters())
+                self._shards[wordcloud_id] = shard
+            return shard
+
+    def _checkpoint(self, db, wordcloud_id: str, shard: _Shard):
+        document = shard.hitters.to_document()
+        document.update({'wordcloud_id': wordcloud_id, 'worker_id': self.worker_id,
+                         'updates': shard.updates, 'updated_at': datetime.utcnow()})
+        db.wordcloud_sketches.replace_one(
+            {'wordcloud_id': wordcloud_id, 'worker_id': self.worker_id}, document, upsert=True
+        )
+        shard.pending_updates = 0
+        shard.last_checkpoint = time.monotonic()
+
+    def _record(self, db, wordcloud_id: str, word: str, removed: bool):
+        shard = self._shard(db, wordcloud_id)
+        with shard.lock:
+            if removed:
+                shard.hitters.remove(word)
+            else:
+                shard.hitters.add(word)
+            shard.updates += 1
+            shard.pending_updates += 1
+            if (shard.pending_updates >= CHECKPOINT_EVERY_UPDATES or
+                    time.monotonic() - shard.last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS):
+                self._checkpoint(db, wordcloud_id, shard)
+
+    def add(self, db, wordcloud_id: str, word: str):
+        self._record(db, wordcloud_id, word, removed=False)
+
+    def remove(self, db, wordcloud_id: str, word: str):
+        self._record(db, wordcloud_id, word, removed=True)
+
+    def merged(self, db, wordcloud_id: str) -> HeavyHitters:
+        """Merge every worker's checkpoint with this worker's live sketch"""
+        shard = self._shard(db, wordcloud_id)
+        with shard.lock:
+            merged = HeavyHitters.from_document(shard.hitters.to_document())
+        for document in db.wordcloud_sketches.find({'wordcloud_id': wordcloud_id, 'worker_id': {'$ne': self.worker_id}}):
+            merged.merge(HeavyHitters.from_document(document))
+        return merged
+
+    def version(self, db, wordcloud_id: str) -> int:
+        """Updates that merged() would include: every other worker's last checkpoint plus this worker's live sketch.
+
+        It grows whenever what merged() returns can change, so a result
+        cached under it is never stale. Read it before merging: a merge that
+        already sees a newer checkpoint is then cached under the older
+        version, which does no harm since its counts are newer, not older.
+        """
+        shard = self._shard(db, wordcloud_id)
+        with shard.lock:
+            local = shard.updates
+        others = db.wordcloud_sketches.find(
+            {'wordcloud_id': wordcloud_id, 'worker_id': {'$ne': self.worker_id}}, {'updates': 1}
+        )
+        return local + sum(document.get('updates', 0) for document in others)
+
+    def flush(self, db):
+        """Checkpoint every sketch with pending updates (e.g. on shutdown)"""
+        with self._lock:
+            shards = list(self._shards.items())
+        for wordcloud_id, shard in shards:
+            with shard.lock:
+                if shard.pending_updates:
+                    self._checkpoint(db, wordcloud_id, shard)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(1 for shard in self._shards.values() if shard.pending_updates)
+
+    def _flush_with_connection(self):
+        if not self.pending_count():
+            return
+        try:
+            with get_db_connection() as client:
+                self.flush(client['comp5241_g10'])
+        except Exception as e:
+            logger.error(f"Error checkpointing word cloud sketches: {str(e)}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self._flush_with_connection()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='wordcloud-sketches', daemon=True)
+                self._thread.start()
+                atexit.register(self._flush_with_connection)
+
+
+sketch_registry = SketchRegistry()
@@ -0,0 +1,197 @@
+"""
+COMP5241 Group 10 - Word Cloud Layout and Rendering
+Server-side word placement and SVG/PNG output for word clouds
+
+Words are placed largest first along an Archimedean spiral from the centre.
+Collisions are checked against a coarse occupancy grid held in a NumPy
+array; a summed-area table of the grid tests every spiral position for a
+word in one vectorized step instead of scanning the placed words. Layouts of large clouds run in a process pool so they do
+not hold the GIL of a request worker.
+
+Rendered output is cached per (word cloud, counts_version, format, size);
+counts_version is bumped after the counts of every submission and removal
+are written, so a cached image is valid until the cloud's counts change.
+"""
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Optional: PNG output needs Pillow
+    Image = None
+
+PNG_AVAILABLE = Image is not None
+
+MIN_FONT_SIZE = 12
+MAX_FONT_SIZE = 72
+GRID_CELL = 4
+PROCESS_POOL_THRESHOLD = 300
+PROCESS_POOL_WORKERS = 2
+CACHE_ENTRIES = 256
+PALETTE = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#17becf']
+FONT_FAMILY = 'Helvetica, Arial, "Noto Sans CJK SC", sans-serif'
+
+
+def _text_width(word: str, font_size: int) -> float:
+    # CJK glyphs are roughly square; Latin glyphs average about 0.6 em
+    return sum(font_size if '⺀' <= char <= '힯' else font_size * 0.6 for char in word)
+
+
+def compute_layout(words: List[Tuple[str, int]], width: int, height: int) -> List[Dict]:
+    """Place (word, count) pairs, highest count first, inside a width x height box.
+
+    Returns placements {'text', 'count', 'x', 'y', 'font_size', 'rotate', 'color'}
+    where (x, y) is the centre of the word; words that do not fit are left out.
+    """
+    if not words:
+        return []
+
+    counts = np.array([count for _, count in words], dtype=float)
+    low, high = counts.min(), counts.max()
+    # Square-root scaling keeps a few very popular words from dwarfing the rest
+    scale = (np.sqrt(counts) - math.sqrt(low)) / (math.sqrt(high) - math.sqrt(low)) if high > low else np.ones_like(counts)
+    font_sizes = (MIN_FONT_SIZE + scale * (MAX_FONT_SIZE - MIN_FONT_SIZE)).astype(int)
+
+    grid = np.zeros((height // GRID_CELL, width // GRID_CELL), dtype=np.int32)
+    rows, cols = grid.shape
+    # Candidate centres roughly one grid cell apart along a spiral r = b * theta
+    # whose arms are two cells apart, stretched to the box's aspect ratio
+    b = 2 * GRID_CELL / (2 * math.pi)
+    max_radius = height / 2
+    arc = np.arange(0, b * (max_radius / b) ** 2 / 2, GRID_CELL)
+    angles = np.sqrt(2 * arc / b)
+    spiral_x = width / 2 + b * angles * np.cos(angles) * width / height
+    spiral_y = height / 2 + b * angles * np.sin(angles)
+    # Summed-area table of the occupancy grid: any box is free iff its sum is 0
+    occupied = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+
+    placements = []
+    for index, ((word, count), font_size) in enumerate(zip(words, font_sizes)):
+        # Every third word that is not among the largest is set vertically
+        rotate = 90 if index > 3 and index % 3 == 0 else 0
+        box_w, box_h = _text_width(word, font_size), font_size * 1.1
+        if rotate:
+            box_w, box_h = box_h, box_w
+        cells_w, cells_h = math.ceil(box_w / GRID_CELL) + 1, math.ceil(box_h / GRID_CELL) + 1
+
+        col = np.floor((spiral_x - box_w / 2) / GRID_CELL).astype(int)
+        row = np.floor((spiral_y - box_h / 2) / GRID_CELL).astype(int)
+        inside = (col >= 0) & (row >= 0) & (col + cells_w <= cols) & (row + cells_h <= rows)
+        if not inside.any():
+            continue
+        col, row, candidates = col[inside], row[inside], np.flatnonzero(inside)
+        used = (occupied[row + cells_h, col + cells_w] - occupied[row, col + cells_w]
+                - occupied[row + cells_h, col] + occupied[row, col])
+        free = np.flatnonzero(used == 0)
+        if not free.size:
+            continue
+
+        first = free[0]
+        grid[row[first]:row[first] + cells_h, col[first]:col[first] + cells_w] = 1
+        occupied[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+        placements.append({
+            'text': word,
+            'count': int(count),
+            'x': round(float(spiral_x[candidates[first]]), 1),
+            'y': round(float(spiral_y[candidates[first]]), 1),
+            'font_size': int(font_size),
+            'rotate': rotate,
+            'color': PALETTE[index % len(PALETTE)]
+        })
+    return placements
+
+
+def render_svg(placements: List[Dict], width: int, height: int) -> bytes:
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family=\'{FONT_FAMILY}\'>'
+    ]
+    for placement in placements:
+        transform = f' transform="rotate(-90 {placement["x"]} {placement["y"]})"' if placement['rotate'] else ''
+        parts.append(
+            f'<text x="{placement["x"]}" y="{placement["y"]}" font-size="{placement["font_size"]}" '
+            f'fill="{placement["color"]}" text-anchor="middle" dominant-baseline="central"{transform}>'
+            f'<title>{escape(placement["text"])}: {placement["count"]}</title>{escape(placement["text"])}</text>'
+        )
+    parts.append('</svg>')
+    return ''.join(parts).encode('utf-8')
+
+
+def render_png(placements: List[Dict], width: int, height: int) -> bytes:
+    """Raster output; raises RuntimeError when Pillow is not installed"""
+    if Image is None:
+        raise RuntimeError('PNG rendering requires Pillow')
+
+    image = Image.new('RGBA', (width, height), (255, 255, 255, 0))
+    for placement in placements:
+        try:
+            font = ImageFont.truetype('DejaVuSans.ttf', placement['font_size'])
+        except OSError:
+            font = ImageFont.load_default()
+        # Draw each word on its own layer so vertical words can be rotated about their centre
+        left, top, right, bottom = font.getbbox(placement['text'])
+        layer = Image.new('RGBA', (right - left + 2, bottom - top + 2), (255, 255, 255, 0))
+        ImageDraw.Draw(layer).text((-left, -top), placement['text'], font=font, fill=placement['color'])
+        if placement['rotate']:
+            layer = layer.rotate(90, expand=True)
+        image.alpha_composite(layer, (int(placement['x'] - layer.width / 2), int(placement['y'] - layer.height / 2)))
+
+    output = BytesIO()
+    image.save(output, format='PNG', optimize=True)
+    return output.getvalue()
+
+
+def _render(words: List[Tuple[str, int]], width: int, height: int, image_format: str) -> bytes:
+    placements = compute_layout(words, width, height)
+    return render_png(placements, width, height) if image_format == 'png' else render_svg(placements, width, height)
+
+
+class RenderCache:
+    """Bounded LRU of rendered images keyed by counts version"""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def put(self, key: Tuple, image: bytes):
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS)
+            return self._pool
+
+    def render(self, key: Tuple, words: List[Tuple[str, int]], width: int, height: int, image_format: str) -> bytes:
+        """Return the cached image for key, rendering it (in the process pool for big clouds) on a miss"""
+        image = self.get(key)
+        if image is None:
+            if len(words) >= PROCESS_POOL_THRESHOLD:
+                image = self._executor().submit(_render, words, width, height, image_format).result()
+            else:
+                image = _render(words, width, height, image_format)
+            self.put(key, image)
+        return image
+
+
+render_cache = RenderCache()
@@ -2,13 +2,20 @@
 COMP5241 Group 10 - Word Cloud Routes
 API endpoints for word cloud functionality
 """
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from config.database import get_db_connection
+from app.utils import scheduler
+from .activities import WordCloudSummary
+from .word_sketches import sketch_registry
+from .word_normalizer import WordNormalizer, build_settings
+from .moderation import moderation_registry
+from .wordcloud_layout import render_cache, PNG_AVAILABLE
 import logging
-import re
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -16,6 +23,10 @@ logger = logging.getLogger(__name__)
 # Define a separate blueprint for word cloud endpoints
 wordclouds_bp = Blueprint('wordclouds', __name__, url_prefix='/wordclouds')
 
+# Exact clouds keep a count per word; approximate clouds keep a heavy-hitter sketch
+COUNTING_MODES = ('exact', 'approximate')
+
+
 def validate_wordcloud_data(data):
     """Validate word cloud creation data"""
     errors = []
@@ -47,21 +58,24 @@ def validate_wordcloud_data(data):
         except ValueError:
             errors.append('Invalid expiration date format')
     
+    # Validate counting mode
+    if data.get('counting_mode', 'exact') not in COUNTING_MODES:
+        errors.append(f'Counting mode must be one of: {", ".join(COUNTING_MODES)}')
+
+    try:
+        build_settings(data.get('normalization'))
+    except ValueError as e:
+        errors.append(str(e))
+    
     return errors
 
-def validate_word(word):
-    """Validate and clean a word submission"""
+def validate_word(word, normalizer=None):
+    """Validate and clean a word submission using the cloud's normalizer"""
     if not word or not isinstance(word, str):
         return None, "Word must be a non-empty string"
     
-    # Clean the word
-    cleaned_word = word.strip().lower()
-    
-    # Remove special characters except hyphens and spaces
-    cleaned_word = re.sub(r'[^\w\s-]', '', cleaned_word)
-    
-    # Replace multiple spaces with single space
-    cleaned_word = re.sub(r'\s+', ' ', cleaned_word)
+    # Unicode folding, punctuation removal, and the cloud's stop words/lemmas/synonyms
+    cleaned_word = (normalizer or WordNormalizer()).normalize(word)
     
     if not cleaned_word:
         return None, "Word contains only invalid characters"
@@ -71,6 +85,159 @@ def validate_word(word):
     
     return cleaned_word, None
 
+def _is_approximate(wordcloud):
+    return wordcloud.get('counting_mode', 'exact') == 'approximate'
+
+def _open_cloud_filter(wordcloud_id, now):
+    """Matches the cloud only while it accepts submissions"""
+    return {
+        '_id': ObjectId(wordcloud_id),
+        'is_active': {'$ne': False},
+        '$or': [{'expires_at': None}, {'expires_at': {'$gt': now}}]
+    }
+
+def _closed_reason(db, wordcloud_id, now):
+    """Why the open-cloud filter found nothing, as (message, status)"""
+    wordcloud = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)}, {'is_active': 1, 'expires_at': 1})
+    if not wordcloud:
+        return 'Word cloud not found', 404
+    if not wordcloud.get('is_active', True):
+        return 'Word cloud is closed', 400
+    return 'Word cloud has expired', 400
+
+def _add_user_word(db, wordcloud_id, user_id, word, limit):
+    """Add word to the user's words unless it is already there or they are at the limit.
+
+    One conditional write on the user's wordcloud_participants document does
+    both checks and returns the new submission_count. When the filter finds
+    nothing the upsert tries to insert a second document for the same
+    (cloud, user), which the unique index rejects; that also happens when two
+    first submissions race to create the document, so the write is retried
+    once against the document that now exists before giving up.
+
+    Returns the participant after the write, or None when rejected.
+    """
+    query = {'wordcloud_id': wordcloud_id, 'user_id': user_id,
+             'words': {'$ne': word}, 'submission_count': {'$lt': limit}}
+    update = {'$addToSet': {'words': word}, '$inc': {'submission_count': 1}}
+    try:
+        return db.wordcloud_participants.find_one_and_update(
+            query, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        return db.wordcloud_participants.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+
+def _remove_user_word(db, wordcloud_id, user_id, word):
+    """Take word out of the user's words; returns the participant afterwards, or None if they hadn't submitted it"""
+    return db.wordcloud_participants.find_one_and_update(
+        {'wordcloud_id': wordcloud_id, 'user_id': user_id, 'words': word},
+        {'$pull': {'words': word}, '$inc': {'submission_count': -1}},
+        return_document=ReturnDocument.AFTER
+    )
+
+def _claim_submission_slot(db, wordcloud_id, user_id, word, now=None):
+    """Count word as a submission by the user and store it, or say why not.
+
+    Each rule is a condition of a write rather than a check before it: the
+    cloud is only counted while the open-cloud filter matches it, and the
+    word only joins the user's words while it is new to them and they are
+    under the limit (_add_user_word). When a later step rejects the
+    submission or fails, the writes before it are undone. Only a worker
+    dying between the writes can leave the counts ahead of the stored
+    submissions; rebuild_wordcloud_counts in migrate_embedded_submissions.py
+    recomputes both from wordcloud_submissions.
+
+    Returns (wordcloud, None) with submission_count after the write and the
+    user's user_submission_count, or (None, (message, status)) when rejected.
+    """
+    now = now or datetime.utcnow()
+    wordcloud = db.word_clouds.find_one_and_update(
+        _open_cloud_filter(wordcloud_id, now),
+        {'$inc': {'submission_count': 1}, '$max': {'last_activity_at': now}},
+        projection={'max_submissions_per_user': 1, 'counting_mode': 1, 'submission_count': 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not wordcloud:
+        return None, _closed_reason(db, wordcloud_id, now)
+
+    participant = None
+    try:
+        participant = _add_user_word(db, wordcloud_id, user_id, word, wordcloud['max_submissions_per_user'])
+        if participant:
+            db.wordcloud_submissions.update_one(
+                {'wordcloud_id': wordcloud_id, 'submitted_by': user_id, 'word': word},
+                {'$setOnInsert': {'submitted_at': now}},
+                upsert=True
+            )
+    except Exception:
+        if participant:
+            _remove_user_word(db, wordcloud_id, user_id, word)
+        db.word_clouds.update_one({'_id': wordcloud['_id']}, {'$inc': {'submission_count': -1}})
+        raise
+
+    if not participant:
+        db.word_clouds.update_one({'_id': wordcloud['_id']}, {'$inc': {'submission_count': -1}})
+        words = (db.wordcloud_participants.find_one(
+            {'wordcloud_id': wordcloud_id, 'user_id': user_id}, {'words': 1}
+        ) or {}).get('words', [])
+        if word in words:
+            return None, ('You have already submitted this word', 400)
+        return None, (f"Maximum submission limit ({wordcloud['max_submissions_per_user']}) reached", 400)
+
+    wordcloud['user_submission_count'] = participant['submission_count']
+    return wordcloud, None
+
+def _record_word_added(db, wordcloud, word, new_contributor):
+    """Maintain word counts and cloud counters after a submission slot is claimed.
+
+    submission_count is already incremented by the claim itself. counts_version
+    is bumped only once the counts are written, so a reader that sees the new
+    version also sees the counts it stands for.
+    """
+    wordcloud_id = str(wordcloud['_id'])
+    new_word = False
+    if _is_approximate(wordcloud):
+        sketch_registry.add(db, wordcloud_id, word)
+    else:
+        word_count = db.wordcloud_word_counts.update_one(
+            {'wordcloud_id': wordcloud_id, 'word': word},
+            {'$inc': {'count': 1}},
+            upsert=True
+        )
+        new_word = word_count.upserted_id is not None
+    db.word_clouds.update_one(
+        {'_id': wordcloud['_id']},
+        {'$inc': {
+            'counts_version': 1,
+            'unique_words': 1 if new_word else 0,
+            'unique_contributors': 1 if new_contributor else 0
+        }}
+    )
+
+def _record_word_removed(db, wordcloud, word, last_for_contributor):
+    """Maintain word counts and cloud counters after a submission is deleted.
+
+    submission_count is already decremented alongside deleting the submission;
+    counts_version is bumped after the counts, as in _record_word_added.
+    """
+    wordcloud_id = str(wordcloud['_id'])
+    word_removed = 0
+    if _is_approximate(wordcloud):
+        sketch_registry.remove(db, wordcloud_id, word)
+    else:
+        word_key = {'wordcloud_id': wordcloud_id, 'word': word}
+        db.wordcloud_word_counts.update_one(word_key, {'$inc': {'count': -1}})
+        # Drop the word once nobody has submitted it any more
+        word_removed = db.wordcloud_word_counts.delete_one(dict(word_key, count={'$lte': 0})).deleted_count
+    db.word_clouds.update_one(
+        {'_id': wordcloud['_id']},
+        {'$inc': {
+            'counts_version': 1,
+            'unique_words': -word_removed,
+            'unique_contributors': -1 if last_for_contributor else 0
+        }}
+    )
+
 # Create a word cloud (teacher only)
 @wordclouds_bp.route('/', methods=['POST'])
 @jwt_required(locations=["cookies"])
@@ -94,13 +261,21 @@ def create_wordcloud():
             'expires_at': datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None,
             'is_active': True,
             'created_at': datetime.utcnow(),
-            'submissions': []
+            'counting_mode': data.get('counting_mode', 'exact'),
+            'normalization': build_settings(data.get('normalization')),
+            'submission_count': 0,
+            'counts_version': 0,
+            'unique_words': 0,
+            'unique_contributors': 0
         }
 
+        wordcloud_data.update(scheduler.initial_state('word_clouds', wordcloud_data))
+
         with get_db_connection() as client:
             db = client['comp5241_g10']
             result = db.word_clouds.insert_one(wordcloud_data)
-        wordcloud_data['_id'] = result.inserted_id
+            wordcloud_data['_id'] = result.inserted_id
+            scheduler.schedule(db, 'word_clouds', wordcloud_data)
 
         logger.info(f"Word cloud created successfully by user {user_id}: {wordcloud_data['_id']}")
         return jsonify({
@@ -126,49 +301,37 @@ def list_wordclouds():
         if course_id:
             query['course_id'] = course_id
 
-        # Filter expired word clouds unless specifically requested
+        # Filter expired word clouds unless specifically requested; the
+        # scheduler sets is_expired when expires_at passes
         if not include_expired:
-            now = datetime.utcnow()
-            query['$or'] = [
-                {'expires_at': None},
-                {'expires_at': {'$gt': now}}
-            ]
+            query['is_expired'] = False
 
         # Sort by creation date (newest first)
         with get_db_connection() as client:
             db = client['comp5241_g10']
             wordclouds = list(db.word_clouds.find(query).sort('created_at', -1))
+
+            # The user's submission count for every listed cloud in one aggregation
+            wordcloud_ids = [str(wc['_id']) for wc in wordclouds]
+            user_counts = {
+                entry['_id']: entry['count'] for entry in db.wordcloud_submissions.aggregate([
+                    {'$match': {'wordcloud_id': {'$in': wordcloud_ids}, 'submitted_by': user_id}},
+                    {'$group': {'_id': '$wordcloud_id', 'count': {'$sum': 1}}}
+                ])
+            }
         result = []
 
         for wc in wordclouds:
-            # Count user submissions
-            user_submissions_count = len([s for s in wc.get('submissions', []) if s.get('submitted_by') == user_id])
-
-            # Get word frequency
-            submissions = wc.get('submissions', [])
-            word_freq = {}
-            for submission in submissions:
-                word = submission.get('word', '').lower()
-                word_freq[word] = word_freq.get(word, 0) + 1
-
-            wc_data = {
-                'id': str(wc['_id']),
-                'title': wc['title'],
-                'prompt': wc['prompt'],
-                'submission_count': len(submissions),
-                'unique_words': len(word_freq),
-                'created_by': wc['created_by'],
-                'is_active': wc['is_active'],
-                'created_at': wc['created_at'].isoformat(),
-                'expires_at': wc['expires_at'].isoformat() if wc.get('expires_at') else None,
-                'course_id': wc['course_id'],
-                'max_submissions_per_user': wc['max_submissions_per_user'],
-                'is_expired': wc.get('expires_at') and wc['expires_at'] < datetime.utcnow(),
+            user_submissions_count = user_counts.get(str(wc['_id']), 0)
+
+            wc_data = WordCloudSummary.model_validate({
+                **wc,
+                'unique_words': None if _is_approximate(wc) else wc.get('unique_words', 0),
                 'user_stats': {
                     'submissions_count': user_submissions_count,
                     'submissions_remaining': max(0, wc['max_submissions_per_user'] - user_submissions_count)
                 }
-            }
+            })
             result.append(wc_data)
         
         return jsonify(result), 200
@@ -182,16 +345,19 @@ def list_wordclouds():
 @jwt_required(locations=["cookies"])
 def get_wordcloud(wordcloud_id):
     try:
+        user_id = get_jwt_identity()
+
         with get_db_connection() as client:
             db = client['comp5241_g10']
             wordcloud = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)})
-        if not wordcloud:
-            return jsonify({'error': 'Word cloud not found'}), 404
+            if not wordcloud:
+                return jsonify({'error': 'Word cloud not found'}), 404
 
-        user_id = get_jwt_identity()
-
-        # Get user's submissions
-        user_submissions = [s['word'] for s in wordcloud.get('submissions', []) if s.get('submitted_by') == user_id]
+            # Get user's submissions
+            user_submissions = [s['word'] for s in db.wordcloud_submissions.find(
+                {'wordcloud_id': wordcloud_id, 'submitted_by': user_id},
+                {'word': 1, '_id': 0}
+            )]
 
         return jsonify({
             'id': str(wordcloud['_id']),
@@ -220,51 +386,33 @@ def submit_word(wordcloud_id):
         if not data or 'word' not in data:
             return jsonify({'error': 'Missing word submission'}), 400
 
-        # Validate and clean the word
-        word, error = validate_word(data['word'])
-        if error:
-            return jsonify({'error': error}), 400
-
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            wordcloud = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)})
-        if not wordcloud:
-            return jsonify({'error': 'Word cloud not found'}), 404
+            settings = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)}, {'normalization': 1, 'course_id': 1})
+            if not settings:
+                return jsonify({'error': 'Word cloud not found'}), 404
 
-        # Check if the word cloud is still active and not expired
-        if not wordcloud.get('is_active', True):
-            return jsonify({'error': 'Word cloud is closed'}), 400
+            # Validate and clean the word
+            word, error = validate_word(data['word'], WordNormalizer.from_settings(settings.get('normalization')))
+            if error:
+                return jsonify({'error': error}), 400
 
-        if wordcloud.get('expires_at') and wordcloud['expires_at'] < datetime.utcnow():
-            return jsonify({'error': 'Word cloud has expired'}), 400
+            # A masked word would only add noise to the cloud, so blocked words are always rejected
+            moderation = moderation_registry.check(db, settings.get('course_id'), word, 'wordcloud')
+            if moderation.blocked:
+                return jsonify({'error': 'Word contains blocked language'}), 400
 
-        # Check user submission limit
-        user_submissions_count = len([s for s in wordcloud.get('submissions', []) if s.get('submitted_by') == user_id])
-        if user_submissions_count >= wordcloud['max_submissions_per_user']:
-            return jsonify({
-                'error': f'Maximum submission limit ({wordcloud["max_submissions_per_user"]}) reached'
-            }), 400
+            # Open/unexpired, per-user limit and duplicate checks are conditions of the writes themselves
+            wordcloud, rejection = _claim_submission_slot(db, wordcloud_id, user_id, word)
+            if rejection:
+                message, status = rejection
+                return jsonify({'error': message}), status
 
-        # Check for duplicate word from the same user
-        user_words = [s['word'].lower() for s in wordcloud.get('submissions', []) if s.get('submitted_by') == user_id]
-        if word in user_words:
-            return jsonify({'error': 'You have already submitted this word'}), 400
+            user_submission_count = wordcloud['user_submission_count']
+            _record_word_added(db, wordcloud, word, new_contributor=user_submission_count == 1)
 
-        # Create and add submission
-        submission = {
-            'word': word,
-            'submitted_by': user_id,
-            'submitted_at': datetime.utcnow()
-        }
-
-        with get_db_connection() as client:
-            db = client['comp5241_g10']
-            db.word_clouds.update_one(
-                {'_id': ObjectId(wordcloud_id)},
-                {'$push': {'submissions': submission}}
-            )
-
-        remaining_submissions = wordcloud['max_submissions_per_user'] - (user_submissions_count + 1)
+        remaining_submissions = wordcloud['max_submissions_per_user'] - user_submission_count
+        total_submissions = wordcloud.get('submission_count', 0)
 
         logger.info(f"Word '{word}' submitted to wordcloud {wordcloud_id} by user {user_id}")
 
@@ -272,7 +420,7 @@ def submit_word(wordcloud_id):
             'message': 'Word submitted successfully',
             'word': word,
             'submissions_remaining': remaining_submissions,
-            'total_submissions': len(wordcloud.get('submissions', [])) + 1
+            'total_submissions': total_submissions
         }), 200
 
     except Exception as e:
@@ -284,51 +432,64 @@ def submit_word(wordcloud_id):
 @jwt_required(locations=["cookies"])
 def wordcloud_results(wordcloud_id):
     try:
+        user_id = get_jwt_identity()
+
         with get_db_connection() as client:
             db = client['comp5241_g10']
             wordcloud = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)})
-        if not wordcloud:
-            return jsonify({'error': 'Word cloud not found'}), 404
-
-        user_id = get_jwt_identity()
-
-        # Get word frequency data
-        submissions = wordcloud.get('submissions', [])
-        word_frequency = {}
-        for submission in submissions:
-            word = submission.get('word', '').lower()
-            word_frequency[word] = word_frequency.get(word, 0) + 1
-
-        # Format results for word cloud visualization
-        word_data = []
-        for word, count in word_frequency.items():
-            word_data.append({
-                'text': word,
-                'value': count,
-                'weight': count  # For word cloud sizing
-            })
-
-        # Sort by frequency (highest first)
-        word_data.sort(key=lambda x: x['value'], reverse=True)
-
-        # Get user's submissions
-        user_submissions = [s['word'] for s in submissions if s.get('submitted_by') == user_id]
+            if not wordcloud:
+                return jsonify({'error': 'Word cloud not found'}), 404
+
+            approximation = None
+            if _is_approximate(wordcloud):
+                # Top words with error bounds from the merged heavy-hitter sketches
+                top_n = min(max(request.args.get('top', 100, type=int), 1), 1000)
+                hitters = sketch_registry.merged(db, wordcloud_id)
+                word_data = [{
+                    'text': entry['word'],
+                    'value': entry['count'],
+                    'weight': entry['count'],
+                    'lower_bound': entry['lower_bound'],
+                    'upper_bound': entry['upper_bound']
+                } for entry in hitters.top(top_n)]
+                approximation = {
+                    'sketched_submissions': hitters.total,
+                    'tracked_words': hitters.summary.capacity,
+                    'count_min_error_bound': round(hitters.sketch.error_bound, 1)
+                }
+            else:
+                # Word frequency (highest first) straight from the maintained counts
+                word_data = [{
+                    'text': entry['word'],
+                    'value': entry['count'],
+                    'weight': entry['count']  # For word cloud sizing
+                } for entry in db.wordcloud_word_counts.find(
+                    {'wordcloud_id': wordcloud_id},
+                    {'_id': 0, 'word': 1, 'count': 1}
+                ).sort([('count', -1), ('word', 1)])]
+
+            # Get user's submissions
+            user_submissions = [s['word'] for s in db.wordcloud_submissions.find(
+                {'wordcloud_id': wordcloud_id, 'submitted_by': user_id},
+                {'_id': 0, 'word': 1}
+            )]
+
+            # Recent submissions (last 20)
+            recent_submissions = [
+                {'word': s['word'], 'submitted_at': s['submitted_at'].isoformat()}
+                for s in db.wordcloud_submissions.find(
+                    {'wordcloud_id': wordcloud_id},
+                    {'_id': 0, 'word': 1, 'submitted_at': 1}
+                ).sort('submitted_at', -1).limit(20)
+            ]
 
         # Analytics data
-        total_submissions = len(submissions)
-        unique_contributors = len(set(s.get('submitted_by') for s in submissions))
+        total_submissions = wordcloud.get('submission_count', 0)
+        unique_contributors = wordcloud.get('unique_contributors', 0)
 
         # Most popular words (top 10)
         top_words = word_data[:10]
 
-        # Recent submissions (last 20)
-        recent_submissions = sorted(
-            [{'word': s['word'], 'submitted_at': s['submitted_at'].isoformat()}
-             for s in submissions if s.get('submitted_at')],
-            key=lambda x: x['submitted_at'],
-            reverse=True
-        )[:20]
-
         return jsonify({
             'wordcloud_id': wordcloud_id,
             'title': wordcloud['title'],
@@ -336,9 +497,11 @@ def wordcloud_results(wordcloud_id):
             'created_by': wordcloud['created_by'],
             'is_active': wordcloud['is_active'],
             'is_expired': wordcloud.get('expires_at') and wordcloud['expires_at'] < datetime.utcnow(),
+            'counting_mode': wordcloud.get('counting_mode', 'exact'),
+            'approximation': approximation,
             'analytics': {
                 'total_submissions': total_submissions,
-                'unique_words': len(word_frequency),
+                'unique_words': None if approximation else wordcloud.get('unique_words', 0),
                 'unique_contributors': unique_contributors,
                 'average_submissions_per_user': round(total_submissions / unique_contributors, 1) if unique_contributors > 0 else 0
             },
@@ -367,37 +530,32 @@ def remove_word(wordcloud_id):
         if not data or 'word' not in data:
             return jsonify({'error': 'Missing word to remove'}), 400
 
-        word_to_remove = str(data['word']).strip().lower()
-
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            wordcloud = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)})
-        if not wordcloud:
-            return jsonify({'error': 'Word cloud not found'}), 404
+            settings = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)}, {'normalization': 1})
+            if not settings:
+                return jsonify({'error': 'Word cloud not found'}), 404
 
-        # Find and remove the user's submission
-        submissions = wordcloud.get('submissions', [])
-        original_count = len(submissions)
+            # Same normalization as submit_word, so the word matches what was stored
+            word_to_remove = WordNormalizer.from_settings(settings.get('normalization')).normalize(str(data['word']))
 
-        # Filter out the submission to remove
-        updated_submissions = [
-            s for s in submissions
-            if not (s.get('submitted_by') == user_id and s.get('word', '').lower() == word_to_remove)
-        ]
+            # Taking the word out of the user's words is what decides whether there was one to remove
+            participant = _remove_user_word(db, wordcloud_id, user_id, word_to_remove)
+            if not participant:
+                return jsonify({'error': 'Word not found in your submissions'}), 404
 
-        if len(updated_submissions) == original_count:
-            return jsonify({'error': 'Word not found in your submissions'}), 404
-
-        # Update the word cloud
-        with get_db_connection() as client:
-            db = client['comp5241_g10']
-            db.word_clouds.update_one(
+            db.wordcloud_submissions.delete_one({
+                'wordcloud_id': wordcloud_id, 'submitted_by': user_id, 'word': word_to_remove
+            })
+            user_submissions_count = participant['submission_count']
+            wordcloud = db.word_clouds.find_one_and_update(
                 {'_id': ObjectId(wordcloud_id)},
-                {'$set': {'submissions': updated_submissions}}
+                {'$inc': {'submission_count': -1}},
+                projection={'max_submissions_per_user': 1, 'counting_mode': 1},
+                return_document=ReturnDocument.AFTER
             )
+            _record_word_removed(db, wordcloud, word_to_remove, last_for_contributor=user_submissions_count == 0)
 
-        # Calculate remaining submissions
-        user_submissions_count = len([s for s in updated_submissions if s.get('submitted_by') == user_id])
         submissions_remaining = wordcloud['max_submissions_per_user'] - user_submissions_count
 
         logger.info(f"Word '{word_to_remove}' removed from wordcloud {wordcloud_id} by user {user_id}")
@@ -412,6 +570,68 @@ def remove_word(wordcloud_id):
         logger.error(f"Error removing word: {str(e)}")
         return jsonify({'error': 'Failed to remove word', 'details': str(e)}), 500
 
+# Server-side rendered word cloud image, cached until the counts change
+@wordclouds_bp.route('/<wordcloud_id>/render.svg', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def render_wordcloud_svg(wordcloud_id):
+    return _render_wordcloud(wordcloud_id, 'svg')
+
+@wordclouds_bp.route('/<wordcloud_id>/render.png', methods=['GET'])
+@jwt_required(locations=["cookies"])
+def render_wordcloud_png(wordcloud_id):
+    if not PNG_AVAILABLE:
+        return jsonify({'error': 'PNG rendering is not available on this server'}), 501
+    return _render_wordcloud(wordcloud_id, 'png')
+
+def _render_wordcloud(wordcloud_id, image_format):
+    try:
+        width = min(max(request.args.get('width', 800, type=int), 200), 2000)
+        height = min(max(request.args.get('height', 500, type=int), 200), 2000)
+        max_words = min(max(request.args.get('max_words', 150, type=int), 1), 500)
+
+        with get_db_connection() as client:
+            db = client['comp5241_g10']
+            wordcloud = db.word_clouds.find_one(
+                {'_id': ObjectId(wordcloud_id)}, {'counts_version': 1, 'counting_mode': 1}
+            )
+            if not wordcloud:
+                return jsonify({'error': 'Word cloud not found'}), 404
+
+            # Exact counts_version is bumped only after the counts are written, so counts read now
+            # include every change up to it. Approximate counts come from the sketch shards, which
+            # other workers write only at checkpoints, so they are versioned by what the merge
+            # will actually see; either way a newer change has a newer version and renders again
+            approximate = _is_approximate(wordcloud)
+            if approximate:
+                version = f"s{sketch_registry.version(db, wordcloud_id)}"
+            else:
+                version = wordcloud.get('counts_version', 0)
+            etag = f'"{wordcloud_id}-{version}-{image_format}-{max_words}-{width}x{height}"'
+            if etag in request.if_none_match:
+                return Response(status=304, headers={'ETag': etag})
+
+            key = (wordcloud_id, version, image_format, width, height, max_words)
+            image = render_cache.get(key)
+            if image is None:
+                if approximate:
+                    words = [(entry['word'], entry['count'])
+                             for entry in sketch_registry.merged(db, wordcloud_id).top(max_words)]
+                else:
+                    words = [(entry['word'], entry['count']) for entry in db.wordcloud_word_counts.find(
+                        {'wordcloud_id': wordcloud_id}, {'_id': 0, 'word': 1, 'count': 1}
+                    ).sort([('count', -1), ('word', 1)]).limit(max_words)]
+                image = render_cache.render(key, words, width, height, image_format)
+
+        return Response(
+            image,
+            mimetype='image/svg+xml' if image_format == 'svg' else 'image/png',
+            headers={'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        )
+
+    except Exception as e:
+        logger.error(f"Error rendering word cloud: {str(e)}")
+        return jsonify({'error': 'Failed to render word cloud', 'details': str(e)}), 500
+
 # Close/deactivate a word cloud (teacher only)
 @wordclouds_bp.route('/<wordcloud_id>/close', methods=['POST'])
 @jwt_required(locations=["cookies"])
@@ -421,7 +641,7 @@ def close_wordcloud(wordcloud_id):
     try:
         with get_db_connection() as client:
             db = client['comp5241_g10']
-            wordcloud = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)})
+            wordcloud = db.word_clouds.find_one({'_id': ObjectId(wordcloud_id)}, {'created_by': 1})
         if not wordcloud:
             return jsonify({'error': 'Word cloud not found'}), 404
 
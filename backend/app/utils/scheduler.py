@@ -0,0 +1,273 @@
+"""
+COMP5241 Group 10 - Scheduled Transitions
+Publish, close and expire documents at the moment their dates pass
+
+Documents carry state flags (is_active, is_published, is_expired) that list
+queries filter on by equality, instead of comparing every document's dates
+against the clock on every read. TRANSITIONS says which date flips which
+flags. Creating a document sets the flags for the current time and stores
+one entry per future date in the scheduled_transitions collection, the
+durable schedule shared by every worker process; changing the dates
+reschedules them.
+
+Each process keeps the entries due within HORIZON_SECONDS in a hierarchical
+timer wheel, reloaded from the collection every LOAD_INTERVAL_SECONDS, and
+fires them on the tick they fall due. Firing claims the entry first, so
+with several workers each transition is applied once; an entry whose worker
+died mid-transition is picked up again after its lease expires.
+"""
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument
+
+from config.database import get_db_connection
+from .timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = 1
+HORIZON_SECONDS = 600
+LOAD_INTERVAL_SECONDS = 30
+LEASE_SECONDS = 60
+
+# Collection -> (date field, action, flags set once the date has passed)
+TRANSITIONS = {
+    'learning_activities': [
+        ('start_date', 'publish', {'is_active': True}),
+        ('end_date', 'close', {'is_active': False}),
+    ],
+    'polls': [('expires_at', 'expire', {'is_expired': True})],
+    'quizzes': [('expires_at', 'expire', {'is_expired': True})],
+    'word_clouds': [('expires_at', 'expire', {'is_expired': True})],
+    'short_answer_questions': [('expires_at', 'expire', {'is_expired': True})],
+    'mini_games': [('expires_at', 'expire', {'is_expired': True})],
+    'course_announcements': [
+        ('publish_at', 'publish', {'is_published': True}),
+        ('expire_at', 'expire', {'is_expired': True}),
+    ],
+}
+
+
+def entry_id(collection: str, document_id, action: str) -> str:
+    return f"{collection}:{document_id}:{action}"
+
+
+def _epoch(at: datetime) -> float:
+    return calendar.timegm(at.utctimetuple()) + at.microsecond / 1e6
+
+
+def _passed(action: str, at, now: datetime) -> bool:
+    # Without a date a document is published straight away and never closes or expires
+    if not isinstance(at, datetime):
+        return action == 'publish'
+    return at <= now
+
+
+def initial_state(collection: str, document: Dict, now: Optional[datetime] = None) -> Dict:
+    """Flags for a new document that it doesn't set itself: each transition applied if its date has passed"""
+    now = now or datetime.utcnow()
+    state = {}
+    for field, action, flags in TRANSITIONS.get(collection, []):
+        passed = _passed(action, document.get(field), now)
+        for flag, value in flags.items():
+            if flag in document:
+                continue
+            # Transitions are in date order, so one still to come leaves an earlier one's flag alone
+            if passed:
+                state[flag] = value
+            else:
+                state.setdefault(flag, not value)
+    return state
+
+
+def schedule(db, collection: str, document: Dict, now: Optional[datetime] = None) -> List[str]:
+    """Store the document's future transitions; rescheduling replaces them"""
+    now = now or datetime.utcnow()
+    scheduled = []
+    for field, action, flags in TRANSITIONS.get(collection, []):
+        at = document.get(field)
+        if not isinstance(at, datetime) or at <= now:
+            continue
+        key = entry_id(collection, document['_id'], action)
+        db.scheduled_transitions.update_one({'_id': key}, {'$set': {
+            'collection': collection,
+            'document_id': document['_id'],
+            'action': action,
+            'set': flags,
+            'run_at': at,
+            'status': 'pending',
+            'lease_until': None
+        }}, upsert=True)
+        transition_scheduler.notify(key, at)
+        scheduled.append(key)
+    return scheduled
+
+
+def cancel(db, collection: str, document_id, actions: Optional[Iterable[str]] = None) -> int:
+    """Drop the document's pending transitions (only the given actions, if any)"""
+    actions = [action for _, action, _ in TRANSITIONS.get(collection, [])] if actions is None else list(actions)
+    keys = [entry_id(collection, document_id, action) for action in actions]
+    return db.scheduled_transitions.delete_many({'_id': {'$in': keys}, 'status': 'pending'}).deleted_count
+
+
+def reschedule(db, collection: str, document: Dict, now: Optional[datetime] = None) -> List[str]:
+    """Bring a document's flags and schedule in line with dates that were changed.
+
+    The flags are set as initial_state would set them for the new dates,
+    future dates are scheduled and the entries for dates that were cleared
+    or have passed are cancelled.
+    """
+    now = now or datetime.utcnow()
+    dates = {field: document.get(field) for field, _, _ in TRANSITIONS.get(collection, [])}
+    state = initial_state(collection, dates, now)
+    db[collection].update_one({'_id': document['_id']}, {'$set': state})
+    document.update(state)
+    scheduled = schedule(db, collection, document, now)
+    cancel(db, collection, document['_id'], [
+        action for _, action, _ in TRANSITIONS.get(collection, [])
+        if entry_id(collection, document['_id'], action) not in scheduled
+    ])
+    return scheduled
+
+
+def claim(db, key: str, now: Optional[datetime] = None) -> Optional[Dict]:
+    """Take a due entry, unless it was rescheduled, already ran or another worker holds it"""
+    now = now or datetime.utcnow()
+    return db.scheduled_transitions.find_one_and_update(
+        {'_id': key, 'run_at': {'$lte': now}, '$or': [
+            {'status': 'pending'},
+            {'status': 'running', 'lease_until': {'$lt': now}}
+        ]},
+        {'$set': {'status': 'running', 'lease_until': now + timedelta(seconds=LEASE_SECONDS)}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def run_entry(db, key: str, now: Optional[datetime] = None) -> bool:
+    """Apply one due transition; False if there was nothing to do"""
+    now = now or datetime.utcnow()
+    entry = claim(db, key, now)
+    if not entry:
+        return False
+    [field] = [field for field, action, _ in TRANSITIONS[entry['collection']] if action == entry['action']]
+    # A document that is being or has been deleted is never republished, and
+    # one whose date has moved since the entry was stored waits for its new entry
+    db[entry['collection']].update_one(
+        {'_id': entry['document_id'], field: entry['run_at'],
+         'deleting': {'$ne': True}, 'status': {'$ne': 'deleted'}},
+        {'$set': entry['set']}
+    )
+    # Left alone if the entry was rescheduled in the meantime
+    db.scheduled_transitions.update_one(
+        {'_id': key, 'status': 'running', 'run_at': entry['run_at']},
+        {'$set': {'status': 'done', 'done_at': now, 'lease_until': None}}
+    )
+    return True
+
+
+def pending_entries(db, until: datetime, now: Optional[datetime] = None) -> List[Dict]:
+    """Entries due by until, plus running ones whose worker has gone"""
+    now = now or datetime.utcnow()
+    return list(db.scheduled_transitions.find(
+        {'$or': [
+            {'status': 'pending', 'run_at': {'$lte': until}},
+            {'status': 'running', 'lease_until': {'$lt': now}}
+        ]},
+        {'run_at': 1, 'status': 1}
+    ))
+
+
+def run_due(db, now: Optional[datetime] = None) -> int:
+    """Apply every transition that is due, straight from the collection"""
+    now = now or datetime.utcnow()
+    return sum(run_entry(db, entry['_id'], now) for entry in pending_entries(db, now, now))
+
+
+def backfill(db, collections: Optional[Iterable[str]] = None, now: Optional[datetime] = None) -> int:
+    """Give documents written before the flags existed their flags and schedule.
+
+    Scans whole collections, so it is run once after upgrading with
+    database_connection/backfill_transition_flags.py rather than by the workers.
+    """
+    now = now or datetime.utcnow()
+    updated = 0
+    for collection in collections or TRANSITIONS:
+        transitions = TRANSITIONS[collection]
+        flags = {flag for _, _, fields in transitions for flag in fields}
+        for document in db[collection].find({'$or': [{flag: {'$exists': False}} for flag in flags]}):
+            db[collection].update_one({'_id': document['_id']}, {'$set': initial_state(collection, document, now)})
+            schedule(db, collection, document, now)
+            updated += 1
+    return updated
+
+
+class TransitionScheduler:
+    """Per-process timer wheel over the durable schedule, run by a background thread"""
+
+    def __init__(self, tick: float = TICK_SECONDS, horizon: float = HORIZON_SECONDS,
+                 load_interval: float = LOAD_INTERVAL_SECONDS):
+        self.tick = tick
+        self.horizon = timedelta(seconds=horizon)
+        self.load_interval = load_interval
+        self.wheel: Optional[TimerWheel] = None
+        self._loaded_until: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self, db, now: Optional[datetime] = None) -> int:
+        """Put every entry due within the horizon on the wheel"""
+        now = now or datetime.utcnow()
+        until = now + self.horizon
+        entries = pending_entries(db, until, now)
+        with self._lock:
+            if self.wheel is None:
+                self.wheel = TimerWheel(self.tick, _epoch(now))
+            for entry in entries:
+                self.wheel.schedule(entry['_id'], _epoch(entry['run_at'] if entry['status'] == 'pending' else now))
+            self._loaded_until = until
+        return len(entries)
+
+    def notify(self, key: str, run_at: datetime):
+        """Put a newly scheduled entry on this process's wheel if the next load would miss it"""
+        with self._lock:
+            if self.wheel is not None and self._loaded_until and run_at <= self._loaded_until:
+                self.wheel.schedule(key, _epoch(run_at))
+
+    def fire(self, db, now: Optional[datetime] = None) -> int:
+        """Run the entries whose tick has come; returns how many were applied here"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            if self.wheel is None:
+                return 0
+            due = self.wheel.advance(_epoch(now))
+        return sum(run_entry(db, key, now) for key in due)
+
+    def _run(self):
+        while True:
+            try:
+                with get_db_connection() as client:
+                    db = client['comp5241_g10']
+                    next_load = 0.0
+                    while True:
+                        if time.monotonic() >= next_load:
+                            self.load(db)
+                            next_load = time.monotonic() + self.load_interval
+                        self.fire(db)
+                        time.sleep(self.tick)
+            except Exception as e:
+                logger.error(f"Error running scheduled transitions: {str(e)}")
+                time.sleep(self.load_interval)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='transition-scheduler', daemon=True)
+                self._thread.start()
+
+
+transition_scheduler = TransitionScheduler()
@@ -0,0 +1,93 @@
+"""
+COMP5241 Group 10 - Hierarchical Timer Wheel
+In-memory timers with O(1) schedule and cancel
+
+Time advances in ticks. Level 0 has one slot per tick; each slot of level n
+covers SLOTS**n ticks, so LEVELS levels reach SLOTS**LEVELS ticks ahead
+(64**4 one-second ticks is about 194 days); anything further waits in an
+overflow bucket. When a level's slot comes round its timers are moved down
+to the finer levels, so every timer fires from level 0 on its own tick.
+"""
+import math
+from typing import Dict, Hashable, List
+
+SLOTS = 64
+LEVELS = 4
+
+
+class TimerWheel:
+    """Timers keyed by any hashable key; advance() returns the keys that are due"""
+
+    def __init__(self, tick: float = 1.0, now: float = 0.0, slots: int = SLOTS, levels: int = LEVELS):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.current = int(now // tick)
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._overflow: Dict[Hashable, int] = {}
+        self._due: Dict[Hashable, int] = {}  # already due when scheduled
+        self._where: Dict[Hashable, Dict[Hashable, int]] = {}  # key -> bucket holding it
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def _place(self, key: Hashable, due: int):
+        delta = due - self.current
+        if delta <= 0:
+            bucket = self._due
+        else:
+            bucket = self._overflow
+            for level in range(self.levels):
+                if delta < self.slots ** (level + 1):
+                    bucket = self._wheels[level][(due // self.slots ** level) % self.slots]
+                    break
+        bucket[key] = due
+        self._where[key] = bucket
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Fire key on the first tick at or after deadline (seconds); replaces any earlier timer for key"""
+        self.cancel(key)
+        self._place(key, math.ceil(deadline / self.tick))
+
+    def cancel(self, key: Hashable) -> bool:
+        bucket = self._where.pop(key, None)
+        if bucket is None:
+            return False
+        del bucket[key]
+        return True
+
+    def _cascade(self, bucket: Dict[Hashable, int]):
+        entries = list(bucket.items())
+        bucket.clear()
+        for key, due in entries:
+            self._place(key, due)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move time forward to now; returns the keys whose deadline has passed, in deadline order"""
+        target = int(now // self.tick)
+        fired = sorted(self._due, key=self._due.get)
+        for key in fired:
+            del self._where[key]
+        self._due.clear()
+
+        while self.current < target:
+            if not self._where:
+                self.current = target
+                break
+            self.current += 1
+            if self.current % self.slots ** self.levels == 0:
+                self._cascade(self._overflow)
+            for level in reversed(range(1, self.levels)):
+                span = self.slots ** level
+                if self.current % span == 0:
+                    self._cascade(self._wheels[level][(self.current // span) % self.slots])
+            # An overflow timer can cascade out exactly on its own tick
+            for bucket in (self._due, self._wheels[0][self.current % self.slots]):
+                for key in list(bucket):
+                    del self._where[key]
+                    fired.append(key)
+                bucket.clear()
+        return fired
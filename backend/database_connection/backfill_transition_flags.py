@@ -0,0 +1,52 @@
+"""
+COMP5241 Group 10 - Transition Flags Backfill Script
+Gives documents written before the scheduled transitions existed their state
+flags (is_active, is_published, is_expired) and their scheduled_transitions
+entries.
+
+New and updated documents get both from the routes, so this only needs to
+run once after upgrading. It scans every document that lacks a flag and is
+safe to re-run: documents that already have their flags are left alone.
+
+Usage:
+    python -m database_connection.backfill_transition_flags [learning_activities] [polls] ... (from backend/)
+"""
+import argparse
+import os
+
+import pymongo
+from dotenv import load_dotenv
+
+from app.utils.scheduler import TRANSITIONS, backfill
+
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Set state flags and schedules on documents that predate them')
+    # Validated below: choices= with nargs='*' rejects the empty default on Python 3.11
+    parser.add_argument('collections', nargs='*',
+                        help=f"Collections, any of {', '.join(sorted(TRANSITIONS))} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.collections) - set(TRANSITIONS))
+    if unknown:
+        parser.error(f"unknown collection(s): {', '.join(unknown)}")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    mongodb_uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/comp5241_g10')
+    client = pymongo.MongoClient(mongodb_uri)
+    db = client['comp5241_g10']
+
+    for name in args.collections or sorted(TRANSITIONS):
+        updated = backfill(db, [name])
+        print(f"[{name}] done: {updated} documents updated")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
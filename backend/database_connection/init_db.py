@@ -92,6 +92,42 @@ def init_database():
             return client, db
 
 
+def merge_duplicate_progress(db):
+    """Fold duplicate activity_progress records into one per (activity_id, student_id).
+
+    Before progress was written by upsert, concurrent first reports could
+    create two records for the same student and activity, which would stop
+    the unique index from being built. The oldest record is kept and takes
+    the highest progress, the summed time and the latest access, as the
+    upsert would have given it; the others are deleted. Returns the number
+    of records removed.
+    """
+    removed = 0
+    duplicates = db.activity_progress.aggregate([
+        {'$group': {'_id': {'activity_id': '$activity_id', 'student_id': '$student_id'},
+                    'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}}
+    ], allowDiskUse=True)
+    for group in duplicates:
+        records = sorted(db.activity_progress.find({'_id': {'$in': group['ids']}}), key=lambda record: record['_id'])
+        kept, extra = records[0], records[1:]
+        merged = {
+            'progress_percentage': max(record.get('progress_percentage', 0) for record in records),
+            'time_spent': sum(record.get('time_spent', 0) for record in records),
+            'is_completed': any(record.get('is_completed') for record in records),
+            'completion_counted': any(record.get('completion_counted') for record in records)
+        }
+        accessed = [record['last_accessed'] for record in records if record.get('last_accessed')]
+        if accessed:
+            merged['last_accessed'] = max(accessed)
+        course_id = next((record['course_id'] for record in records if record.get('course_id')), None)
+        if course_id:
+            merged['course_id'] = course_id
+        db.activity_progress.update_one({'_id': kept['_id']}, {'$set': merged})
+        removed += db.activity_progress.delete_many({'_id': {'$in': [record['_id'] for record in extra]}}).deleted_count
+    return removed
+
+
 def create_collections_and_indexes(db):
     """Create collections and their indexes"""
     collections_names = db.list_collection_names()
@@ -223,6 +259,86 @@ def create_collections_and_indexes(db):
     db.activity_submissions.create_index([("activity_id", 1), ("student_id", 1)])
     db.activity_submissions.create_index("status")
 
+    # Grading queue: a teacher's activities, then each one's ungraded submissions oldest first
+    db.learning_activities.create_index([("created_by", 1), ("course_id", 1)])
+    db.short_answer_questions.create_index([("created_by", 1), ("course_id", 1)])
+    db.activity_submissions.create_index([("activity_id", 1), ("status", 1), ("submitted_at", 1), ("_id", 1)])
+    db.shortanswer_submissions.create_index([("question_id", 1), ("is_graded", 1), ("submitted_at", 1), ("_id", 1)])
+
+    # Activity progress indexes (one record per student per activity, written by upsert);
+    # duplicates left by older code are merged first or the unique index can't be built
+    progress_key = [("activity_id", 1), ("student_id", 1)]
+    if not any(index.get('unique') and index['key'] == progress_key
+               for index in db.activity_progress.index_information().values()):
+        merged = merge_duplicate_progress(db)
+        if merged:
+            print(f"Merged {merged} duplicate activity progress records")
+    db.activity_progress.create_index(progress_key, unique=True)
+    db.activity_progress.create_index([("student_id", 1), ("last_accessed", -1)])
+    db.activity_progress.create_index([("student_id", 1), ("course_id", 1)])
+
+    # Course progress rollups (one per student per course)
+    db.course_progress.create_index([("student_id", 1), ("course_id", 1)], unique=True)
+
+    # Cascade delete jobs: claimed oldest first, by status and lease
+    db.delete_jobs.create_index([("status", 1), ("created_at", 1)])
+    db.delete_jobs.create_index([("document_id", 1), ("status", 1)])
+
+    # Course activity feed: each activity collection is read by course, newest first
+    for collection in ("polls", "quizzes", "word_clouds", "short_answer_questions", "mini_games"):
+        db[collection].create_index([("course_id", 1), ("is_active", 1), ("created_at", -1)])
+        # Lists that hide expired activities filter on the flag the scheduler maintains
+        db[collection].create_index([("course_id", 1), ("is_active", 1), ("is_expired", 1), ("created_at", -1)])
+
+    # Scheduled transitions: each worker loads the entries due soon
+    db.scheduled_transitions.create_index([("status", 1), ("run_at", 1)])
+
+    # Course announcements: students only see published, unexpired ones
+    db.course_announcements.create_index([("course_id", 1), ("is_published", 1), ("is_expired", 1), ("is_pinned", -1), ("created_at", -1)])
+
+    # Poll votes indexes (one vote per student per poll)
+    db.votes.create_index([("poll_id", 1), ("student_id", 1)])
+
+    # Quiz attempts indexes (a student's attempts per quiz)
+    db.quiz_attempts.create_index([("quiz_id", 1), ("student_id", 1)])
+
+    # Word cloud submissions indexes (each word once per user, enforced by the index)
+    db.wordcloud_submissions.create_index([("wordcloud_id", 1), ("submitted_by", 1), ("word", 1)], unique=True)
+    db.wordcloud_submissions.create_index([("wordcloud_id", 1), ("word", 1)])
+    db.wordcloud_submissions.create_index([("wordcloud_id", 1), ("submitted_at", -1)])
+
+    # Word cloud per-user submission counters (one per user per cloud)
+    db.wordcloud_participants.create_index([("wordcloud_id", 1), ("user_id", 1)], unique=True)
+
+    # Word cloud word counts indexes
+    db.wordcloud_word_counts.create_index([("wordcloud_id", 1), ("word", 1)], unique=True)
+    db.wordcloud_word_counts.create_index([("wordcloud_id", 1), ("count", -1), ("word", 1)])
+
+    # Word cloud heavy-hitter sketch checkpoints (one shard per worker)
+    db.wordcloud_sketches.create_index([("wordcloud_id", 1), ("worker_id", 1)], unique=True)
+
+    # Short answer submissions indexes (one submission per student per question)
+    db.shortanswer_submissions.create_index([("question_id", 1), ("submitted_by", 1)], unique=True)
+    db.shortanswer_submissions.create_index([("question_id", 1), ("submitted_at", -1)])
+    # Near-duplicate lookups by LSH band, per question and across a course
+    db.shortanswer_submissions.create_index([("question_id", 1), ("lsh_bands", 1)])
+    db.shortanswer_submissions.create_index([("course_id", 1), ("lsh_bands", 1)])
+    # Answer search; terms are pre-processed into search_text, so no stemming here
+    db.shortanswer_submissions.create_index(
+        [("course_id", 1), ("search_text", "text")], default_language="none", name="shortanswer_search"
+    )
+
+    # Mini-game plays (append-only) and best score per student
+    db.minigame_plays.create_index([("minigame_id", 1), ("student_id", 1), ("achieved_at", 1)])
+    db.minigame_best_scores.create_index([("minigame_id", 1), ("student_id", 1)], unique=True)
+    # Leaderboard order; time_key is time_taken with untimed plays last
+    db.minigame_best_scores.create_index([("minigame_id", 1), ("score", -1), ("time_key", 1), ("achieved_at", 1)])
+    # Incremental refreshes of the in-process leaderboards
+    db.minigame_best_scores.create_index([("minigame_id", 1), ("achieved_at", 1)])
+
+    # Moderation blocklists ('global' or a course ID)
+    db.moderation_blocklists.create_index("scope", unique=True)
+
     # Audit logs indexes
     if "action_log" not in collections_names:
         db.create_collection(
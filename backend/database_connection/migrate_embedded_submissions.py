@@ -0,0 +1,262 @@
+"""
+COMP5241 Group 10 - Embedded Submissions Migration Script
+Moves embedded submission arrays out of activity documents into their own
+indexed collections.
+
+The migration is resumable: each parent document records how many array
+entries have been copied, entries are upserted on their natural key, and the
+embedded array is only removed once it has been fully copied. Re-running the
+script after a crash continues where it stopped.
+
+Usage:
+    python migrate_embedded_submissions.py [wordclouds] [shortanswers] [minigames] [--batch-size 500]
+"""
+import argparse
+import os
+
+import pymongo
+from pymongo import UpdateOne, ReplaceOne
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _wordcloud_submission(parent, entry):
+    """Map an embedded word cloud submission to a wordcloud_submissions document"""
+    key = {
+        'wordcloud_id': str(parent['_id']),
+        'submitted_by': entry.get('submitted_by'),
+        'word': str(entry.get('word', '')).lower()
+    }
+    # A word submitted twice by the same user is kept once, as the routes now enforce
+    return key, {'submitted_at': entry.get('submitted_at')}
+
+
+def _shortanswer_submission(parent, entry):
+    """Map an embedded short answer to a shortanswer_submissions document (one per student)"""
+    key = {'question_id': str(parent['_id']), 'submitted_by': entry.get('submitted_by')}
+    extra = {
+        'course_id': parent.get('course_id'),
+        'text': entry.get('text', ''),
+        'submitted_at': entry.get('submitted_at'),
+        'is_graded': entry.get('is_graded', False),
+        'feedback': entry.get('feedback', ''),
+        'score': entry.get('score')
+    }
+    return key, extra
+
+
+def _minigame_play(parent, entry):
+    """Map an embedded mini-game score to a minigame_plays document"""
+    key = {
+        'minigame_id': str(parent['_id']),
+        'student_id': entry.get('student_id'),
+        'achieved_at': entry.get('achieved_at')
+    }
+    extra = {
+        'course_id': parent.get('course_id'),
+        'score': entry.get('score'),
+        'time_taken': entry.get('time_taken')
+    }
+    return key, extra
+
+
+def rebuild_minigame_best_scores(db, minigame_oid):
+    """Recompute every student's best score for a mini-game from minigame_plays"""
+    minigame_id = str(minigame_oid)
+    best_scores = db.minigame_plays.aggregate([
+        {'$match': {'minigame_id': minigame_id}},
+        # Same time_key as the mini-game routes: untimed plays rank after timed ones
+        {'$addFields': {'time_key': {'$ifNull': ['$time_taken', float('inf')]}}},
+        {'$sort': {'score': -1, 'time_key': 1, 'achieved_at': 1}},
+        {'$group': {'_id': '$student_id', 'best': {'$first': '$$ROOT'}}}
+    ])
+    requests = [
+        ReplaceOne(
+            {'minigame_id': minigame_id, 'student_id': entry['_id']},
+            {key: value for key, value in entry['best'].items() if key != '_id'},
+            upsert=True
+        ) for entry in best_scores
+    ]
+    if requests:
+        db.minigame_best_scores.bulk_write(requests, ordered=False)
+
+
+def rebuild_wordcloud_counts(db, wordcloud_oid):
+    """Recompute a word cloud's word counts, counters and per-user submission counts from wordcloud_submissions"""
+    wordcloud_id = str(wordcloud_oid)
+    word_counts = list(db.wordcloud_submissions.aggregate([
+        {'$match': {'wordcloud_id': wordcloud_id}},
+        {'$group': {'_id': '$word', 'count': {'$sum': 1}}}
+    ]))
+    participants = list(db.wordcloud_submissions.aggregate([
+        {'$match': {'wordcloud_id': wordcloud_id}},
+        {'$group': {'_id': '$submitted_by', 'words': {'$addToSet': '$word'}, 'count': {'$sum': 1}}}
+    ]))
+
+    db.wordcloud_word_counts.delete_many({
+        'wordcloud_id': wordcloud_id,
+        'word': {'$nin': [entry['_id'] for entry in word_counts]}
+    })
+    if word_counts:
+        db.wordcloud_word_counts.bulk_write([
+            ReplaceOne(
+                {'wordcloud_id': wordcloud_id, 'word': entry['_id']},
+                {'wordcloud_id': wordcloud_id, 'word': entry['_id'], 'count': entry['count']},
+                upsert=True
+            ) for entry in word_counts
+        ], ordered=False)
+
+    db.wordcloud_participants.delete_many({
+        'wordcloud_id': wordcloud_id,
+        'user_id': {'$nin': [entry['_id'] for entry in participants]}
+    })
+    if participants:
+        db.wordcloud_participants.bulk_write([
+            ReplaceOne(
+                {'wordcloud_id': wordcloud_id, 'user_id': entry['_id']},
+                {'wordcloud_id': wordcloud_id, 'user_id': entry['_id'],
+                 'words': entry['words'], 'submission_count': entry['count']},
+                upsert=True
+            ) for entry in participants
+        ], ordered=False)
+
+    # Clouds from before the per-user counters kept each user's words in a participants map
+    db.word_clouds.update_one({'_id': wordcloud_oid}, {'$inc': {'counts_version': 1}, '$set': {
+        'submission_count': sum(entry['count'] for entry in word_counts),
+        'unique_words': len(word_counts),
+        'unique_contributors': len(participants)
+    }, '$unset': {'participants': ''}})
+
+
+MIGRATIONS = {
+    'wordclouds': {
+        'source': 'word_clouds',
+        'array_field': 'submissions',
+        'target': 'wordcloud_submissions',
+        'build': _wordcloud_submission,
+        'unique_indexes': [
+            [("wordcloud_id", 1), ("submitted_by", 1), ("word", 1)]
+        ],
+        'indexes': [
+            [("wordcloud_id", 1), ("word", 1)],
+            [("wordcloud_id", 1), ("submitted_at", -1)]
+        ],
+        # Clouds without maintained counters, or still holding a participants map, get them rebuilt after the move
+        'finalize': rebuild_wordcloud_counts,
+        'finalize_query': {'$or': [{'submission_count': {'$exists': False}}, {'participants': {'$exists': True}}]}
+    },
+    'shortanswers': {
+        'source': 'short_answer_questions',
+        'array_field': 'submissions',
+        'target': 'shortanswer_submissions',
+        'build': _shortanswer_submission,
+        # The old layout already kept one entry per student; the first copy wins
+        'unique_indexes': [
+            [("question_id", 1), ("submitted_by", 1)]
+        ]
+    },
+    'minigames': {
+        'source': 'mini_games',
+        'array_field': 'scores',
+        'target': 'minigame_plays',
+        'build': _minigame_play,
+        'indexes': [
+            [("minigame_id", 1), ("student_id", 1), ("achieved_at", 1)]
+        ],
+        # Rebuilding is idempotent, so every game's best scores are recomputed from its plays
+        'finalize': rebuild_minigame_best_scores,
+        'finalize_query': {}
+    }
+}
+
+PROGRESS_FIELD = 'migration_progress'
+
+
+def migrate_collection(db, name, batch_size=500):
+    """Copy one embedded array to its target collection.
+
+    Returns (documents_migrated, entries_copied).
+    """
+    spec = MIGRATIONS[name]
+    source = db[spec['source']]
+    target = db[spec['target']]
+    array_field = spec['array_field']
+
+    for keys in spec.get('unique_indexes', []):
+        target.create_index(keys, unique=True)
+    for keys in spec.get('indexes', []):
+        target.create_index(keys)
+
+    documents_migrated = 0
+    entries_copied = 0
+    # Only documents whose embedded array is still present need work
+    for parent_ref in source.find({array_field: {'$exists': True}}, {'_id': 1, PROGRESS_FIELD: 1}):
+        offset = (parent_ref.get(PROGRESS_FIELD) or {}).get(array_field, 0)
+
+        while True:
+            parent = source.find_one(
+                {'_id': parent_ref['_id']},
+                {array_field: {'$slice': [offset, batch_size]}}
+            )
+            entries = parent.get(array_field) or []
+            if not entries:
+                break
+
+            requests = []
+            for entry in entries:
+                key, extra = spec['build'](parent, entry)
+                requests.append(UpdateOne(key, {'$setOnInsert': dict(key, **extra)}, upsert=True))
+            target.bulk_write(requests, ordered=False)
+
+            offset += len(entries)
+            entries_copied += len(entries)
+            source.update_one(
+                {'_id': parent_ref['_id']},
+                {'$set': {f'{PROGRESS_FIELD}.{array_field}': offset}}
+            )
+
+        # Fully copied: drop the embedded array and the checkpoint
+        source.update_one(
+            {'_id': parent_ref['_id']},
+            {'$unset': {array_field: '', f'{PROGRESS_FIELD}.{array_field}': ''}}
+        )
+        documents_migrated += 1
+        print(f"[{name}] {spec['source']} {parent_ref['_id']}: {offset} entries moved")
+
+    if spec.get('finalize'):
+        for parent_ref in source.find(spec['finalize_query'], {'_id': 1}):
+            spec['finalize'](db, parent_ref['_id'])
+
+    return documents_migrated, entries_copied
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Move embedded submission arrays into indexed collections')
+    # No choices=: with nargs='*' argparse checks the empty default against them and fails on Python 3.11
+    parser.add_argument('migrations', nargs='*',
+                        help=f"Migrations to run, any of {', '.join(sorted(MIGRATIONS))} (default: all)")
+    parser.add_argument('--batch-size', type=int, default=500, help='Array entries copied per batch')
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.migrations) - set(MIGRATIONS))
+    if unknown:
+        parser.error(f"unknown migration(s): {', '.join(unknown)}")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    mongodb_uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/comp5241_g10')
+    client = pymongo.MongoClient(mongodb_uri)
+    db = client['comp5241_g10']
+
+    for name in args.migrations or sorted(MIGRATIONS):
+        documents, entries = migrate_collection(db, name, batch_size=args.batch_size)
+        print(f"[{name}] done: {documents} documents, {entries} entries")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
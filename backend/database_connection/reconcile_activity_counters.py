@@ -0,0 +1,151 @@
+"""
+COMP5241 Group 10 - Activity Counter Reconciliation Script
+Recomputes the summary counters kept on activity documents from their
+submission collections and repairs any that have drifted.
+
+The routes maintain these counters with $inc/$max on every write, so they
+only drift after a partial failure or a manual data fix. Run this after
+upgrading (activities created earlier have no counters yet) and whenever
+list pages show counts that look wrong.
+
+Usage:
+    python reconcile_activity_counters.py [mini_games] [word_clouds] [short_answer_questions] [quizzes] [--dry-run]
+"""
+import argparse
+import os
+
+import pymongo
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# Per activity collection: the child collection, its parent-ID field, and a
+# $group stage (grouped on that field) producing every counter
+COUNTERS = {
+    'mini_games': {
+        'source': 'minigame_plays',
+        'parent_field': 'minigame_id',
+        'group': {
+            'play_count': {'$sum': 1},
+            'last_activity_at': {'$max': '$achieved_at'}
+        }
+    },
+    'word_clouds': {
+        'source': 'wordcloud_submissions',
+        'parent_field': 'wordcloud_id',
+        # One row per distinct word first, so unique_words is a row count
+        'pre_group': [
+            {'$group': {
+                '_id': {'wordcloud_id': '$wordcloud_id', 'word': '$word'},
+                'count': {'$sum': 1},
+                'last_activity_at': {'$max': '$submitted_at'}
+            }},
+            {'$project': {'_id': 0, 'wordcloud_id': '$_id.wordcloud_id', 'count': 1, 'last_activity_at': 1}}
+        ],
+        'group': {
+            'submission_count': {'$sum': '$count'},
+            'unique_words': {'$sum': 1},
+            'last_activity_at': {'$max': '$last_activity_at'}
+        }
+    },
+    'short_answer_questions': {
+        'source': 'shortanswer_submissions',
+        'parent_field': 'question_id',
+        'group': {
+            'submission_count': {'$sum': 1},
+            'graded_count': {'$sum': {'$cond': [{'$eq': ['$is_graded', True]}, 1, 0]}},
+            'last_activity_at': {'$max': '$submitted_at'}
+        }
+    },
+    'quizzes': {
+        'source': 'quiz_attempts',
+        'parent_field': 'quiz_id',
+        'group': {
+            'attempt_count': {'$sum': 1},
+            'submission_count': {'$sum': {'$cond': [{'$eq': ['$is_submitted', True]}, 1, 0]}},
+            'last_activity_at': {'$max': {'$ifNull': ['$completed_at', '$started_at']}}
+        }
+    }
+}
+
+
+def expected_counters(db, name):
+    """Counter values for every activity in the collection, keyed by activity ID string"""
+    spec = COUNTERS[name]
+    empty = {field: None if field == 'last_activity_at' else 0 for field in spec['group']}
+    expected = {str(activity['_id']): dict(empty) for activity in db[name].find({}, {'_id': 1})}
+
+    pipeline = list(spec.get('pre_group', []))
+    pipeline.append({'$group': dict({'_id': f"${spec['parent_field']}"}, **spec['group'])})
+    for entry in db[spec['source']].aggregate(pipeline, allowDiskUse=True):
+        if entry['_id'] in expected:
+            expected[entry['_id']] = {field: entry[field] for field in spec['group']}
+    return expected
+
+
+def reconcile_collection(db, name, dry_run=False, batch_size=500):
+    """Repair drifted counters in one activity collection.
+
+    Each repair only applies while the counters still hold the values that
+    were read, so a submission counted by a route in the meantime is not
+    overwritten with a stale total; such an activity is left for the next run.
+
+    Returns (activities_checked, activities_repaired).
+    """
+    expected = expected_counters(db, name)
+    fields = {field: 1 for field in COUNTERS[name]['group']}
+
+    repairs = []
+    for activity in db[name].find({}, fields):
+        want = expected[str(activity['_id'])]
+        drift = {field: value for field, value in want.items() if activity.get(field) != value}
+        if drift:
+            print(f"[{name}] {activity['_id']}: " + ', '.join(
+                f"{field} {activity.get(field)} -> {value}" for field, value in drift.items()
+            ))
+            # A missing counter reads as None, which the filter matches as missing too
+            read = {field: activity.get(field) for field in drift}
+            repairs.append(UpdateOne(dict(read, _id=activity['_id']), {'$set': drift}))
+
+    if dry_run:
+        return len(expected), len(repairs)
+    repaired = 0
+    for offset in range(0, len(repairs), batch_size):
+        repaired += db[name].bulk_write(repairs[offset:offset + batch_size], ordered=False).matched_count
+    if repaired < len(repairs):
+        print(f"[{name}] {len(repairs) - repaired} changed while reconciling; run again to check them")
+    return len(expected), repaired
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Recompute activity summary counters and repair drift')
+    # Validated below: choices= with nargs='*' rejects the empty default on Python 3.11
+    parser.add_argument('collections', nargs='*',
+                        help=f"Activity collections, any of {', '.join(sorted(COUNTERS))} (default: all)")
+    parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.collections) - set(COUNTERS))
+    if unknown:
+        parser.error(f"unknown collection(s): {', '.join(unknown)}")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    mongodb_uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/comp5241_g10')
+    client = pymongo.MongoClient(mongodb_uri)
+    db = client['comp5241_g10']
+
+    for name in args.collections or sorted(COUNTERS):
+        checked, repaired = reconcile_collection(db, name, dry_run=args.dry_run)
+        action = 'would repair' if args.dry_run else 'repaired'
+        print(f"[{name}] done: {checked} checked, {action} {repaired}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+COMP5241 Group 10 - Aggregation Helper for Tests
+Runs pipelines on mongomock, which has no $lookup with let/pipeline.
+"""
+from mongomock.aggregate import process_pipeline
+
+
+def _bind(value, variables):
+    """value with every "$$name" replaced by the variable's value"""
+    if isinstance(value, str) and value.startswith('$$') and value[2:] in variables:
+        bound = variables[value[2:]]
+        return {'$literal': bound} if isinstance(bound, str) and bound.startswith('$') else bound
+    if isinstance(value, dict):
+        return {key: _bind(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_bind(item, variables) for item in value]
+    return value
+
+
+def aggregate(collection, pipeline):
+    """Rows of pipeline run on a mongomock collection.
+
+    A $lookup with let and pipeline is run row by row: its variables are
+    evaluated on the row and bound into the sub-pipeline, which then runs on
+    the foreign collection. Every other stage is mongomock's own.
+    """
+    database = collection.database
+    rows = list(collection.find())
+    for stage in pipeline:
+        lookup = stage.get('$lookup')
+        if lookup is None or 'let' not in lookup:
+            rows = list(process_pipeline(rows, database, [stage], None))
+            continue
+        for row in rows:
+            [variables] = process_pipeline([row], database, [{'$project': dict(lookup['let'], _id=0)}], None)
+            row[lookup['as']] = aggregate(database[lookup['from']], _bind(lookup['pipeline'], variables))
+    return rows
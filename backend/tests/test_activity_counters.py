@@ -0,0 +1,100 @@
+"""
+COMP5241 Group 10 - Activity Counter Tests
+Counters maintained by the write paths agree with the reconciliation script, which repairs drift.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.modules.learning_activities.minigames_routes import _record_play
+from app.modules.learning_activities.shortanswers_routes import _apply_grades, _upsert_submission
+from database_connection.reconcile_activity_counters import parse_args, reconcile_collection
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient()['comp5241_g10']
+    db.shortanswer_submissions.create_index([('question_id', 1), ('submitted_by', 1)], unique=True)
+    db.minigame_best_scores.create_index([('minigame_id', 1), ('student_id', 1)], unique=True)
+    return db
+
+
+def test_write_paths_keep_counters_exact(db):
+    start = datetime(2024, 1, 1)
+    game = {'_id': db.mini_games.insert_one({'play_count': 0}).inserted_id}
+    for i in range(5):
+        _record_play(db, game, f'student{i % 2}', i * 10, None, start + timedelta(minutes=i))
+
+    question = {'_id': db.short_answer_questions.insert_one({'course_id': 'C1', 'submission_count': 0,
+                                                             'graded_count': 0}).inserted_id, 'course_id': 'C1'}
+    for i in range(4):
+        _upsert_submission(db, question, f'student{i}', f'answer {i}', start + timedelta(minutes=i))
+    _apply_grades(db, str(question['_id']), [{'student_id': 'student0', 'score': 80},
+                                             {'student_id': 'student1', 'score': 60}])
+    _upsert_submission(db, question, 'student0', 'resubmitted', start + timedelta(minutes=9))
+
+    game_doc = db.mini_games.find_one({'_id': game['_id']})
+    assert (game_doc['play_count'], game_doc['last_activity_at']) == (5, start + timedelta(minutes=4))
+    question_doc = db.short_answer_questions.find_one({'_id': question['_id']})
+    assert (question_doc['submission_count'], question_doc['graded_count']) == (4, 1)
+    assert question_doc['last_activity_at'] == start + timedelta(minutes=9)
+
+    assert reconcile_collection(db, 'mini_games') == (1, 0)
+    assert reconcile_collection(db, 'short_answer_questions') == (1, 0)
+
+
+def test_reconciliation_repairs_drift_and_fills_missing_counters(db):
+    start = datetime(2024, 1, 1)
+    wordcloud_id = db.word_clouds.insert_one({'submission_count': 7}).inserted_id
+    for i, word in enumerate(['apple', 'pear', 'apple']):
+        db.wordcloud_submissions.insert_one({'wordcloud_id': str(wordcloud_id), 'submitted_by': f's{i}',
+                                             'word': word, 'submitted_at': start + timedelta(minutes=i)})
+    quiz_id = db.quizzes.insert_one({}).inserted_id
+    db.quiz_attempts.insert_many([
+        {'quiz_id': str(quiz_id), 'student_id': 's1', 'started_at': start, 'is_submitted': True,
+         'completed_at': start + timedelta(minutes=5)},
+        {'quiz_id': str(quiz_id), 'student_id': 's2', 'started_at': start + timedelta(minutes=8), 'is_submitted': False}
+    ])
+    empty_quiz_id = db.quizzes.insert_one({'attempt_count': 0, 'submission_count': 0, 'last_activity_at': None}).inserted_id
+
+    assert reconcile_collection(db, 'word_clouds', dry_run=True) == (1, 1)
+    assert db.word_clouds.find_one({'_id': wordcloud_id})['submission_count'] == 7
+    assert reconcile_collection(db, 'word_clouds') == (1, 1)
+    wordcloud = db.word_clouds.find_one({'_id': wordcloud_id})
+    assert (wordcloud['submission_count'], wordcloud['unique_words']) == (3, 2)
+    assert wordcloud['last_activity_at'] == start + timedelta(minutes=2)
+
+    assert reconcile_collection(db, 'quizzes') == (2, 1)
+    quiz = db.quizzes.find_one({'_id': quiz_id})
+    assert (quiz['attempt_count'], quiz['submission_count']) == (2, 1)
+    assert quiz['last_activity_at'] == start + timedelta(minutes=8)
+    assert db.quizzes.find_one({'_id': empty_quiz_id})['attempt_count'] == 0
+
+
+def test_reconciliation_skips_counters_that_moved_after_they_were_read(db):
+    game_id = db.mini_games.insert_one({'play_count': 9}).inserted_id
+    db.minigame_plays.insert_one({'minigame_id': str(game_id), 'student_id': 's1', 'achieved_at': datetime(2024, 1, 1)})
+
+    original = db.mini_games.bulk_write
+
+    def bulk_write_after_a_play(requests, **kwargs):
+        # A route records a play between the read and the repair
+        db.minigame_plays.insert_one({'minigame_id': str(game_id), 'student_id': 's2', 'achieved_at': datetime(2024, 1, 2)})
+        db.mini_games.update_one({'_id': game_id}, {'$inc': {'play_count': 1}})
+        return original(requests, **kwargs)
+
+    db.mini_games.bulk_write = bulk_write_after_a_play
+    assert reconcile_collection(db, 'mini_games') == (1, 0)
+    assert db.mini_games.find_one({'_id': game_id})['play_count'] == 10
+
+    db.mini_games.bulk_write = original
+    assert reconcile_collection(db, 'mini_games') == (1, 1)
+    assert db.mini_games.find_one({'_id': game_id})['play_count'] == 2
+
+
+def test_cli_accepts_no_collections_and_rejects_unknown_ones():
+    assert parse_args([]).collections == []
+    assert parse_args(['quizzes', '--dry-run']).dry_run is True
+    with pytest.raises(SystemExit):
+        parse_args(['quiz'])
@@ -0,0 +1,51 @@
+"""
+COMP5241 Group 10 - Short Answer Clustering Tests
+Unit tests for TF-IDF vectors and threshold clustering of answers.
+"""
+import random
+import time
+
+import numpy as np
+
+from app.modules.learning_activities.answer_clusters import cluster_texts, tfidf_matrix, tokenize
+
+BASES = [
+    'photosynthesis converts light energy into chemical energy stored in glucose',
+    'the mitochondria is the powerhouse of the cell and produces atp',
+    '光合作用把光能转化为化学能',
+]
+
+
+def test_tokenize_mixes_word_ngrams_and_cjk_bigrams():
+    assert tokenize('Light energy!') == ['light', 'energy', 'light energy']
+    assert tokenize('光合作用') == ['光合', '合作', '作用']
+
+
+def test_tfidf_rows_are_unit_length():
+    matrix = tfidf_matrix(BASES + [''])
+    norms = np.linalg.norm(matrix, axis=1)
+    assert np.allclose(norms[:3], 1.0, atol=1e-5)
+    assert norms[3] == 0
+
+
+def test_near_identical_answers_share_a_cluster():
+    texts = [BASES[0], BASES[0] + ' in plants', BASES[1], 'The mitochondria is the powerhouse of the cell, producing ATP',
+             BASES[2], BASES[2] + '。', 'something entirely different']
+    clusters = cluster_texts(texts, threshold=0.5)
+    groups = {frozenset(cluster) for cluster in clusters}
+    assert frozenset({0, 1}) in groups
+    assert frozenset({2, 3}) in groups
+    assert frozenset({4, 5}) in groups
+    assert frozenset({6}) in groups
+    assert sorted(index for cluster in clusters for index in cluster) == list(range(len(texts)))
+
+
+def test_two_thousand_answers_cluster_in_seconds():
+    rng = random.Random(5)
+    noise = [f'word{i}' for i in range(3000)]
+    texts = [rng.choice(BASES) + ' ' + rng.choice(noise) if i % 2 else ' '.join(rng.choices(noise, k=12))
+             for i in range(2000)]
+    start = time.perf_counter()
+    clusters = cluster_texts(texts)
+    assert time.perf_counter() - start < 5
+    assert len(clusters[0]) > 200
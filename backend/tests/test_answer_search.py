@@ -0,0 +1,29 @@
+"""
+COMP5241 Group 10 - Answer Search Tests
+Unit tests for search terms, query parsing and highlighting.
+"""
+import pytest
+
+from app.modules.learning_activities.answer_search import highlight, parse_query, search_field
+
+
+def test_search_field_folds_lemmatizes_and_splits_cjk():
+    assert search_field('Plants use CHLOROPHYLL, mostly!') == 'plant use chlorophyll mostly'
+    assert search_field("don't over-water") == 'don t over water'
+    assert search_field('光合作用 needs light') == '光合 合作 作用 need light'
+
+
+def test_query_parts_become_optional_required_and_excluded_terms():
+    query = parse_query('plants "carbon dioxide" -glucose 光合')
+    assert query.search == '"carbon dioxide" "光合" plant -glucose'
+    assert query.words == {'plant', 'carbon', 'dioxide'}
+    assert query.cjk == ['光合']
+
+    with pytest.raises(ValueError):
+        parse_query('?! -only')
+
+
+def test_highlight_offsets_point_into_the_original_text():
+    text = 'Ｐlants absorb Carbon-dioxide; 光合作用 makes plants grow.'
+    spans = highlight(text, parse_query('plant "carbon dioxide" 光合'))
+    assert [text[start:end] for start, end in spans] == ['Ｐlants', 'Carbon', 'dioxide', '光合', 'plants']
@@ -0,0 +1,129 @@
+"""
+COMP5241 Group 10 - Cascade Delete Job Tests
+Delete jobs remove every dependent in batches, report progress and resume after a failure.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.modules.learning_activities import cascade_delete
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient()['comp5241_g10']
+
+
+def _activity_graph(db, course_id='C1'):
+    """A generic activity with a quiz record, plus a word cloud and a short answer question"""
+    activity_id = db.learning_activities.insert_one({'course_id': course_id, 'created_by': 'T1'}).inserted_id
+    quiz_id = db.quizzes.insert_one({'activity_id': activity_id, 'course_id': course_id}).inserted_id
+    db.quiz_attempts.insert_many([{'quiz_id': str(quiz_id), 'student_id': f'S{i}'} for i in range(7)])
+    db.activity_progress.insert_many([{'activity_id': str(activity_id), 'student_id': f'S{i}'} for i in range(3)])
+    db.wordclouds.insert_one({'activity_id': activity_id})
+    db.scheduled_transitions.insert_one({'_id': f'learning_activities:{activity_id}:end', 'document_id': activity_id})
+
+    wordcloud_id = db.word_clouds.insert_one({'course_id': course_id, 'created_by': 'T1'}).inserted_id
+    db.wordcloud_submissions.insert_many([{'wordcloud_id': str(wordcloud_id), 'word': 'w'} for _ in range(4)])
+    db.wordcloud_word_counts.insert_one({'wordcloud_id': str(wordcloud_id), 'word': 'w', 'count': 4})
+    db.wordcloud_sketches.insert_one({'wordcloud_id': str(wordcloud_id), 'worker_id': 'w1'})
+
+    question_id = db.short_answer_questions.insert_one({'course_id': course_id, 'created_by': 'T1'}).inserted_id
+    db.shortanswer_submissions.insert_one({'question_id': str(question_id), 'submitted_by': 'S1'})
+    db.shortanswer_stats.insert_one({'_id': str(question_id)})
+    return activity_id, wordcloud_id, question_id
+
+
+def test_job_deletes_every_dependent_and_reports_counts(db, monkeypatch):
+    monkeypatch.setattr(cascade_delete, 'BATCH_SIZE', 3)
+    activity_id, _, question_id = _activity_graph(db)
+    other_id, _, _ = _activity_graph(db, course_id='C2')
+    db.course_progress.insert_one({'course_id': 'C1', 'student_id': 'S1'})
+
+    activity = db.learning_activities.find_one({'_id': activity_id})
+    job_id = cascade_delete.enqueue(db, 'activity', activity, 'T1')
+    assert db.learning_activities.find_one({'_id': activity_id})['status'] == 'deleting'
+    assert cascade_delete.run_next(db)
+    assert not cascade_delete.run_next(db)
+
+    job = cascade_delete.progress(db.delete_jobs.find_one({'_id': job_id}))
+    assert job['status'] == 'done'
+    assert job['deleted'] == {'learning_activities': 1, 'quizzes': 1, 'quiz_attempts': 7,
+                              'activity_progress': 3, 'wordclouds': 1, 'scheduled_transitions': 1}
+    assert db.quiz_attempts.count_documents({}) == 7  # the other course's graph is untouched
+    assert db.scheduled_transitions.count_documents({}) == 1
+    assert db.course_progress.count_documents({}) == 0
+
+    question = db.short_answer_questions.find_one({'_id': question_id})
+    cascade_delete.enqueue(db, 'shortanswer', question, 'T1')
+    cascade_delete.run_next(db)
+    assert db.shortanswer_submissions.count_documents({'question_id': str(question_id)}) == 0
+    assert db.shortanswer_stats.count_documents({'_id': str(question_id)}) == 0
+    assert db.learning_activities.count_documents({'_id': other_id}) == 1
+
+
+def test_interrupted_job_resumes_after_lease_expires(db, monkeypatch):
+    monkeypatch.setattr(cascade_delete, 'BATCH_SIZE', 2)
+    _, wordcloud_id, _ = _activity_graph(db)
+    job_id = cascade_delete.enqueue(db, 'wordcloud', db.word_clouds.find_one({'_id': wordcloud_id}), 'T1')
+
+    collection = type(db.wordcloud_submissions)
+    original = collection.delete_many
+    calls = []
+
+    def crash_after_first_batch(self, query, *args, **kwargs):
+        calls.append(self.name)
+        if len(calls) > 1:
+            raise RuntimeError('worker died')
+        return original(self, query, *args, **kwargs)
+    monkeypatch.setattr(collection, 'delete_many', crash_after_first_batch)
+    cascade_delete.run_next(db)
+    monkeypatch.setattr(collection, 'delete_many', original)
+
+    job = db.delete_jobs.find_one({'_id': job_id})
+    assert (job['status'], job['deleted']) == ('running', {'wordcloud_submissions': 2})
+    # Another worker only takes it over once the lease has run out
+    assert cascade_delete.claim_job(db) is None
+    resumed = cascade_delete.claim_job(db, now=datetime.utcnow() + timedelta(seconds=cascade_delete.LEASE_SECONDS + 1))
+    cascade_delete.run_job(db, resumed)
+
+    job = db.delete_jobs.find_one({'_id': job_id})
+    assert (job['status'], job['attempts']) == ('done', 2)
+    assert job['deleted'] == {'wordcloud_submissions': 4, 'wordcloud_word_counts': 1,
+                              'wordcloud_sketches': 1, 'word_clouds': 1}
+    assert db.word_clouds.count_documents({}) == 0
+
+
+def test_job_fails_after_max_attempts(db, monkeypatch):
+    _, wordcloud_id, _ = _activity_graph(db)
+    job_id = cascade_delete.enqueue(db, 'wordcloud', db.word_clouds.find_one({'_id': wordcloud_id}), 'T1')
+
+    def always_fail(db, job):
+        raise RuntimeError('disk full')
+    monkeypatch.setattr(cascade_delete, 'run_job', always_fail)
+
+    for attempt in range(1, cascade_delete.MAX_ATTEMPTS + 1):
+        assert cascade_delete.run_next(db)
+        job = db.delete_jobs.find_one({'_id': job_id})
+        assert job['attempts'] == attempt
+        # Let the lease run out so the next claim retries
+        if job['status'] == 'running':
+            db.delete_jobs.update_one({'_id': job_id}, {'$set': {'lease_until': datetime.utcnow() - timedelta(seconds=1)}})
+
+    assert (job['status'], job['error'], job['lease_until']) == ('failed', 'disk full', None)
+    assert not cascade_delete.run_next(db)
+    assert cascade_delete.progress(job)['status'] == 'failed'
+
+
+def test_job_abandoned_on_its_last_attempt_is_failed(db):
+    _, wordcloud_id, _ = _activity_graph(db)
+    job_id = cascade_delete.enqueue(db, 'wordcloud', db.word_clouds.find_one({'_id': wordcloud_id}), 'T1')
+    # The worker holding the last attempt died without recording anything
+    db.delete_jobs.update_one({'_id': job_id}, {'$set': {
+        'status': 'running', 'attempts': cascade_delete.MAX_ATTEMPTS, 'lease_until': datetime.utcnow()
+    }})
+
+    later = datetime.utcnow() + timedelta(seconds=1)
+    assert cascade_delete.claim_job(db, now=later) is None
+    assert db.delete_jobs.find_one({'_id': job_id})['status'] == 'failed'
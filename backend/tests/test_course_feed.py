@@ -0,0 +1,131 @@
+"""
+COMP5241 Group 10 - Course Feed Tests
+Keyset cursors, the shape of the $unionWith feed aggregation, and each branch run on seeded data.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.modules.learning_activities.feed_routes import (
+    FEED_SOURCES, NO_DUE_DATE, _branch, decode_cursor, encode_cursor, feed_pipeline, format_item
+)
+from tests.mongomock_lookup import aggregate
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient()['comp5241_g10']
+
+
+def _seed_quizzes(db, now):
+    """Seven active quizzes in C1 whose dates tie in threes, plus ones the feed must leave out"""
+    created = [now - timedelta(days=day) for day in (1, 1, 1, 2, 3, 3, 3)]
+    due = [now + timedelta(days=day) for day in (5, 5, 5, 6)] + [None, None, now - timedelta(days=1)]
+    quiz_ids = [db.quizzes.insert_one({
+        'course_id': 'C1', 'is_active': True, 'title': f'Quiz {i}', 'created_by': 'T1',
+        'created_at': created_at, 'expires_at': expires_at
+    }).inserted_id for i, (created_at, expires_at) in enumerate(zip(created, due))]
+    db.quizzes.insert_one({'course_id': 'C1', 'is_active': False, 'title': 'Draft', 'created_at': now})
+    db.quizzes.insert_one({'course_id': 'C2', 'is_active': True, 'title': 'Other course', 'created_at': now})
+
+    db.quiz_attempts.insert_many([
+        {'quiz_id': str(quiz_ids[0]), 'student_id': 'S1', 'is_submitted': True},
+        {'quiz_id': str(quiz_ids[1]), 'student_id': 'S1', 'is_submitted': False},
+        {'quiz_id': str(quiz_ids[2]), 'student_id': 'S2', 'is_submitted': True},
+    ])
+    return quiz_ids
+
+
+def _walk(db, sort, limit, now):
+    """Every page of the quiz branch, following next cursors as course_feed does"""
+    pages, after = [], None
+    while True:
+        rows = aggregate(db.quizzes, _branch('quiz', 'C1', 'S1', sort, after, limit, now))
+        pages.append(rows[:limit])
+        if len(rows) <= limit:
+            return pages
+        after = (rows[limit - 1]['sort_at'], rows[limit - 1]['_id'])
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    activity_id = ObjectId()
+    sort_at = datetime(2024, 5, 1, 12, 30)
+    assert decode_cursor(encode_cursor(sort_at, activity_id)) == (sort_at, activity_id)
+    for bad in ['not-a-cursor', encode_cursor(sort_at, activity_id)[:-4]]:
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_pipeline_unions_every_collection_and_pages_each_branch():
+    after = (datetime(2024, 5, 1), ObjectId())
+    pipeline = feed_pipeline('C1', 'student1', 'due', after, limit=10, now=datetime(2024, 6, 1))
+
+    unions = [stage['$unionWith'] for stage in pipeline if '$unionWith' in stage]
+    assert sorted(union['coll'] for union in unions) == sorted(
+        source['collection'] for activity_type, source in FEED_SOURCES.items() if activity_type != 'poll'
+    )
+    branches = [pipeline[:pipeline.index(next(s for s in pipeline if '$unionWith' in s))]]
+    branches += [union['pipeline'] for union in unions]
+    for branch in branches:
+        assert branch[0] == {'$match': {'course_id': 'C1', 'is_active': True}}
+        assert branch[1]['$project']['sort_at'] == {'$ifNull': ['$expires_at', NO_DUE_DATE]}
+        # Cursor and limit come before the per-user lookup
+        stages = [next(iter(stage)) for stage in branch]
+        assert stages.index('$limit') < stages.index('$lookup')
+        assert branch[2]['$match']['$or'][0] == {'sort_at': {'$gt': after[0]}}
+    assert pipeline[-2:] == [{'$sort': {'sort_at': 1, '_id': 1}}, {'$limit': 11}]
+
+
+def test_format_item_has_one_shape_for_every_type():
+    row = {'_id': ObjectId(), 'activity_type': 'quiz', 'title': 'Quiz 1', 'created_by': 't1',
+           'created_at': datetime(2024, 5, 1), 'due_at': None, 'sort_at': datetime(2024, 5, 1),
+           'attempted': True, 'submitted': False, 'expired': False}
+    item = format_item(row)
+    assert item['status'] == {'submitted': False, 'attempted': True, 'expired': False}
+    assert item['due_at'] is None and item['description'] == ''
+
+
+@pytest.mark.parametrize('sort', ['created', 'due'])
+def test_branch_pages_through_ties_without_skipping_or_repeating(db, sort):
+    now = datetime(2024, 6, 1)
+    quiz_ids = _seed_quizzes(db, now)
+    quizzes = {quiz['_id']: quiz for quiz in db.quizzes.find({'_id': {'$in': quiz_ids}})}
+    if sort == 'created':
+        expected = sorted(quiz_ids, key=lambda quiz_id: (quizzes[quiz_id]['created_at'], quiz_id), reverse=True)
+    else:
+        expected = sorted(quiz_ids, key=lambda quiz_id: (quizzes[quiz_id]['expires_at'] or NO_DUE_DATE, quiz_id))
+
+    pages = _walk(db, sort, 2, now)
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [row['_id'] for page in pages for row in page] == expected
+
+
+def test_branch_rows_carry_the_users_own_status(db):
+    now = datetime(2024, 6, 1)
+    quiz_ids = _seed_quizzes(db, now)
+    rows = {row['_id']: row for row in aggregate(db.quizzes, _branch('quiz', 'C1', 'S1', 'created', None, 20, now))}
+
+    assert set(rows) == set(quiz_ids)
+    status = {quiz_id: (row['attempted'], row['submitted'], row['expired']) for quiz_id, row in rows.items()}
+    assert status[quiz_ids[0]] == (True, True, False)
+    assert status[quiz_ids[1]] == (True, False, False)
+    assert status[quiz_ids[2]] == (False, False, False)  # only another student's attempt
+    assert status[quiz_ids[6]] == (False, False, True)
+    item = format_item(rows[quiz_ids[4]])
+    assert (item['activity_type'], item['title'], item['due_at']) == ('quiz', 'Quiz 4', None)
+
+
+def test_every_branch_reads_its_own_collection(db):
+    now = datetime(2024, 6, 1)
+    for activity_type, source in FEED_SOURCES.items():
+        activity_id = db[source['collection']].insert_one({
+            'course_id': 'C1', 'is_active': True, 'created_at': now, 'created_by': 'T1',
+            'title': f'{activity_type} title', 'question': f'{activity_type} title'
+        }).inserted_id
+        db[source['records']].insert_one({source['activity_field']: str(activity_id), source['user_field']: 'S1'})
+
+        [row] = aggregate(db[source['collection']], _branch(activity_type, 'C1', 'S1', 'created', None, 5, now))
+        assert (row['_id'], row['activity_type'], row['title']) == (activity_id, activity_type, f'{activity_type} title')
+        assert row['attempted'] and row['submitted']
@@ -0,0 +1,127 @@
+"""
+COMP5241 Group 10 - Course Progress Rollup Tests
+Rollups follow progress, quiz and short answer writes incrementally and match a rebuild from the sources.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.modules.learning_activities import course_progress, services
+from app.modules.learning_activities.progress_heartbeats import HeartbeatCoalescer
+from app.modules.learning_activities.quizzes_routes import _close_attempt
+from app.modules.learning_activities.services import LearningActivityService
+from app.modules.learning_activities.shortanswers_routes import _apply_grades, _upsert_submission
+
+
+@pytest.fixture
+def client(monkeypatch):
+    mongomock = pytest.importorskip('mongomock')
+    client = mongomock.MongoClient()
+    db = client['comp5241_g10']
+    db.activity_progress.create_index([('activity_id', 1), ('student_id', 1)], unique=True)
+    db.shortanswer_submissions.create_index([('question_id', 1), ('submitted_by', 1)], unique=True)
+    db.course_progress.create_index([('student_id', 1), ('course_id', 1)], unique=True)
+
+    @contextmanager
+    def connection():
+        yield client
+    monkeypatch.setattr(services, 'get_db_connection', connection)
+    monkeypatch.setattr(services, 'heartbeat_coalescer', HeartbeatCoalescer())
+    return client
+
+
+def _course(db, activities=2, quizzes=1, questions=1):
+    """A course with generic activities, quizzes and short answer questions; returns their IDs"""
+    db.course_enrollments.insert_one({'course_id': 'C1', 'student_id': 'S1', 'progress_percentage': 0})
+    return (
+        [str(db.learning_activities.insert_one({'course_id': 'C1', 'is_active': True}).inserted_id) for _ in range(activities)],
+        [db.quizzes.insert_one({'course_id': 'C1', 'is_active': True}).inserted_id for _ in range(quizzes)],
+        [{'_id': db.short_answer_questions.insert_one({'course_id': 'C1', 'is_active': True}).inserted_id,
+          'course_id': 'C1'} for _ in range(questions)]
+    )
+
+
+def _without_ids(rollup):
+    return {field: value for field, value in rollup.items() if field not in ('_id', 'updated_at')}
+
+
+def test_writes_update_rollup_and_enrollment(client):
+    db = client['comp5241_g10']
+    activity_ids, quiz_ids, questions = _course(db)
+    start = datetime(2024, 1, 1)
+
+    LearningActivityService.record_activity_progress(activity_ids[0], 'S1', 40, 30)
+    LearningActivityService.record_activity_progress(activity_ids[0], 'S1', 100, 30)
+    LearningActivityService.record_activity_progress(activity_ids[0], 'S1', 100, 10)  # counted once
+
+    attempt = {'_id': db.quiz_attempts.insert_one({'quiz_id': str(quiz_ids[0]), 'student_id': 'S1',
+                                                   'is_submitted': False}).inserted_id,
+               'quiz_id': str(quiz_ids[0]), 'student_id': 'S1'}
+    _close_attempt(db, attempt, {'completed_at': start, 'score': 90.0})
+
+    _upsert_submission(db, questions[0], 'S1', 'photosynthesis', start + timedelta(minutes=1))
+    _apply_grades(db, str(questions[0]['_id']), [{'student_id': 'S1', 'score': 70}])
+
+    rollup = db.course_progress.find_one({'course_id': 'C1', 'student_id': 'S1'})
+    summary = course_progress.summarize(rollup)
+    assert summary['completed'] == {'activity': 1, 'quiz': 1, 'shortanswer': 1}
+    assert (summary['time_spent'], summary['average_score'], summary['progress_percentage']) == (70, 80.0, 75)
+    assert db.course_enrollments.find_one({'student_id': 'S1'})['progress_percentage'] == 75
+
+    incremental = _without_ids(rollup)
+    db.course_progress.delete_many({})
+    rebuilt = course_progress.rebuild(db, 'C1', 'S1')
+    assert _without_ids(rebuilt) == incremental
+
+
+def test_heartbeat_flush_rolls_up_time_and_completion(client):
+    db = client['comp5241_g10']
+    activity_ids, _, _ = _course(db, quizzes=0, questions=0)
+    coalescer = HeartbeatCoalescer()
+    coalescer._ensure_started = lambda: None
+    for progress in (20, 60, 100):
+        coalescer.add(activity_ids[1], 'S1', progress, 15)
+    coalescer.flush(db)
+
+    rollup = db.course_progress.find_one({'course_id': 'C1', 'student_id': 'S1'})
+    assert (rollup['completed']['activity'], rollup['time_spent'], rollup['progress_percentage']) == (1, 45, 50)
+    assert db.activity_progress.find_one({'activity_id': activity_ids[1]})['course_id'] == 'C1'
+
+
+def test_read_builds_missing_rollups_and_follows_course_size(client):
+    db = client['comp5241_g10']
+    activity_ids, _, _ = _course(db, quizzes=0, questions=0)
+    # A record written before rollups existed: no course_id and never counted
+    db.activity_progress.insert_one({'activity_id': activity_ids[0], 'student_id': 'S1', 'progress_percentage': 100,
+                                     'time_spent': 5, 'is_completed': True, 'last_accessed': datetime(2024, 1, 1)})
+
+    rollup, = course_progress.read(db, 'S1', ['C1'])
+    assert (rollup['completed']['activity'], rollup['progress_percentage']) == (1, 50)
+    assert [p['activity_id'] for p in LearningActivityService.get_student_progress('S1', 'C1')] == [activity_ids[0]]
+
+    # Completing it again is not counted twice; a new activity lowers the percentage on the next read
+    LearningActivityService.record_activity_progress(activity_ids[0], 'S1', 100, 5)
+    db.learning_activities.insert_one({'course_id': 'C1', 'is_active': True})
+    rollup, = course_progress.read(db, 'S1', ['C1'])
+    assert (rollup['completed']['activity'], rollup['progress_percentage']) == (1, 33)
+    assert db.course_enrollments.find_one({'student_id': 'S1'})['progress_percentage'] == 33
+
+
+def test_a_quiz_submitted_twice_counts_as_one_completion(client):
+    db = client['comp5241_g10']
+    _, quiz_ids, _ = _course(db, activities=0, questions=0)
+    start = datetime(2024, 1, 1)
+    # Two attempts that both got started, e.g. by concurrent requests
+    for minutes, score in ((0, 60.0), (5, 80.0)):
+        attempt = {'_id': db.quiz_attempts.insert_one({'quiz_id': str(quiz_ids[0]), 'student_id': 'S1',
+                                                       'is_submitted': False}).inserted_id,
+                   'quiz_id': str(quiz_ids[0]), 'student_id': 'S1'}
+        _close_attempt(db, attempt, {'completed_at': start + timedelta(minutes=minutes), 'score': score})
+
+    rollup = db.course_progress.find_one({'course_id': 'C1', 'student_id': 'S1'})
+    assert (rollup['completed']['quiz'], course_progress.summarize(rollup)['progress_percentage']) == (1, 100)
+
+    incremental = _without_ids(rollup)
+    db.course_progress.delete_many({})
+    assert _without_ids(course_progress.rebuild(db, 'C1', 'S1')) == incremental
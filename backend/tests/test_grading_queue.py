@@ -0,0 +1,126 @@
+"""
+COMP5241 Group 10 - Grading Queue Tests
+Shape of the grading queue aggregation, its rows, and each branch run on seeded data.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.modules.learning_activities.grading_queue import QUEUE_SOURCES, _branch, format_row, queue_pipeline
+from tests.mongomock_lookup import aggregate
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient()['comp5241_g10']
+
+
+def _seed_questions(db, start):
+    """Two of T1's questions with ungraded answers whose times tie across questions, plus ones to leave out"""
+    question_ids = [db.short_answer_questions.insert_one({
+        'course_id': 'C1', 'created_by': 'T1', 'question': f'Question {i}'
+    }).inserted_id for i in range(2)]
+    deleting_id = db.short_answer_questions.insert_one({'course_id': 'C1', 'created_by': 'T1', 'deleting': True}).inserted_id
+    other_teacher_id = db.short_answer_questions.insert_one({'course_id': 'C1', 'created_by': 'T2'}).inserted_id
+
+    for i in range(5):
+        for question_id in question_ids:
+            db.shortanswer_submissions.insert_one({
+                'question_id': str(question_id), 'submitted_by': f'S{i}', 'is_graded': False,
+                'submitted_at': start + timedelta(minutes=i // 2)  # pairs of equal times
+            })
+    db.shortanswer_submissions.insert_many([
+        {'question_id': str(question_ids[0]), 'submitted_by': 'S9', 'is_graded': True, 'submitted_at': start},
+        {'question_id': str(deleting_id), 'submitted_by': 'S1', 'is_graded': False, 'submitted_at': start},
+        {'question_id': str(other_teacher_id), 'submitted_by': 'S1', 'is_graded': False, 'submitted_at': start},
+    ])
+    return question_ids
+
+
+def _walk(db, limit):
+    """Every page of the short answer branch, merged and cut as queue_pipeline does, following next cursors"""
+    pages, after = [], None
+    while True:
+        pipeline = _branch(QUEUE_SOURCES['shortanswer'], 'T1', None, after, limit)
+        rows = aggregate(db.short_answer_questions, pipeline + queue_pipeline('T1', limit=limit)[-2:])
+        pages.append(rows[:limit])
+        if len(rows) <= limit:
+            return pages
+        after = (rows[limit - 1]['submitted_at'], rows[limit - 1]['_id'])
+
+
+def _branches(pipeline):
+    first_union = next(i for i, stage in enumerate(pipeline) if '$unionWith' in stage)
+    unions = [stage['$unionWith'] for stage in pipeline if '$unionWith' in stage]
+    return [pipeline[:first_union]] + [union['pipeline'] for union in unions], unions
+
+
+def test_pipeline_pages_each_source_inside_its_lookup():
+    after = (datetime(2024, 5, 1), ObjectId())
+    pipeline = queue_pipeline('T1', 'C1', after, limit=10)
+    branches, unions = _branches(pipeline)
+
+    assert [union['coll'] for union in unions] == ['short_answer_questions']
+    assert pipeline[-2:] == [{'$sort': {'submitted_at': 1, '_id': 1}}, {'$limit': 11}]
+    for branch, source in zip(branches, QUEUE_SOURCES.values()):
+        assert branch[0]['$match'] == {'created_by': 'T1', 'deleting': {'$ne': True}, 'course_id': 'C1'}
+        lookup = branch[1]['$lookup']
+        assert lookup['from'] == source['submissions']
+        ungraded, cursor, sort, limit, _ = lookup['pipeline']
+        assert all(ungraded['$match'][field] == value for field, value in source['ungraded'].items())
+        assert cursor['$match']['$or'][1] == {'submitted_at': after[0], '_id': {'$gt': after[1]}}
+        assert (sort, limit) == ({'$sort': {'submitted_at': 1, '_id': 1}}, {'$limit': 11})
+
+
+def test_first_page_has_no_cursor_and_any_course():
+    branches, _ = _branches(queue_pipeline('T1'))
+    for branch in branches:
+        assert 'course_id' not in branch[0]['$match']
+        assert [next(iter(stage)) for stage in branch[1]['$lookup']['pipeline']] == ['$match', '$sort', '$limit', '$project']
+
+
+def test_format_row_reports_waiting_time():
+    row = {'_id': ObjectId(), 'student_id': 'S1', 'activity_id': 'A1', 'activity_title': 'Essay',
+           'activity_type': 'shortanswer', 'course_id': 'C1', 'submitted_at': datetime(2024, 5, 1, 12)}
+    formatted = format_row(row, now=datetime(2024, 5, 1, 13))
+    assert formatted['waiting_seconds'] == 3600
+    assert formatted['submission_id'] == str(row['_id'])
+    assert formatted['submitted_at'] == '2024-05-01T12:00:00'
+
+
+def test_branch_pages_oldest_first_through_ties_without_skipping_or_repeating(db):
+    start = datetime(2024, 5, 1, 9)
+    question_ids = _seed_questions(db, start)
+    ungraded = db.shortanswer_submissions.find({'question_id': {'$in': [str(qid) for qid in question_ids]},
+                                                'is_graded': False})
+    expected = sorted((sub['submitted_at'], sub['_id']) for sub in ungraded)
+
+    pages = _walk(db, 3)
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert [(row['submitted_at'], row['_id']) for page in pages for row in page] == expected
+
+
+def test_branch_rows_name_the_activity_and_student(db):
+    start = datetime(2024, 5, 1, 9)
+    question_ids = _seed_questions(db, start)
+    rows = aggregate(db.short_answer_questions, _branch(QUEUE_SOURCES['shortanswer'], 'T1', 'C1', None, 25))
+
+    assert len(rows) == 10
+    assert {row['activity_id'] for row in rows} == {str(question_id) for question_id in question_ids}
+    row = format_row(min(rows, key=lambda row: (row['submitted_at'], row['_id'])), now=start + timedelta(hours=1))
+    assert (row['activity_type'], row['activity_title'], row['student_id']) == ('shortanswer', 'Question 0', 'S0')
+    assert row['waiting_seconds'] == 3600
+    assert aggregate(db.short_answer_questions, _branch(QUEUE_SOURCES['shortanswer'], 'T1', 'C2', None, 25)) == []
+
+
+def test_activity_branch_reads_submitted_activity_work(db):
+    activity_id = db.learning_activities.insert_one({'course_id': 'C1', 'created_by': 'T1', 'title': 'Essay',
+                                                     'activity_type': 'reflection'}).inserted_id
+    db.activity_submissions.insert_many([
+        {'activity_id': str(activity_id), 'student_id': 'S1', 'status': 'submitted', 'submitted_at': datetime(2024, 5, 1)},
+        {'activity_id': str(activity_id), 'student_id': 'S2', 'status': 'graded', 'submitted_at': datetime(2024, 5, 1)},
+    ])
+    [row] = aggregate(db.learning_activities, _branch(QUEUE_SOURCES['activity'], 'T1', None, None, 25))
+    assert (row['student_id'], row['activity_title'], row['activity_type']) == ('S1', 'Essay', 'reflection')
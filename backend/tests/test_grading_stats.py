@@ -0,0 +1,91 @@
+"""
+COMP5241 Group 10 - Grading Statistics Tests
+Per-question statistics stay equal to a full recomputation as answers are submitted and graded.
+"""
+from datetime import datetime
+
+import pytest
+
+from app.modules.learning_activities import grading_stats
+from app.modules.learning_activities.shortanswers_routes import _apply_grades, _submission_timeline, _upsert_submission
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient()['comp5241_g10']
+    db.shortanswer_submissions.create_index([('question_id', 1), ('submitted_by', 1)], unique=True)
+    return db
+
+
+def _question(db):
+    question_id = db.short_answer_questions.insert_one({'course_id': 'C1'}).inserted_id
+    db.shortanswer_stats.insert_one(grading_stats.empty_stats(str(question_id)))
+    return {'_id': question_id, 'course_id': 'C1'}
+
+
+def _comparable(stats):
+    stats = {key: value for key, value in stats.items() if key != 'minmax_stale'}
+    stats['histogram'] = {bucket: count for bucket, count in stats['histogram'].items() if count}
+    return stats
+
+
+def test_incremental_stats_match_a_rebuild(db):
+    question = _question(db)
+    question_id = str(question['_id'])
+    for i in range(20):
+        _upsert_submission(db, question, f'student{i}', f'answer {i}', datetime.utcnow())
+
+    _apply_grades(db, question_id, [{'student_id': f'student{i}', 'score': i * 5} for i in range(15)])
+    _apply_grades(db, question_id, [{'student_id': 'student3', 'score': 90}])
+    # Resubmitting resets the grade and removes the score
+    _upsert_submission(db, question, 'student0', 'new answer', datetime.utcnow())
+
+    incremental = grading_stats.read_stats(db, question_id)
+    assert incremental['submission_count'] == 20
+    assert incremental['graded_count'] == 14
+    assert _comparable(incremental) == _comparable(grading_stats.rebuild_stats(db, question_id))
+
+
+def test_removing_an_extreme_refreshes_min_and_max_on_read(db):
+    question = _question(db)
+    question_id = str(question['_id'])
+    for i in range(3):
+        _upsert_submission(db, question, f'student{i}', 'answer', datetime.utcnow())
+    _apply_grades(db, question_id, [{'student_id': 'student0', 'score': 10}, {'student_id': 'student1', 'score': 60},
+                                    {'student_id': 'student2', 'score': 95}])
+
+    _apply_grades(db, question_id, [{'student_id': 'student2', 'score': 70}])
+    assert db.shortanswer_stats.find_one({'_id': question_id})['minmax_stale'] is True
+    summary = grading_stats.summarize(grading_stats.read_stats(db, question_id))
+    assert summary['highest_score'] == 70
+    assert summary['lowest_score'] == 10
+    assert summary['average_score'] == round((10 + 60 + 70) / 3, 1)
+    assert 'minmax_stale' not in db.shortanswer_stats.find_one({'_id': question_id})
+
+
+def test_first_score_sets_min_and_missing_stats_are_built(db):
+    question = _question(db)
+    question_id = str(question['_id'])
+    _upsert_submission(db, question, 'student0', 'answer', datetime.utcnow())
+    _apply_grades(db, question_id, [{'student_id': 'student0', 'score': 40}])
+    assert grading_stats.read_stats(db, question_id)['score_min'] == 40
+
+    db.shortanswer_stats.delete_many({})
+    summary = grading_stats.summarize(grading_stats.read_stats(db, question_id))
+    assert summary['graded_submissions'] == 1
+    assert summary['grading_progress'] == 100
+    assert summary['score_histogram'][4] == {'range': '40-49', 'count': 1}
+
+
+def test_submission_timeline_lists_newest_first(db):
+    question = _question(db)
+    question_id = str(question['_id'])
+    _upsert_submission(db, question, 'student1', 'first answer', datetime(2024, 5, 1, 9))
+    _upsert_submission(db, question, 'student2', 'a later longer answer', datetime(2024, 5, 1, 10))
+    _apply_grades(db, question_id, [{'student_id': 'student1', 'score': 80}])
+
+    assert _submission_timeline(db, question_id) == [
+        {'student_id': 'student2', 'submitted_at': '2024-05-01T10:00:00', 'is_graded': False, 'score': None, 'word_count': 4},
+        {'student_id': 'student1', 'submitted_at': '2024-05-01T09:00:00', 'is_graded': True, 'score': 80, 'word_count': 2}
+    ]
@@ -0,0 +1,63 @@
+"""
+COMP5241 Group 10 - JSON Provider Tests
+orjson responses handle Mongo and NumPy types and match Flask's default output,
+and response models read documents as they are.
+"""
+import json
+from datetime import datetime
+
+import numpy as np
+from bson import ObjectId
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import OrjsonProvider, dumps_bytes
+from app.modules.learning_activities.poll import PollSummary
+
+
+def _poll_document():
+    return {
+        '_id': ObjectId(), 'question': 'Best day?', 'options': [{'text': 'Mon', 'votes': 2}, {'text': 'Fri', 'votes': 5}],
+        'created_by': 'T1', 'is_active': True, 'created_at': datetime(2024, 5, 1, 12, 30, 0, 250000),
+        'expires_at': None, 'course_id': 'C1', 'voters': ['S1'], 'total_voters': 1
+    }
+
+
+def test_dumps_handles_datetimes_object_ids_and_numpy():
+    object_id = ObjectId()
+    payload = {'id': object_id, 'at': datetime(2024, 5, 1, 12), 'counts': np.array([1, 2]),
+               'mean': np.float64(1.5), 'tags': {'a'}}
+    assert json.loads(dumps_bytes(payload)) == {
+        'id': str(object_id), 'at': 'Wed, 01 May 2024 12:00:00 GMT', 'counts': [1, 2], 'mean': 1.5, 'tags': ['a']
+    }
+
+
+def test_documents_are_written_as_the_default_provider_writes_them():
+    document = {'title': 'T', '_id': 'x', 'created_at': datetime(2024, 5, 1, 12, 30), 'due': None,
+                'nested': {'b': 1, 'a': [datetime(2024, 1, 2)]}}
+    app = Flask(__name__)
+    assert dumps_bytes(document).decode() == DefaultJSONProvider(app).dumps(document, separators=(',', ':'))
+
+
+def test_response_model_reads_a_document_and_serializes_to_bytes():
+    document = _poll_document()
+    poll = PollSummary.model_validate(document)
+    body = poll.to_json()
+    assert isinstance(body, bytes)
+    data = json.loads(body)
+    assert data['id'] == str(document['_id'])
+    assert data['options'] == ['Mon', 'Fri']
+    assert data['created_at'] == document['created_at'].isoformat()
+    assert '_id' not in data and 'voters' not in data
+
+
+def test_jsonify_uses_the_provider_for_models_and_lists():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    document = _poll_document()
+    with app.app_context():
+        single = jsonify(PollSummary.model_validate(document))
+        many = jsonify([PollSummary.model_validate(document)])
+    assert single.mimetype == 'application/json'
+    assert single.get_json()['id'] == str(document['_id'])
+    assert many.get_json()[0]['poll_type'] == 'single'
@@ -0,0 +1,95 @@
+"""
+COMP5241 Group 10 - Leaderboard Cache Tests
+The indexable skiplist against a sorted list, and boards kept in step with minigame_best_scores.
+"""
+import bisect
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.modules.learning_activities.leaderboard_cache import IndexableSkiplist, LeaderboardCache
+from app.modules.learning_activities.minigames_routes import _record_play
+
+
+def test_skiplist_matches_a_sorted_list():
+    rng = random.Random(7)
+    skiplist, reference = IndexableSkiplist(seed=1), []
+    for _ in range(3000):
+        key = (rng.randint(0, 200), rng.random())
+        if reference and rng.random() < 0.4:
+            key = reference.pop(rng.randrange(len(reference)))
+            skiplist.remove(key)
+        else:
+            bisect.insort(reference, key)
+            skiplist.insert(key)
+    assert len(skiplist) == len(reference)
+    assert skiplist.slice(0, len(reference) + 5) == reference
+    for probe in [(0,), (50, 0.5), (200, 1.0), (300,)]:
+        assert skiplist.count_less(probe) == bisect.bisect_left(reference, probe)
+    assert skiplist.slice(100, 7) == reference[100:107]
+    with pytest.raises(KeyError):
+        skiplist.remove((-1, 0.0))
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient()['comp5241_g10']
+    db.minigame_best_scores.create_index([('minigame_id', 1), ('student_id', 1)], unique=True)
+    return db
+
+
+def test_board_ranks_pages_and_windows(db):
+    game = {'_id': db.mini_games.insert_one({}).inserted_id}
+    game_id = str(game['_id'])
+    start = datetime(2024, 1, 1)
+    for i in range(30):
+        _record_play(db, game, f'student{i}', 100 - i // 2, None, start + timedelta(seconds=i))
+
+    board = LeaderboardCache().board(db, game_id)
+    assert len(board) == 30
+    assert [(rank, entry['student_id']) for rank, entry in board.page(0, 4)] == [
+        (1, 'student0'), (1, 'student1'), (3, 'student2'), (3, 'student3')
+    ]
+    position = board.position('student20')
+    assert [entry['student_id'] for _, entry in board.page(position - 2, 5)] == [f'student{i}' for i in range(18, 23)]
+    assert board.rank(90, float('inf')) == 21
+
+
+def test_board_sees_other_workers_after_refresh(db):
+    game = {'_id': db.mini_games.insert_one({}).inserted_id}
+    game_id = str(game['_id'])
+    cache = LeaderboardCache()
+    _record_play(db, game, 'alice', 50, 10, datetime.utcnow())
+    board = cache.board(db, game_id)
+
+    # Written by "another worker": invisible until the refresh interval passes
+    _record_play(db, game, 'bob', 80, 10, datetime.utcnow())
+    assert cache.board(db, game_id).entry('bob') is None
+    board.checked_at -= 60
+    assert cache.board(db, game_id).position('bob') == 0
+
+    # A better score recorded by this process moves the entry immediately
+    _record_play(db, game, 'alice', 90, 5, datetime.utcnow())
+    cache.record(game_id, db.minigame_best_scores.find_one({'student_id': 'alice'}, cache.FIELDS))
+    assert board.position('alice') == 0 and len(board) == 2
+
+
+def test_periodic_full_reload_picks_up_late_writes(db):
+    game = {'_id': db.mini_games.insert_one({}).inserted_id}
+    game_id = str(game['_id'])
+    cache = LeaderboardCache()
+    now = datetime.utcnow()
+    _record_play(db, game, 'alice', 50, 10, now)
+    board = cache.board(db, game_id)
+
+    # Committed late, or by a worker whose clock is behind: older than the refresh overlap
+    _record_play(db, game, 'carol', 70, 10, now - timedelta(minutes=5))
+    board.checked_at -= 60
+    cache.board(db, game_id)
+    assert board.entry('carol') is None
+
+    board.checked_at -= 60
+    board.reloaded_at -= 60
+    assert cache.board(db, game_id).position('carol') == 0
@@ -0,0 +1,73 @@
+"""
+COMP5241 Group 10 - Mini-Game Score Storage Tests
+Plays are appended to minigame_plays; minigame_best_scores keeps one ranked entry per student.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.modules.learning_activities.minigames_routes import _better_than, _record_play, _time_key
+from database_connection.migrate_embedded_submissions import migrate_collection
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient()['comp5241_g10']
+    db.minigame_best_scores.create_index([('minigame_id', 1), ('student_id', 1)], unique=True)
+    return db
+
+
+def _rank(db, minigame_id, student_id):
+    best = db.minigame_best_scores.find_one({'minigame_id': minigame_id, 'student_id': student_id})
+    return db.minigame_best_scores.count_documents(
+        dict(_better_than(best['score'], best['time_key']), minigame_id=minigame_id)
+    ) + 1
+
+
+def test_best_score_only_improves(db):
+    game = {'_id': db.mini_games.insert_one({'course_id': 'C1'}).inserted_id, 'course_id': 'C1'}
+    game_id = str(game['_id'])
+    now = datetime.utcnow()
+
+    assert _record_play(db, game, 'alice', 50, None, now) is True
+    assert _record_play(db, game, 'alice', 40, 10, now) is False
+    assert _record_play(db, game, 'alice', 50, 30, now) is True  # timed beats untimed at equal score
+    assert _record_play(db, game, 'alice', 50, 35, now) is False
+    assert _record_play(db, game, 'alice', 70, 60, now) is True
+
+    assert db.minigame_plays.count_documents({'minigame_id': game_id}) == 5
+    best = db.minigame_best_scores.find_one({'student_id': 'alice'})
+    assert (best['score'], best['time_taken'], best['time_key']) == (70, 60, 60)
+
+
+def test_rank_counts_better_scores_with_time_tiebreak(db):
+    game = {'_id': db.mini_games.insert_one({'course_id': 'C1'}).inserted_id, 'course_id': 'C1'}
+    game_id = str(game['_id'])
+    now = datetime.utcnow()
+    for student, score, time_taken in [('a', 90, 20), ('b', 90, 15), ('c', 80, None), ('d', 80, 40), ('e', 90, 15)]:
+        _record_play(db, game, student, score, time_taken, now)
+
+    assert [_rank(db, game_id, student) for student in 'abcde'] == [3, 1, 5, 4, 1]
+    assert _time_key(None) > 10 ** 9
+
+
+def test_migration_moves_embedded_scores_and_builds_best_scores(db):
+    start = datetime.utcnow()
+    game_id = db.mini_games.insert_one({
+        'course_id': 'C1',
+        'scores': [
+            {'student_id': f'student{i % 3}', 'score': i * 10, 'time_taken': None if i % 2 else 5,
+             'achieved_at': start + timedelta(seconds=i)}
+            for i in range(7)
+        ]
+    }).inserted_id
+
+    assert migrate_collection(db, 'minigames', batch_size=3) == (1, 7)
+    assert 'scores' not in db.mini_games.find_one({'_id': game_id})
+    assert db.minigame_plays.count_documents({'minigame_id': str(game_id)}) == 7
+    best = {entry['student_id']: entry['score'] for entry in db.minigame_best_scores.find()}
+    assert best == {'student0': 60, 'student1': 40, 'student2': 50}
+
+    assert migrate_collection(db, 'minigames') == (0, 0)
+    assert db.minigame_best_scores.count_documents({}) == 3
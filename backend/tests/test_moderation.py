@@ -0,0 +1,84 @@
+"""
+COMP5241 Group 10 - Moderation Tests
+Unit tests for the Aho-Corasick blocklist matcher and per-course lists.
+"""
+import pytest
+
+from app.modules.learning_activities import moderation
+from app.modules.learning_activities.moderation import AhoCorasick, ModerationRegistry, fold
+
+
+def test_automaton_finds_overlapping_terms():
+    automaton = AhoCorasick(['he', 'she', 'hers', 'her'])
+    assert automaton.find_all('she took hers') == [(0, 3), (9, 13)]
+    assert AhoCorasick(['he', 'he said']).find_all('he said') == [(0, 2), (0, 7)]
+
+
+def test_latin_terms_match_whole_words_and_cjk_terms_match_anywhere():
+    automaton = AhoCorasick(['ass', '笨蛋'])
+    assert automaton.find_all('class assignment') == []
+    assert automaton.find_all('what an ass!') == [(8, 11)]
+    assert automaton.find_all('你是笨蛋吗') == [(2, 4)]
+
+
+def test_fold_keeps_offsets_for_masking():
+    text = 'Ｓｈｉｔ Happens'
+    assert len(fold(text)) == len(text)
+    assert fold(text).startswith('shit')
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient()['comp5241_g10']
+
+
+def test_registry_combines_global_and_course_lists(db):
+    registry = ModerationRegistry()
+    assert registry.check(db, 'COMP5241', 'what the SHIT', 'test').blocked
+
+    db.moderation_blocklists.insert_one({'scope': 'COMP5241', 'terms': ['spoiler'], 'action': 'mask', 'version': 1})
+    registry.invalidate('COMP5241')
+    result = registry.check(db, 'COMP5241', 'No Spoiler please', 'test')
+    assert result.action == 'mask'
+    assert result.masked_text == 'No ******* please'
+    assert not registry.check(db, 'OTHER', 'No Spoiler please', 'test').blocked
+
+    stats = registry.stats_snapshot()['test']
+    assert stats['checks'] == 3 and stats['blocked'] == 2
+    assert stats['p95_ms'] is not None
+
+
+def test_registry_reloads_changed_lists(db, monkeypatch):
+    registry = ModerationRegistry()
+    db.moderation_blocklists.insert_one({'scope': 'C1', 'terms': ['alpha'], 'action': 'reject', 'version': 1})
+    assert registry.check(db, 'C1', 'alpha', 'test').blocked
+
+    db.moderation_blocklists.update_one({'scope': 'C1'}, {'$set': {'terms': ['beta']}, '$inc': {'version': 1}})
+    monkeypatch.setattr(moderation, 'RELOAD_INTERVAL_SECONDS', 0)
+    assert not registry.check(db, 'C1', 'alpha', 'test').blocked
+    assert registry.check(db, 'C1', 'beta', 'test').blocked
+
+
+def test_terms_are_folded_like_the_checked_text(db):
+    term = moderation.normalize_term('  Straße ')
+    assert term == fold('straße') == 'straße'
+    db.moderation_blocklists.insert_one({'scope': 'C1', 'terms': [term], 'action': 'reject', 'version': 1})
+    registry = ModerationRegistry()
+    # Raw short answer text, and a word cloud word that normalization has already casefolded
+    assert registry.check(db, 'C1', 'Die STRAẞE ist lang', 'test').blocked
+    assert registry.check(db, 'C1', 'strasse', 'test').blocked
+
+
+def test_blocklist_edits_need_the_right_role_and_a_real_course():
+    mongomock = pytest.importorskip('mongomock')
+    from app.modules.learning_activities.moderation_routes import _blocklist_edit_denied
+    db = mongomock.MongoClient()['comp5241_g10']
+    course_id = str(db.courses.insert_one({'course_code': 'CS101', 'instructor_id': 'teacher1'}).inserted_id)
+
+    assert _blocklist_edit_denied(db, 'global', 'student1', 'student')[1] == 403
+    assert _blocklist_edit_denied(db, 'global', 'teacher1', 'teacher') == ('Only admins can edit the global blocklist', 403)
+    assert _blocklist_edit_denied(db, 'global', 'root', 'admin') is None
+    assert _blocklist_edit_denied(db, 'NO-SUCH-COURSE', 'teacher1', 'teacher') == ('Course not found', 404)
+    assert _blocklist_edit_denied(db, course_id, 'student1', 'student')[1] == 403
+    assert _blocklist_edit_denied(db, 'CS101', 'teacher1', 'teacher') is None
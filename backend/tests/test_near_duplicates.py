@@ -0,0 +1,68 @@
+"""
+COMP5241 Group 10 - Near-Duplicate Detection Tests
+Unit tests for MinHash signatures and LSH candidate selection.
+"""
+import random
+
+import pytest
+
+from app.modules.learning_activities import near_duplicates
+from app.modules.learning_activities.near_duplicates import (
+    minhash, similarity, signature_fields, similar_pairs, candidate_pairs, BANDS
+)
+
+ANSWER = ('Photosynthesis is the process by which green plants use sunlight, water and carbon dioxide '
+          'to produce glucose and release oxygen as a by-product of the light reactions')
+
+
+def _jaccard(a, b):
+    a, b = set(near_duplicates.shingles(a)), set(near_duplicates.shingles(b))
+    return len(a & b) / len(a | b)
+
+
+def test_signature_similarity_tracks_jaccard():
+    copied = ANSWER.replace('green plants', 'plants')
+    estimate = similarity(minhash(ANSWER), minhash(copied))
+    assert abs(estimate - _jaccard(ANSWER, copied)) < 0.15
+    assert similarity(minhash(ANSWER), minhash('Mitochondria produce ATP for the cell through respiration')) < 0.1
+
+
+def test_signature_fields_round_trip():
+    fields = signature_fields(ANSWER)
+    assert len(fields['lsh_bands']) == BANDS
+    assert len(set(fields['lsh_bands'])) == BANDS
+    assert similarity(near_duplicates.decode_signature(fields['minhash']), minhash(ANSWER)) == 1.0
+
+
+def test_similar_pairs_only_compares_band_candidates():
+    rng = random.Random(3)
+    vocabulary = [f'term{i}' for i in range(2000)]
+    texts = [' '.join(rng.choices(vocabulary, k=30)) for _ in range(300)]
+    texts.append(texts[10] + ' extra words here')
+    texts.append(texts[20].upper())
+    submissions = [signature_fields(text) for text in texts]
+
+    assert len(candidate_pairs(submissions)) < 300 * 299 / 2 / 100
+    pairs = {(first, second) for first, second, _ in similar_pairs(submissions, threshold=0.6)}
+    assert pairs == {(10, 300), (20, 301)}
+
+
+def test_band_index_query_finds_copied_answer():
+    mongomock = pytest.importorskip('mongomock')
+    collection = mongomock.MongoClient()['comp5241_g10'].shortanswer_submissions
+    collection.insert_many([
+        dict(signature_fields(text), submitted_by=student, question_id='q1')
+        for student, text in [('a', ANSWER), ('b', ANSWER + ' indeed'), ('c', 'An unrelated answer about cells and energy')]
+    ])
+    original = collection.find_one({'submitted_by': 'a'})
+    found = {doc['submitted_by'] for doc in collection.find({
+        'question_id': 'q1', 'lsh_bands': {'$in': original['lsh_bands']}, '_id': {'$ne': original['_id']}
+    })}
+    assert found == {'b'}
+
+
+def test_course_scope_needs_a_course():
+    from app.modules.learning_activities.shortanswers_routes import _course_scope_error
+    assert _course_scope_error({'course_id': None}, 'course') == 'Question is not in a course; use scope=question'
+    assert _course_scope_error({}, 'question') is None
+    assert _course_scope_error({'course_id': 'C1'}, 'course') is None
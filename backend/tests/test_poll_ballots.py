@@ -0,0 +1,75 @@
+"""
+COMP5241 Group 10 - Poll Ballot Tests
+Unit tests for multi-select bitmasks and ranked-choice instant-runoff counting.
+"""
+import time
+
+import numpy as np
+import pytest
+
+from app.modules.learning_activities.ballots import (
+    encode_selection, decode_selection, pack_ranking, unpack_rankings, instant_runoff, RANK_PAD
+)
+
+
+def test_selection_round_trip():
+    mask = encode_selection([0, 3, 5], 6)
+    assert mask == 0b101001
+    assert decode_selection(mask) == [0, 3, 5]
+
+
+@pytest.mark.parametrize('indices', [[], [6], [-1], [1, 1], ['a']])
+def test_selection_rejects_invalid_indices(indices):
+    with pytest.raises(ValueError):
+        encode_selection(indices, 6)
+
+
+def test_ranking_pack_and_unpack_pads_partial_ballots():
+    ballots = [pack_ranking([2, 0, 1], 3), pack_ranking([1], 3)]
+    matrix = unpack_rankings(ballots, 3)
+    assert matrix.dtype == np.uint8
+    assert matrix.tolist() == [[2, 0, 1], [1, RANK_PAD, RANK_PAD]]
+
+
+def test_ranking_rejects_repeated_option():
+    with pytest.raises(ValueError):
+        pack_ranking([1, 1], 3)
+
+
+def test_instant_runoff_transfers_eliminated_votes():
+    # First preferences: A=4, B=3, C=2 -> C eliminated, its ballots go to B
+    ballots = (
+        [pack_ranking([0, 1], 3)] * 4 +
+        [pack_ranking([1, 0], 3)] * 3 +
+        [pack_ranking([2, 1], 3)] * 2
+    )
+    result = instant_runoff(unpack_rankings(ballots, 3), 3)
+    assert result['winner'] == 1
+    assert result['rounds'][0]['counts'] == [4, 3, 2]
+    assert result['rounds'][0]['eliminated'] == 2
+    assert result['rounds'][1]['counts'] == [4, 5, 0]
+
+
+def test_instant_runoff_counts_exhausted_ballots():
+    ballots = [pack_ranking([0], 3)] * 2 + [pack_ranking([1], 3)] * 2 + [pack_ranking([2], 3)]
+    result = instant_runoff(unpack_rankings(ballots, 3), 3)
+    assert result['rounds'][1]['exhausted_ballots'] == 1
+    assert result['winner'] in (0, 1)
+
+
+def test_instant_runoff_without_ballots():
+    assert instant_runoff(unpack_rankings([], 4), 4) == {'winner': None, 'rounds': []}
+
+
+def test_instant_runoff_10k_ballots_is_fast():
+    rng = np.random.default_rng(42)
+    option_count = 8
+    ballots = [pack_ranking(rng.permutation(option_count)[:5].tolist(), option_count) for _ in range(10000)]
+    matrix = unpack_rankings(ballots, option_count)
+
+    start = time.perf_counter()
+    result = instant_runoff(matrix, option_count)
+    elapsed = time.perf_counter() - start
+
+    assert result['winner'] is not None
+    assert elapsed < 0.5
@@ -0,0 +1,134 @@
+"""
+COMP5241 Group 10 - Activity Progress Heartbeat Tests
+Progress is written with one upsert and heartbeats are coalesced into one write per record.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.modules.learning_activities import services
+from app.modules.learning_activities.progress_heartbeats import HeartbeatCoalescer
+from app.modules.learning_activities.services import LearningActivityService
+
+
+@pytest.fixture
+def client():
+    mongomock = pytest.importorskip('mongomock')
+    client = mongomock.MongoClient()
+    client['comp5241_g10'].activity_progress.create_index([('activity_id', 1), ('student_id', 1)], unique=True)
+    return client
+
+
+@pytest.fixture
+def coalescer(monkeypatch, client):
+    coalescer = HeartbeatCoalescer()
+    # No background thread in tests; flushes are explicit
+    monkeypatch.setattr(coalescer, '_ensure_started', lambda: None)
+    monkeypatch.setattr(services, 'heartbeat_coalescer', coalescer)
+
+    @contextmanager
+    def connection():
+        yield client
+    monkeypatch.setattr(services, 'get_db_connection', connection)
+    return coalescer
+
+
+def test_record_progress_keeps_highest_progress_and_adds_time(client, coalescer):
+    first = LearningActivityService.record_activity_progress('A1', 'S1', 60, 30)
+    assert (first['progress_percentage'], first['time_spent'], first['is_completed']) == (60, 30, False)
+
+    second = LearningActivityService.record_activity_progress('A1', 'S1', 40, 15)
+    assert (second['progress_percentage'], second['time_spent']) == (60, 45)
+
+    done = LearningActivityService.record_activity_progress('A1', 'S1', 100, 5)
+    assert (done['progress_percentage'], done['time_spent'], done['is_completed']) == (100, 50, True)
+    assert client['comp5241_g10'].activity_progress.count_documents({}) == 1
+
+
+def test_heartbeats_are_written_once_per_record(client, coalescer):
+    start = datetime(2024, 1, 1)
+    for i in range(20):
+        coalescer.add('A1', 'S1', i * 5, 5, start + timedelta(seconds=i * 5))
+    coalescer.add('A2', 'S1', 10, 5, start)
+
+    db = client['comp5241_g10']
+    assert coalescer.flush(db) == 2
+    assert coalescer.flush(db) == 0
+    record = db.activity_progress.find_one({'activity_id': 'A1', 'student_id': 'S1'})
+    assert (record['progress_percentage'], record['time_spent']) == (95, 100)
+    assert record['last_accessed'] == start + timedelta(seconds=95)
+    assert (coalescer.heartbeats, coalescer.writes) == (21, 2)
+
+
+def test_direct_update_takes_pending_heartbeats(client, coalescer):
+    coalescer.add('A1', 'S1', 70, 20)
+    coalescer.add('A1', 'S1', 80, 20)
+
+    progress = LearningActivityService.record_activity_progress('A1', 'S1', 50, 10)
+    assert (progress['progress_percentage'], progress['time_spent']) == (80, 50)
+    assert coalescer.pending_count() == 0
+
+
+def test_failed_flush_keeps_heartbeats_pending(coalescer):
+    class FailingDb:
+        class activity_progress:
+            @staticmethod
+            def bulk_write(requests, ordered=True):
+                raise RuntimeError('database unavailable')
+
+    coalescer.add('A1', 'S1', 30, 10)
+    with pytest.raises(RuntimeError):
+        coalescer.flush(FailingDb)
+    coalescer.add('A1', 'S1', 20, 10)
+    assert coalescer.take('A1', 'S1')['time_spent'] == 20
+
+
+def test_partly_failed_flush_retries_only_the_failed_records(client, coalescer):
+    from pymongo.errors import BulkWriteError
+    db = client['comp5241_g10']
+
+    class PartlyFailingDb:
+        """Applies every write but the second, then reports it the way an unordered bulk_write does"""
+        class activity_progress:
+            @staticmethod
+            def bulk_write(requests, ordered=True):
+                for request in requests[:1] + requests[2:]:
+                    db.activity_progress.bulk_write([request])
+                raise BulkWriteError({'writeErrors': [{'index': 1, 'code': 11000, 'errmsg': 'E11000'}]})
+
+        def __getattr__(self, name):
+            return db[name]
+
+    for activity_id in ('A1', 'A2', 'A3'):
+        coalescer.add(activity_id, 'S1', 10, 30)
+    with pytest.raises(BulkWriteError):
+        coalescer.flush(PartlyFailingDb())
+    assert coalescer.pending_count() == 1
+    assert coalescer.writes == 2
+
+    assert coalescer.flush(db) == 1
+    assert sorted((r['activity_id'], r['time_spent']) for r in db.activity_progress.find()) == \
+        [('A1', 30), ('A2', 30), ('A3', 30)]
+
+
+def test_duplicate_progress_is_merged_before_the_unique_index():
+    mongomock = pytest.importorskip('mongomock')
+    from database_connection.init_db import merge_duplicate_progress
+    db = mongomock.MongoClient()['comp5241_g10']
+    now = datetime.utcnow()
+    db.activity_progress.insert_many([
+        {'activity_id': 'a1', 'student_id': 's1', 'progress_percentage': 40, 'time_spent': 30,
+         'last_accessed': now - timedelta(minutes=5), 'is_completed': False},
+        {'activity_id': 'a1', 'student_id': 's1', 'progress_percentage': 100, 'time_spent': 20,
+         'last_accessed': now, 'is_completed': True, 'course_id': 'C1'},
+        {'activity_id': 'a2', 'student_id': 's1', 'progress_percentage': 10, 'time_spent': 5, 'last_accessed': now}
+    ])
+
+    assert merge_duplicate_progress(db) == 1
+    db.activity_progress.create_index([('activity_id', 1), ('student_id', 1)], unique=True)
+    merged = db.activity_progress.find_one({'activity_id': 'a1'})
+    assert (merged['progress_percentage'], merged['time_spent'], merged['is_completed'], merged['course_id']) == \
+        (100, 50, True, 'C1')
+    assert merged['last_accessed'] == db.activity_progress.find_one({'activity_id': 'a2'})['last_accessed']
+    assert merge_duplicate_progress(db) == 0
@@ -0,0 +1,67 @@
+"""
+COMP5241 Group 10 - Rubric Scoring Tests
+Unit tests for keyword rubrics, fuzzy matching and batch scoring speed.
+"""
+import random
+import time
+
+from app.modules.learning_activities.rubric_scoring import (
+    RubricScorer, edit_distance, rubric_from_example, validate_rubric
+)
+
+RUBRIC = {
+    'keywords': [
+        {'term': 'chlorophyll', 'weight': 2, 'required': True},
+        {'term': 'carbon dioxide', 'weight': 1},
+        {'term': 'glucose', 'weight': 1},
+    ],
+    'min_words': 5,
+    'max_edit_distance': 2,
+}
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance('glucose', 'glcuose', 2) == 1
+    assert edit_distance('glucose', 'gluc', 2) == 3
+
+
+def test_scores_weight_keywords_and_tolerate_typos():
+    scores, details = RubricScorer(RUBRIC).score([
+        'Plants use chlorophyll to turn carbon dioxide and water into glucose',
+        'Plants use chlorophyl to turn carbon dioxde into glucoes',
+        'Plants turn carbon dioxide and water into glucose using light',
+        'chlorophyll glucose',
+    ])
+    assert scores[0] == 100
+    assert scores[1] == 100  # one or two typos per keyword still match
+    assert scores[2] == 25  # required keyword missing halves 50
+    assert details[2]['missing_required'] == ['chlorophyll']
+    assert scores[3] == 65  # 75 minus the short-answer penalty
+    assert details[3]['length_ok'] is False
+
+
+def test_short_keywords_need_exact_matches():
+    scores, _ = RubricScorer({'keywords': [{'term': 'atp'}], 'max_edit_distance': 2}).score(['adp', 'ATP'])
+    assert list(scores) == [0, 100]
+
+
+def test_validation_and_example_fallback():
+    assert validate_rubric(RUBRIC) == []
+    assert validate_rubric({'keywords': []})
+    assert validate_rubric({'keywords': [{'term': 'x', 'weight': -1}]})
+    assert validate_rubric(dict(RUBRIC, length_penalty=25)) == []
+    for penalty in (-5, 101, '10', True, None, float('nan')):
+        assert validate_rubric(dict(RUBRIC, length_penalty=penalty))
+    rubric = rubric_from_example('The mitochondria produce ATP.')
+    assert [keyword['term'] for keyword in rubric['keywords']] == ['mitochondria', 'produce', 'atp']
+
+
+def test_scores_thousands_of_answers_per_second():
+    rng = random.Random(2)
+    words = ['plants', 'chlorophyll', 'chlorophyl', 'glucose', 'sugar', 'carbon', 'dioxide', 'light',
+             'water', 'energy', 'oxygen', 'leaf', 'the', 'and'] + [f'filler{i}' for i in range(500)]
+    texts = [' '.join(rng.choices(words, k=40)) for _ in range(5000)]
+    start = time.perf_counter()
+    scores, _ = RubricScorer(RUBRIC).score(texts)
+    assert len(scores) == 5000
+    assert time.perf_counter() - start < 2.5
@@ -0,0 +1,155 @@
+"""
+COMP5241 Group 10 - Scheduled Transition Tests
+The timer wheel fires on time across levels, and due transitions flip flags exactly once.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.utils import scheduler
+from app.utils.timer_wheel import TimerWheel
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient()['comp5241_g10']
+
+
+def test_wheel_fires_each_timer_on_its_tick_across_levels():
+    wheel = TimerWheel(tick=1, now=1000, slots=4, levels=2)
+    deadlines = {'soon': 1002, 'next_level': 1009.5, 'overflow': 1040, 'late': 1000}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+    wheel.schedule('cancelled', 1005)
+    assert wheel.cancel('cancelled') and len(wheel) == 4
+
+    fired = {}
+    for now in range(1000, 1045):
+        for key in wheel.advance(now):
+            fired[key] = now
+    assert fired == {'late': 1000, 'soon': 1002, 'next_level': 1010, 'overflow': 1040}
+    assert len(wheel) == 0
+
+
+def test_rescheduling_replaces_the_timer():
+    wheel = TimerWheel(now=0)
+    wheel.schedule('a', 5)
+    wheel.schedule('a', 300)
+    assert wheel.advance(299) == []
+    assert wheel.advance(300) == ['a']
+
+
+def test_initial_state_follows_the_dates():
+    now = datetime(2024, 5, 1)
+    past, future = now - timedelta(hours=1), now + timedelta(hours=1)
+    assert scheduler.initial_state('quizzes', {'expires_at': None}, now) == {'is_expired': False}
+    assert scheduler.initial_state('quizzes', {'expires_at': past}, now) == {'is_expired': True}
+    assert scheduler.initial_state('learning_activities', {'start_date': future, 'end_date': None}, now) == {'is_active': False}
+    assert scheduler.initial_state('learning_activities', {'start_date': past, 'end_date': future}, now) == {'is_active': True}
+    assert scheduler.initial_state('course_announcements', {'publish_at': future}, now) == \
+        {'is_published': False, 'is_expired': False}
+
+
+def test_due_transitions_are_applied_once_and_reschedules_win(db):
+    now = datetime.utcnow()
+    quiz = {'title': 'Q', 'expires_at': now + timedelta(minutes=5)}
+    quiz.update(scheduler.initial_state('quizzes', quiz, now))
+    quiz['_id'] = db.quizzes.insert_one(quiz).inserted_id
+    [key] = scheduler.schedule(db, 'quizzes', quiz, now)
+
+    assert scheduler.run_due(db, now) == 0
+    later = now + timedelta(minutes=6)
+    assert scheduler.run_due(db, later) == 1
+    assert scheduler.run_due(db, later) == 0
+    assert db.quizzes.find_one({'_id': quiz['_id']})['is_expired'] is True
+    assert db.scheduled_transitions.find_one({'_id': key})['status'] == 'done'
+
+    # Moving the date resets the entry; the old time no longer fires it
+    quiz['expires_at'] = now + timedelta(minutes=30)
+    db.quizzes.update_one({'_id': quiz['_id']}, {'$set': {'is_expired': False}})
+    scheduler.schedule(db, 'quizzes', quiz, now)
+    assert not scheduler.run_entry(db, key, later)
+    assert db.quizzes.find_one({'_id': quiz['_id']})['is_expired'] is False
+
+
+def test_transitions_leave_deleted_documents_alone(db):
+    now = datetime.utcnow()
+    activity = {'title': 'A', 'start_date': now + timedelta(minutes=5), 'end_date': None}
+    activity.update(scheduler.initial_state('learning_activities', activity, now))
+    activity['_id'] = db.learning_activities.insert_one(activity).inserted_id
+    scheduler.schedule(db, 'learning_activities', activity, now)
+    db.learning_activities.update_one({'_id': activity['_id']}, {'$set': {'deleting': True}})
+
+    assert scheduler.run_due(db, now + timedelta(minutes=6)) == 1
+    assert db.learning_activities.find_one({'_id': activity['_id']})['is_active'] is False
+
+
+def test_an_entry_left_behind_by_a_date_change_does_not_fire(db):
+    now = datetime.utcnow().replace(microsecond=0)
+    quiz = {'title': 'Q', 'expires_at': now + timedelta(minutes=5), 'is_expired': False}
+    quiz['_id'] = db.quizzes.insert_one(quiz).inserted_id
+    scheduler.schedule(db, 'quizzes', quiz, now)
+    # The date was moved by a write that didn't reschedule
+    db.quizzes.update_one({'_id': quiz['_id']}, {'$set': {'expires_at': now + timedelta(hours=1)}})
+
+    assert scheduler.run_due(db, now + timedelta(minutes=6)) == 1
+    assert db.quizzes.find_one({'_id': quiz['_id']})['is_expired'] is False
+
+
+def test_activity_updates_reschedule_or_cancel(db):
+    from app.modules.learning_activities.services import LearningActivityService
+    now = datetime.utcnow().replace(microsecond=0)
+    activity = {'title': 'A', 'start_date': now + timedelta(minutes=5), 'end_date': now + timedelta(hours=1)}
+    activity.update(scheduler.initial_state('learning_activities', activity, now))
+    activity['_id'] = db.learning_activities.insert_one(activity).inserted_id
+    scheduler.schedule(db, 'learning_activities', activity, now)
+    publish = scheduler.entry_id('learning_activities', activity['_id'], 'publish')
+    close = scheduler.entry_id('learning_activities', activity['_id'], 'close')
+
+    # Starting now: active straight away, only the close is left to run
+    changes = {'start_date': now - timedelta(minutes=1)}
+    activity.update(changes)
+    db.learning_activities.update_one({'_id': activity['_id']}, {'$set': changes})
+    LearningActivityService._update_schedule(db, activity, changes)
+    assert db.learning_activities.find_one({'_id': activity['_id']})['is_active'] is True
+    assert db.scheduled_transitions.find_one({'_id': publish}) is None
+    assert db.scheduled_transitions.find_one({'_id': close})['status'] == 'pending'
+
+    # Closing by hand overrides the remaining dates
+    db.learning_activities.update_one({'_id': activity['_id']}, {'$set': {'is_active': False}})
+    LearningActivityService._update_schedule(db, activity, {'is_active': False})
+    assert db.scheduled_transitions.count_documents({}) == 0
+
+
+def test_backfill_cli_rejects_unknown_collections(capsys):
+    from database_connection.backfill_transition_flags import parse_args
+    assert parse_args([]).collections == []
+    assert parse_args(['polls', 'quizzes']).collections == ['polls', 'quizzes']
+    with pytest.raises(SystemExit):
+        parse_args(['nope'])
+    assert 'unknown collection(s): nope' in capsys.readouterr().err
+
+
+def test_worker_wheel_fires_loaded_entries_and_backfills_legacy_documents(db):
+    now = datetime.utcnow().replace(microsecond=0)
+    legacy_id = db.course_announcements.insert_one(
+        {'course_id': 'C1', 'publish_at': now + timedelta(seconds=30), 'expire_at': None}
+    ).inserted_id
+    assert scheduler.backfill(db, now=now) == 1
+    assert db.course_announcements.find_one({'_id': legacy_id})['is_published'] is False
+
+    worker = scheduler.TransitionScheduler()
+    assert worker.load(db, now) == 1
+    assert worker.fire(db, now + timedelta(seconds=29)) == 0
+    assert worker.fire(db, now + timedelta(seconds=30)) == 1
+    announcement = db.course_announcements.find_one({'_id': legacy_id})
+    assert (announcement['is_published'], announcement['is_expired']) == (True, False)
+
+
+def test_announcement_dates_are_converted_to_utc():
+    from app.modules.courses.services import AnnouncementService
+    assert AnnouncementService._as_datetime('2024-05-01T12:00:00+08:00') == datetime(2024, 5, 1, 4)
+    assert AnnouncementService._as_datetime('2024-05-01T12:00:00Z') == datetime(2024, 5, 1, 12)
+    assert AnnouncementService._as_datetime('2024-05-01T12:00:00') == datetime(2024, 5, 1, 12)
+    assert AnnouncementService._as_datetime(None) is None
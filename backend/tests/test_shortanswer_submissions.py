@@ -0,0 +1,109 @@
+"""
+COMP5241 Group 10 - Short Answer Submission Storage Tests
+Submissions live in shortanswer_submissions, one document per student and question.
+"""
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from app.modules.learning_activities import shortanswers_routes
+from app.modules.learning_activities.shortanswers_routes import (
+    _cluster_grade_conflict, _grade_csv_rows, _upsert_submission
+)
+from database_connection.migrate_embedded_submissions import migrate_collection
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient()['comp5241_g10']
+    db.shortanswer_submissions.create_index([('question_id', 1), ('submitted_by', 1)], unique=True)
+    return db
+
+
+def test_resubmission_updates_the_same_document_and_resets_grading(db):
+    question = {'_id': db.short_answer_questions.insert_one({'course_id': 'C1'}).inserted_id, 'course_id': 'C1'}
+
+    assert _upsert_submission(db, question, 'student1', 'first answer', datetime.utcnow()) is False
+    db.shortanswer_submissions.update_one({'submitted_by': 'student1'}, {'$set': {'score': 80, 'is_graded': True}})
+    assert _upsert_submission(db, question, 'student1', 'second answer', datetime.utcnow()) is True
+    _upsert_submission(db, question, 'student2', 'another answer', datetime.utcnow())
+
+    assert db.shortanswer_submissions.count_documents({'question_id': str(question['_id'])}) == 2
+    submission = db.shortanswer_submissions.find_one({'submitted_by': 'student1'})
+    assert submission['text'] == 'second answer'
+    assert submission['is_graded'] is False and submission['score'] is None
+    assert submission['course_id'] == 'C1'
+
+
+def test_migration_moves_embedded_submissions_and_is_idempotent(db):
+    question_id = db.short_answer_questions.insert_one({
+        'course_id': 'C1',
+        'submissions': [
+            {'submitted_by': f'student{i}', 'text': f'answer {i}', 'submitted_at': datetime.utcnow(),
+             'is_graded': i % 2 == 0, 'feedback': '', 'score': 50 if i % 2 == 0 else None}
+            for i in range(7)
+        ]
+    }).inserted_id
+
+    assert migrate_collection(db, 'shortanswers', batch_size=3) == (1, 7)
+    assert 'submissions' not in db.short_answer_questions.find_one({'_id': question_id})
+    assert db.shortanswer_submissions.count_documents({'question_id': str(question_id)}) == 7
+    assert db.shortanswer_submissions.find_one({'submitted_by': 'student2'})['score'] == 50
+
+    assert migrate_collection(db, 'shortanswers') == (0, 0)
+
+
+def test_apply_grades_writes_once_and_reports_partial_failures(db):
+    from app.modules.learning_activities.shortanswers_routes import _apply_grades
+
+    question = {'_id': db.short_answer_questions.insert_one({'course_id': 'C1'}).inserted_id, 'course_id': 'C1'}
+    question_id = str(question['_id'])
+    for i in range(400):
+        _upsert_submission(db, question, f'student{i}', f'answer {i}', datetime.utcnow())
+
+    grades = [{'student_id': f'student{i}', 'score': i % 101, 'feedback': 'ok'} for i in range(400)]
+    grades += [{'student_id': 'ghost', 'score': 50}, {'student_id': 'student1', 'score': 101},
+               {'student_id': 'student2', 'score': 'abc'}, {'score': 10}, 'not a dict']
+
+    calls = []
+    original = db.shortanswer_submissions.bulk_write
+    db.shortanswer_submissions.bulk_write = lambda requests, **kwargs: calls.append(len(requests)) or original(requests, **kwargs)
+    successful, failed = _apply_grades(db, question_id, grades)
+
+    assert calls == [400]
+    assert len(successful) == 400
+    assert len(failed) == 5
+    assert db.shortanswer_submissions.count_documents({'question_id': question_id, 'is_graded': True}) == 400
+    assert db.shortanswer_submissions.find_one({'submitted_by': 'student1'})['score'] == 1
+
+
+def test_cluster_grade_must_name_the_version_and_threshold_it_was_shown():
+    assert _cluster_grade_conflict({'submission_version': 3, 'threshold': 0.55}, 3) is None
+    assert _cluster_grade_conflict({'submission_version': 3}, 3)[1] == 400
+    assert _cluster_grade_conflict({'submission_version': 3, 'threshold': 'high'}, 3)[1] == 400
+    assert _cluster_grade_conflict({'submission_version': 2, 'threshold': 0.55}, 3)[1] == 409
+    assert _cluster_grade_conflict({'submission_version': 3, 'threshold': 0.99}, 3)[1] == 409
+    assert _cluster_grade_conflict({'submission_version': 3, 'threshold': 0.555}, 3)[1] == 409
+
+
+def test_csv_grading_reports_every_row_and_keeps_chunks_written_before_a_broken_line(db, monkeypatch):
+    monkeypatch.setattr(shortanswers_routes, 'GRADE_CHUNK_SIZE', 2)
+    question = {'_id': db.short_answer_questions.insert_one({'course_id': 'C1'}).inserted_id, 'course_id': 'C1'}
+    question_id = str(question['_id'])
+    for i in range(4):
+        _upsert_submission(db, question, f'student{i}', f'answer {i}', datetime.utcnow())
+
+    # The bad byte is past the first read buffer, as in a large upload
+    body = (b'student_id,score,feedback\nstudent0,80,\nghost,50,\nstudent1,70,\nstudent2,60,'
+            + b'x' * 10000 + b'\nstudent3,\xff,\n')
+    reader = csv.DictReader(io.TextIOWrapper(io.BytesIO(body), encoding='utf-8-sig', newline=''))
+    successful, failed = _grade_csv_rows(db, question_id, reader)
+
+    # The first chunk was written before the break, the rows read after it still are; student2's line is cut off
+    assert [grade['student_id'] for grade in successful] == ['student0', 'student1']
+    assert [failure.get('student_id') for failure in failed] == ['ghost', None]
+    assert 'Invalid CSV' in failed[1]['error']
+    assert db.shortanswer_submissions.count_documents({'question_id': question_id, 'is_graded': True}) == 2
@@ -0,0 +1,85 @@
+"""
+COMP5241 Group 10 - Word Normalizer Tests
+Unit tests for Unicode folding, CJK segmentation and per-cloud merging.
+"""
+import pytest
+
+from app.modules.learning_activities.word_normalizer import (
+    WordNormalizer, build_settings, normalize_text, segment, cache_info
+)
+from app.modules.learning_activities.wordclouds_routes import validate_word
+
+
+def test_unicode_folding_keeps_accents_and_cjk():
+    assert normalize_text('  Café!! ') == 'café'
+    assert normalize_text('ＰＹＴＨＯＮ') == 'python'  # full-width folds to ASCII
+    assert normalize_text('学习，编程。') == '学习 编程'
+    assert normalize_text('naïve   résumé') == 'naïve résumé'
+    assert normalize_text('Straße') == 'strasse'
+    assert normalize_text('machine-learning') == 'machine-learning'
+
+
+def test_segment_separates_cjk_from_latin():
+    assert segment('python编程 test')[0] == 'python'
+    assert segment('python编程 test')[-1] == 'test'
+    assert ''.join(segment('python编程 test')[1:-1]) == '编程'
+
+
+def test_cjk_is_segmented_on_every_path():
+    # Separated from Latin text whether or not stop words and lemmatization are on
+    assert normalize_text('Python编程') == 'python 编程'
+    assert WordNormalizer(lemmatize=True).normalize('Python编程') == 'python 编程'
+
+
+def test_cjk_runs_are_kept_whole_without_jieba(monkeypatch):
+    from app.modules.learning_activities import word_normalizer
+    monkeypatch.setattr(word_normalizer, 'jieba', None)
+    assert segment('python学习编程 test') == ['python', '学习编程', 'test']
+    # A stop word inside a run can't be found without jieba, so it stays
+    assert word_normalizer._normalize.__wrapped__('学习编程的python', False, True) == '学习编程的 python'
+
+
+def test_stop_words_and_lemmatization_are_optional():
+    plain = WordNormalizer()
+    assert plain.normalize('The Databases') == 'the databases'
+
+    tuned = WordNormalizer(lemmatize=True, remove_stop_words=True)
+    assert tuned.normalize('The Databases') == 'database'
+    assert tuned.normalize('Studies') == 'study'
+    assert tuned.normalize('class') == 'class'
+    assert tuned.normalize('the') == 'the'  # never emptied
+
+
+def test_synonyms_merge_variants_onto_canonical_word():
+    settings = build_settings({'lemmatize': True, 'synonyms': {'JS': 'JavaScript', 'ECMAScripts': 'javascript'}})
+    assert settings['synonyms'] == {'js': 'javascript', 'ecmascript': 'javascript'}
+
+    normalizer = WordNormalizer.from_settings(settings)
+    assert normalizer.normalize('js!') == 'javascript'
+    assert normalizer.normalize('ECMAScript') == 'javascript'
+
+    with pytest.raises(ValueError):
+        build_settings({'synonyms': {'!!!': 'word'}})
+
+
+def test_repeated_words_hit_the_cache():
+    before = cache_info().hits
+    for _ in range(5):
+        normalize_text('Popular Word (cached)')
+    assert cache_info().hits - before >= 4
+
+
+def test_validate_word_rejects_punctuation_only_and_long_words():
+    assert validate_word('Hello, World!') == ('hello world', None)
+    assert validate_word('?!')[0] is None
+    assert validate_word('x' * 51)[0] is None
+
+
+def test_removal_matches_the_stored_form_of_the_submitted_word():
+    # remove_word normalizes with the cloud's settings, as submit_word does
+    normalizer = WordNormalizer.from_settings(build_settings({'lemmatize': True, 'remove_stop_words': True,
+                                                              'synonyms': {'JS': 'JavaScript'}}))
+    for submitted, removal in [('The Databases', 'databases'), ('JS', 'javascript'), ('Studies', 'study')]:
+        stored = normalizer.normalize(submitted)
+        assert normalizer.normalize(removal) == stored
+        assert normalizer.normalize(stored) == stored
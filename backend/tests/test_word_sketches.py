@@ -0,0 +1,140 @@
+"""
+COMP5241 Group 10 - Word Cloud Sketch Tests
+Unit tests for the Space-Saving / Count-Min heavy-hitter sketches.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from app.modules.learning_activities import word_sketches
+from app.modules.learning_activities.word_sketches import (
+    CountMinSketch, SpaceSaving, HeavyHitters, SketchRegistry
+)
+
+
+def _zipf_stream(size=20000, vocabulary=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    ranks = rng.zipf(1.3, size=size * 2)
+    return [f'w{rank}' for rank in ranks[ranks <= vocabulary][:size]]
+
+
+def test_count_min_never_underestimates():
+    stream = _zipf_stream()
+    sketch = CountMinSketch(width=256, depth=4)
+    for word in stream:
+        sketch.add(word)
+    for word, count in Counter(stream).items():
+        assert sketch.estimate(word) >= count
+    assert sketch.total == len(stream)
+
+
+def test_space_saving_bounds_hold_for_tracked_words():
+    stream = _zipf_stream()
+    exact = Counter(stream)
+    summary = SpaceSaving(capacity=50)
+    for word in stream:
+        summary.add(word)
+    for word, count, error in summary.top(50):
+        assert count - error <= exact[word] <= count
+    # Every word above total / capacity must be tracked
+    frequent = {word for word, count in exact.items() if count > len(stream) / 50}
+    assert frequent <= set(summary.counters)
+
+
+def test_heavy_hitters_finds_top_words_and_supports_removal():
+    stream = _zipf_stream()
+    exact = Counter(stream)
+    hitters = HeavyHitters(capacity=100, width=1024, depth=4)
+    for word in stream:
+        hitters.add(word)
+    top = hitters.top(10)
+    assert [entry['word'] for entry in top[:3]] == [word for word, _ in exact.most_common(3)]
+
+    before = hitters.top(1)[0]
+    hitters.remove(before['word'])
+    assert hitters.top(1)[0]['upper_bound'] == before['upper_bound'] - 1
+
+
+def test_document_round_trip_and_merge():
+    left, right = HeavyHitters(50, 512, 3), HeavyHitters(50, 512, 3)
+    stream = _zipf_stream(size=6000)
+    for index, word in enumerate(stream):
+        (left if index % 2 else right).add(word)
+
+    restored = HeavyHitters.from_document(left.to_document())
+    assert restored.top(5) == left.top(5)
+
+    restored.merge(right)
+    exact = Counter(stream)
+    assert restored.total == len(stream)
+    for entry in restored.top(10):
+        assert entry['lower_bound'] <= exact[entry['word']] <= entry['upper_bound']
+
+
+def test_registry_merges_other_worker_checkpoints():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient()['comp5241_g10']
+    worker_a, worker_b = SketchRegistry(), SketchRegistry()
+    worker_b.worker_id = 'other-host:1'
+    # No background thread here; flushes are explicit
+    worker_a._ensure_started = worker_b._ensure_started = lambda: None
+
+    for _ in range(3):
+        worker_a.add(db, 'cloud1', 'python')
+    worker_b.add(db, 'cloud1', 'python')
+    worker_b.flush(db)
+
+    merged = worker_a.merged(db, 'cloud1')
+    assert merged.top(1)[0]['word'] == 'python'
+    assert merged.top(1)[0]['count'] == 4
+
+
+def test_version_follows_what_the_merge_sees():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient()['comp5241_g10']
+    worker_a, worker_b = SketchRegistry(), SketchRegistry()
+    worker_b.worker_id = 'other-host:1'
+    worker_a._ensure_started = worker_b._ensure_started = lambda: None
+
+    worker_a.add(db, 'cloud1', 'python')
+    assert worker_a.version(db, 'cloud1') == 1
+    # Another worker's update only reaches this worker's merge at its checkpoint
+    worker_b.add(db, 'cloud1', 'java')
+    assert worker_a.version(db, 'cloud1') == 1
+    worker_b.flush(db)
+    assert worker_a.version(db, 'cloud1') == 2
+    worker_a.remove(db, 'cloud1', 'python')
+    assert worker_a.version(db, 'cloud1') == 3
+
+    # A restarted worker resumes its count from its checkpoint
+    worker_a.flush(db)
+    restarted = SketchRegistry()
+    restarted._ensure_started = lambda: None
+    assert restarted.version(db, 'cloud1') == 3
+
+
+def test_background_thread_checkpoints_quiet_clouds(monkeypatch):
+    mongomock = pytest.importorskip('mongomock')
+    client = mongomock.MongoClient()
+    db = client['comp5241_g10']
+
+    @contextmanager
+    def connection():
+        yield client
+    monkeypatch.setattr(word_sketches, 'get_db_connection', connection)
+    registered = []
+    monkeypatch.setattr(word_sketches.atexit, 'register', registered.append)
+
+    registry = SketchRegistry(interval=0.05)
+    registry.add(db, 'cloud1', 'python')  # one update: below both inline checkpoint triggers
+    assert registered == [registry._flush_with_connection]
+    assert db.wordcloud_sketches.count_documents({}) == 0
+
+    deadline = time.monotonic() + 2
+    while registry.pending_count() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert registry.pending_count() == 0
+    assert db.wordcloud_sketches.find_one({'wordcloud_id': 'cloud1'})['worker_id'] == registry.worker_id
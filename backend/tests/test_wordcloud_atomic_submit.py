@@ -0,0 +1,138 @@
+"""
+COMP5241 Group 10 - Word Cloud Submission Gate Tests
+The open/unexpired check, the per-user limit and "each word once per user"
+are conditions of the writes, not reads made before them.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.modules.learning_activities.wordclouds_routes import (
+    _add_user_word, _claim_submission_slot, _record_word_added, _record_word_removed
+)
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient()['comp5241_g10']
+    # Same unique indexes as init_db.create_collections_and_indexes
+    db.wordcloud_submissions.create_index([('wordcloud_id', 1), ('submitted_by', 1), ('word', 1)], unique=True)
+    db.wordcloud_participants.create_index([('wordcloud_id', 1), ('user_id', 1)], unique=True)
+    return db
+
+
+def _create_cloud(db, **overrides):
+    wordcloud = {
+        'max_submissions_per_user': 3,
+        'is_active': True,
+        'expires_at': None,
+        'submission_count': 0
+    }
+    wordcloud.update(overrides)
+    return str(db.word_clouds.insert_one(wordcloud).inserted_id)
+
+
+def test_user_word_write_fails_at_the_limit_and_on_repeats(db):
+    wordcloud_id = _create_cloud(db)
+    added = [_add_user_word(db, wordcloud_id, 'student1', word, 3) for word in ('a', 'b', 'a', 'c', 'd')]
+
+    assert [p['submission_count'] if p else None for p in added] == [1, 2, None, 3, None]
+    participant = db.wordcloud_participants.find_one({'user_id': 'student1'})
+    assert (sorted(participant['words']), participant['submission_count']) == (['a', 'b', 'c'], 3)
+    assert db.wordcloud_participants.count_documents({}) == 1
+
+
+def test_racing_first_submissions_retry_instead_of_hitting_the_limit(db, monkeypatch):
+    wordcloud_id = _create_cloud(db)
+    participants = db.wordcloud_participants
+    original = participants.find_one_and_update
+
+    def lose_the_upsert_race(query, update, upsert=False, **kwargs):
+        if upsert:
+            # A concurrent first submission creates the document between this filter and its insert
+            participants.insert_one({'wordcloud_id': wordcloud_id, 'user_id': 'student1',
+                                     'words': ['java'], 'submission_count': 1})
+            raise DuplicateKeyError('E11000 duplicate key error')
+        return original(query, update, upsert=upsert, **kwargs)
+
+    monkeypatch.setattr(participants, 'find_one_and_update', lose_the_upsert_race)
+    wordcloud, rejection = _claim_submission_slot(db, wordcloud_id, 'student1', 'python')
+
+    assert rejection is None and wordcloud['user_submission_count'] == 2
+
+
+def test_limit_holds_when_another_request_already_took_the_last_slot(db):
+    wordcloud_id = _create_cloud(db, max_submissions_per_user=2)
+    assert _claim_submission_slot(db, wordcloud_id, 'student1', 'alpha')[1] is None
+    # A concurrent request has taken the second slot but not yet stored its word
+    _add_user_word(db, wordcloud_id, 'student1', 'gamma', 2)
+
+    assert _claim_submission_slot(db, wordcloud_id, 'student1', 'beta') == \
+        (None, ('Maximum submission limit (2) reached', 400))
+    assert db.wordcloud_submissions.count_documents({'submitted_by': 'student1'}) == 1
+    assert db.word_clouds.find_one({})['submission_count'] == 1
+
+
+def test_duplicate_word_is_rejected_without_counting(db):
+    wordcloud_id = _create_cloud(db)
+    assert _claim_submission_slot(db, wordcloud_id, 'student1', 'python')[1] is None
+
+    assert _claim_submission_slot(db, wordcloud_id, 'student1', 'python') == \
+        (None, ('You have already submitted this word', 400))
+    assert db.wordcloud_participants.find_one({'user_id': 'student1'})['submission_count'] == 1
+    assert db.word_clouds.find_one({})['submission_count'] == 1
+
+
+def test_failed_insert_gives_the_slot_back(db, monkeypatch):
+    wordcloud_id = _create_cloud(db)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('connection reset')
+
+    monkeypatch.setattr(db.wordcloud_submissions, 'update_one', fail)
+    with pytest.raises(RuntimeError):
+        _claim_submission_slot(db, wordcloud_id, 'student1', 'python')
+
+    participant = db.wordcloud_participants.find_one({'user_id': 'student1'})
+    assert (participant['words'], participant['submission_count']) == ([], 0)
+    assert db.word_clouds.find_one({})['submission_count'] == 0
+
+
+def test_accepted_submission_is_stored_and_counted(db):
+    wordcloud_id = _create_cloud(db, max_submissions_per_user=1)
+    for user_id in ('a.b', '$c', 'd'):
+        wordcloud, rejection = _claim_submission_slot(db, wordcloud_id, user_id, 'python')
+        assert rejection is None and wordcloud['user_submission_count'] == 1
+
+    assert db.word_clouds.find_one({})['submission_count'] == 3
+    assert db.wordcloud_submissions.count_documents({'wordcloud_id': wordcloud_id, 'word': 'python'}) == 3
+    assert 'participants' not in db.word_clouds.find_one({})
+
+
+def test_closed_and_expired_clouds_reject_submissions(db):
+    closed_id = _create_cloud(db, is_active=False)
+    expired_id = _create_cloud(db, expires_at=datetime.utcnow() - timedelta(minutes=1))
+
+    assert _claim_submission_slot(db, closed_id, 'student1', 'python') == (None, ('Word cloud is closed', 400))
+    assert _claim_submission_slot(db, expired_id, 'student1', 'python') == (None, ('Word cloud has expired', 400))
+    assert db.wordcloud_submissions.count_documents({}) == 0
+    assert db.wordcloud_participants.count_documents({}) == 0
+    assert [c['submission_count'] for c in db.word_clouds.find()] == [0, 0]
+
+
+def test_counts_version_moves_only_after_the_counts_are_written(db):
+    wordcloud_id = _create_cloud(db, counts_version=0)
+    wordcloud, _ = _claim_submission_slot(db, wordcloud_id, 'student1', 'python')
+    # Claimed but not yet counted: a render now must not cache stale counts under a new version
+    assert db.word_clouds.find_one({})['counts_version'] == 0
+
+    _record_word_added(db, wordcloud, 'python', new_contributor=True)
+    cloud = db.word_clouds.find_one({})
+    assert (cloud['counts_version'], cloud['unique_words']) == (1, 1)
+    assert db.wordcloud_word_counts.find_one({'word': 'python'})['count'] == 1
+
+    _record_word_removed(db, wordcloud, 'python', last_for_contributor=True)
+    cloud = db.word_clouds.find_one({})
+    assert (cloud['counts_version'], cloud['unique_words'], cloud['unique_contributors']) == (2, 0, 0)
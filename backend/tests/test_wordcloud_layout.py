@@ -0,0 +1,58 @@
+"""
+COMP5241 Group 10 - Word Cloud Layout Tests
+Unit tests for server-side word placement, SVG output and the render cache.
+"""
+import time
+
+from app.modules.learning_activities.wordcloud_layout import (
+    compute_layout, render_svg, RenderCache, _text_width, PROCESS_POOL_THRESHOLD
+)
+
+
+def _words(n):
+    return [(f'word{i}', max(1000 // (i + 1), 1)) for i in range(n)]
+
+
+def _box(placement):
+    width, height = _text_width(placement['text'], placement['font_size']), placement['font_size'] * 1.1
+    if placement['rotate']:
+        width, height = height, width
+    return (placement['x'] - width / 2, placement['y'] - height / 2,
+            placement['x'] + width / 2, placement['y'] + height / 2)
+
+
+def test_layout_places_words_inside_the_box_without_overlap():
+    placements = compute_layout(_words(80), 800, 500)
+    assert len(placements) > 60
+    assert placements[0]['font_size'] > placements[-1]['font_size']
+
+    boxes = [_box(placement) for placement in placements]
+    for left, top, right, bottom in boxes:
+        assert left >= 0 and top >= 0 and right <= 800 and bottom <= 500
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1]
+
+
+def test_svg_escapes_words():
+    svg = render_svg(compute_layout([('<b>&', 3), ('学习', 2)], 400, 300), 400, 300).decode('utf-8')
+    assert svg.startswith('<svg') and svg.endswith('</svg>')
+    assert '&lt;b&gt;&amp;' in svg and '学习' in svg
+
+
+def test_render_cache_reuses_images_per_version():
+    cache = RenderCache(max_entries=2)
+    first = cache.render(('cloud', 1, 'svg', 400, 300, 50), _words(10), 400, 300, 'svg')
+    start = time.perf_counter()
+    assert cache.render(('cloud', 1, 'svg', 400, 300, 50), [], 400, 300, 'svg') is first
+    assert time.perf_counter() - start < 0.01
+
+    cache.render(('cloud', 2, 'svg', 400, 300, 50), _words(5), 400, 300, 'svg')
+    cache.render(('cloud', 3, 'svg', 400, 300, 50), _words(5), 400, 300, 'svg')
+    assert cache.get(('cloud', 1, 'svg', 400, 300, 50)) is None
+
+
+def test_big_clouds_render_in_process_pool():
+    words = _words(PROCESS_POOL_THRESHOLD + 50)
+    image = RenderCache().render(('big', 1, 'svg', 1200, 800, 500), words, 1200, 800, 'svg')
+    assert image.count(b'<text') > 100
@@ -0,0 +1,53 @@
+"""
+COMP5241 Group 10 - Word Cloud Submission Migration Tests
+Embedded word cloud submissions move to wordcloud_submissions with their counters rebuilt.
+"""
+from datetime import datetime
+
+import pytest
+
+from database_connection.migrate_embedded_submissions import migrate_collection, parse_args
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient()['comp5241_g10']
+
+
+def test_migration_moves_embedded_words_and_rebuilds_the_counters(db):
+    now = datetime.utcnow()
+    wordcloud_id = db.word_clouds.insert_one({
+        'course_id': 'C1',
+        'submissions': [
+            {'submitted_by': 'student1', 'word': 'Python', 'submitted_at': now},
+            {'submitted_by': 'student1', 'word': 'python', 'submitted_at': now},  # kept once
+            {'submitted_by': 'student1', 'word': 'java', 'submitted_at': now},
+            {'submitted_by': 'student2', 'word': 'python', 'submitted_at': now},
+        ],
+        'participants': {'student1': ['python', 'java'], 'student2': ['python']}
+    }).inserted_id
+
+    assert migrate_collection(db, 'wordclouds', batch_size=3) == (1, 4)
+    wordcloud = db.word_clouds.find_one({'_id': wordcloud_id})
+    assert 'submissions' not in wordcloud and 'participants' not in wordcloud
+    assert 'submissions' not in wordcloud.get('migration_progress', {})
+    assert (wordcloud['submission_count'], wordcloud['unique_words'], wordcloud['unique_contributors']) == (3, 2, 2)
+
+    key = str(wordcloud_id)
+    assert db.wordcloud_submissions.count_documents({'wordcloud_id': key}) == 3
+    counts = {entry['word']: entry['count'] for entry in db.wordcloud_word_counts.find({'wordcloud_id': key})}
+    assert counts == {'python': 2, 'java': 1}
+    participants = {entry['user_id']: (sorted(entry['words']), entry['submission_count'])
+                    for entry in db.wordcloud_participants.find({'wordcloud_id': key})}
+    assert participants == {'student1': (['java', 'python'], 2), 'student2': (['python'], 1)}
+
+    assert migrate_collection(db, 'wordclouds') == (0, 0)
+    assert db.wordcloud_submissions.count_documents({}) == 3
+
+
+def test_cli_runs_every_migration_by_default_and_rejects_unknown_names():
+    assert parse_args([]).migrations == []
+    assert parse_args(['wordclouds', '--batch-size', '50']).batch_size == 50
+    with pytest.raises(SystemExit):
+        parse_args(['wordcloud'])
@@ -0,0 +1,69 @@
+"""
+Benchmark: heavy-hitter sketch accuracy against memory use for word clouds.
+
+Streams a Zipf-distributed set of word submissions through HeavyHitters
+sketches of different sizes and compares the reported top words with exact
+counts.
+
+Run from backend/: python tools/bench_wordcloud_sketch.py [submissions] [vocabulary]
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.learning_activities.word_sketches import HeavyHitters
+
+TOP_N = 50
+CONFIGS = [
+    # (Space-Saving capacity, Count-Min width, Count-Min depth)
+    (50, 256, 3),
+    (100, 1024, 4),
+    (200, 2048, 4),
+    (500, 8192, 4),
+]
+
+
+def make_stream(submissions, vocabulary, seed=7):
+    rng = np.random.default_rng(seed)
+    ranks = rng.zipf(1.2, size=submissions * 2)
+    ranks = ranks[ranks <= vocabulary][:submissions]
+    return [f'word{rank}' for rank in ranks]
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    vocabulary = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    stream = make_stream(submissions, vocabulary)
+    exact = Counter(stream)
+    exact_top = [word for word, _ in exact.most_common(TOP_N)]
+    exact_bytes = sum(sys.getsizeof(word) + 28 for word in exact) + sys.getsizeof(exact)
+
+    print(f'{len(stream)} submissions, {len(exact)} distinct words, exact counter ~{exact_bytes / 1024:.0f} KiB')
+    print(f'{"capacity":>8} {"width":>6} {"depth":>5} {"memory KiB":>10} {"recall@50":>9} '
+          f'{"mean rel err":>12} {"max abs err":>11} {"bounds ok":>9} {"updates/s":>10}')
+
+    for capacity, width, depth in CONFIGS:
+        hitters = HeavyHitters(capacity, width, depth)
+        start = time.perf_counter()
+        for word in stream:
+            hitters.add(word)
+        elapsed = time.perf_counter() - start
+
+        top = hitters.top(TOP_N)
+        reported = [entry['word'] for entry in top]
+        recall = len(set(reported) & set(exact_top)) / TOP_N
+        errors = [abs(entry['count'] - exact[entry['word']]) for entry in top]
+        relative = [error / exact[entry['word']] for error, entry in zip(errors, top)]
+        bounds_ok = all(entry['lower_bound'] <= exact[entry['word']] <= entry['upper_bound'] for entry in top)
+
+        print(f'{capacity:>8} {width:>6} {depth:>5} {hitters.memory_bytes / 1024:>10.0f} {recall:>9.2f} '
+              f'{np.mean(relative):>12.4f} {max(errors):>11} {str(bounds_ok):>9} {len(stream) / elapsed:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()